@@ -4,6 +4,10 @@ from .manager import AIManager
 from .local_client import LocalAIClient
 from .online_clients import OpenAIClient, AnthropicClient, GoogleClient
 from .prompt_templates import PromptTemplates
+from .history import ConversationStore
+from .prompt_builder import PromptBuilder
+from .response_cache import ResponseCache
+from .tools import ROBOT_TOOLS, ToolCall
 
 __all__ = [
     'AIManager',
@@ -11,5 +15,10 @@ __all__ = [
     'OpenAIClient',
     'AnthropicClient',
     'GoogleClient',
-    'PromptTemplates'
+    'PromptTemplates',
+    'ConversationStore',
+    'PromptBuilder',
+    'ResponseCache',
+    'ROBOT_TOOLS',
+    'ToolCall'
 ]
@@ -0,0 +1,343 @@
+"""Conversation History - Per-session bounded histories with JSONL persistence"""
+
+import os
+import re
+import json
+import time
+import queue
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict, deque
+from typing import Deque, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+
+# Seconds between cleanups of old session files
+PRUNE_INTERVAL = 3600.0
+
+# Session ids used directly as file names; anything else is hashed
+_SAFE_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def read_tail_lines(path: Path, count: int) -> List[bytes]:
+    """Read the last lines of a file without reading the whole file
+
+    Args:
+        path: File path
+        count: Lines wanted
+
+    Returns:
+        Up to count complete lines (oldest first, without newlines)
+    """
+    with open(path, "rb") as f:
+        end = f.seek(0, 2)
+        position = end
+        data = b""
+        # count + 1 newlines guarantee count complete lines after the first one
+        while position > 0 and data.count(b"\n") <= count:
+            size = min(_TAIL_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + data
+    lines = data.split(b"\n")
+    if position > 0:
+        lines = lines[1:]  # starts mid-line
+    return [line for line in lines if line.strip()][-count:]
+
+
+class HistoryWriter:
+    """Write-behind appender for session JSONL files
+
+    Appends are queued and written by a background thread, so file I/O
+    never blocks the event loop. Queued writes are batched per file. A file
+    that grows past max_bytes is compacted to its last keep_lines lines.
+    Old session files are removed by queued prune requests.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024, keep_lines: int = 50):
+        """Start writer thread
+
+        Args:
+            directory: Directory holding <session>.jsonl files
+            max_bytes: File size that triggers compaction
+            keep_lines: Lines kept when compacting
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.keep_lines = keep_lines
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue[Optional[Tuple[str, Path, object]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def append(self, path: Path, line: str):
+        """Queue one JSONL line for appending"""
+        self._queue.put(("append", path, line))
+
+    def truncate(self, path: Path):
+        """Queue removal of a session file"""
+        self._queue.put(("truncate", path, ""))
+
+    def prune(self, max_age: float, max_files: int, keep: FrozenSet[Path] = frozenset()):
+        """Queue removal of old session files
+
+        Args:
+            max_age: Seconds since the last write after which a file is
+                removed (0 to keep files regardless of age)
+            max_files: Files kept at most, least recently written removed
+                first (0 for no limit)
+            keep: Files never removed (sessions in memory)
+        """
+        self._queue.put(("prune", self.directory, (max_age, max_files, keep)))
+
+    def flush(self):
+        """Block until every queued write has been performed"""
+        self._queue.join()
+
+    def close(self):
+        """Write pending entries and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Drain whatever else is queued to write it in one pass
+            while item is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            self._write_batch([op for op in batch if op is not None])
+
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _write_batch(self, batch: List[Tuple[str, Path, object]]):
+        pending: Dict[Path, List[str]] = {}
+
+        def write_pending():
+            for path, lines in pending.items():
+                try:
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write("".join(lines))
+                        size = f.tell()
+                    if size > self.max_bytes:
+                        self._compact(path)
+                except OSError as e:
+                    logger.error(f"Failed to write history {path}: {e}")
+            pending.clear()
+
+        for op, path, line in batch:
+            if op == "append":
+                pending.setdefault(path, []).append(line)
+            elif op == "prune":
+                write_pending()
+                self._prune(*line)
+            else:
+                # Keep ordering: earlier appends must land before the truncate
+                write_pending()
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as e:
+                    logger.error(f"Failed to remove history {path}: {e}")
+
+        write_pending()
+
+    def _prune(self, max_age: float, max_files: int, keep: FrozenSet[Path]):
+        """Remove session files older than max_age and beyond max_files"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".jsonl") and Path(entry.path) not in keep:
+                try:
+                    files.append((entry.stat().st_mtime, Path(entry.path)))
+                except OSError:
+                    continue
+        files.sort(reverse=True)  # most recently written first
+
+        now = time.time()
+        limit = max(0, max_files - len(keep)) if max_files else len(files)
+        removed = 0
+        for i, (mtime, path) in enumerate(files):
+            if i >= limit or (max_age and now - mtime > max_age):
+                try:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                except OSError as e:
+                    logger.error(f"Failed to remove history {path}: {e}")
+        if removed:
+            logger.info(f"Removed {removed} old conversation files")
+
+    def _compact(self, path: Path):
+        """Rewrite a session file with only its last keep_lines lines"""
+        lines = read_tail_lines(path, self.keep_lines)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(b"".join(line + b"\n" for line in lines))
+        tmp.replace(path)
+        logger.debug(f"Compacted history {path} to {len(lines)} lines")
+
+
+class ConversationStore:
+    """Per-session conversation histories
+
+    Each session keeps its last `history_length` messages in a bounded
+    deque. At most `max_sessions` sessions stay in memory; the least
+    recently used one is evicted and reloaded lazily from the tail of its
+    JSONL file when the client comes back. Files are compacted once they
+    exceed `max_file_bytes`, so they never grow without bound, and files of
+    sessions idle for `max_age` seconds, or beyond the newest `max_files`,
+    are removed on startup and then hourly.
+    """
+
+    def __init__(
+        self,
+        history_length: int = 50,
+        max_sessions: int = 100,
+        history_dir: Optional[str] = None,
+        persist: bool = True,
+        max_file_bytes: int = 256 * 1024,
+        max_age: float = 30 * 86400,
+        max_files: int = 1000
+    ):
+        """Initialize conversation store
+
+        Args:
+            history_length: Messages kept per session
+            max_sessions: Sessions kept in memory
+            history_dir: Directory for JSONL files
+            persist: Whether to persist histories to history_dir
+            max_file_bytes: Session file size that triggers compaction to
+                the last history_length messages
+            max_age: Seconds without writes after which a session file is
+                removed (0 keeps files regardless of age)
+            max_files: Session files kept at most (0 for no limit)
+        """
+        self.history_length = history_length
+        self.max_sessions = max_sessions
+        self.directory = Path(history_dir) if history_dir else None
+        self.max_age = max_age
+        self.max_files = max_files
+        self._pruned_at = 0.0
+
+        self._sessions: "OrderedDict[str, Deque[Dict[str, str]]]" = OrderedDict()
+        self._writer: Optional[HistoryWriter] = None
+        if persist and self.directory is not None:
+            self._writer = HistoryWriter(self.directory, max_file_bytes, history_length)
+            self.prune()
+
+        self.stats = {"loads": 0, "evictions": 0}
+
+    def _path(self, session_id: str) -> Path:
+        if _SAFE_SESSION_ID.match(session_id):
+            name = session_id
+        else:
+            name = hashlib.sha1(session_id.encode()).hexdigest()
+        return self.directory / f"{name}.jsonl"
+
+    def _load(self, path: Path) -> Deque[Dict[str, str]]:
+        """Read the last history_length messages from a session file"""
+        messages: Deque[Dict[str, str]] = deque(maxlen=self.history_length)
+        try:
+            lines = read_tail_lines(path, self.history_length)
+        except FileNotFoundError:
+            return messages
+        for line in lines:
+            try:
+                messages.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # Partially written last line after a crash
+                continue
+        return messages
+
+    async def get(self, session_id: str = DEFAULT_SESSION) -> Deque[Dict[str, str]]:
+        """Get a session's history, loading it from disk if not resident
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Bounded deque of message dicts (oldest first)
+        """
+        messages = self._sessions.get(session_id)
+        if messages is not None:
+            self._sessions.move_to_end(session_id)
+            return messages
+
+        messages = deque(maxlen=self.history_length)
+        if self._writer is not None:
+            path = self._path(session_id)
+            # Pending writes for this session must land before reading it back
+            await asyncio.to_thread(self._writer.flush)
+            messages = await asyncio.to_thread(self._load, path)
+            self.stats["loads"] += 1
+
+        # Another request may have loaded the session meanwhile
+        if session_id in self._sessions:
+            return self._sessions[session_id]
+
+        self._sessions[session_id] = messages
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self.stats["evictions"] += 1
+            logger.debug(f"Evicted conversation {evicted} from memory")
+        return messages
+
+    async def append(self, session_id: str, message: str, response: str):
+        """Add a user message and the assistant's response to a session
+
+        Args:
+            session_id: Session identifier
+            message: User message
+            response: Assistant response
+        """
+        messages = await self.get(session_id)
+        entries = [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": response},
+        ]
+        messages.extend(entries)
+
+        if self._writer is not None:
+            self._writer.append(
+                self._path(session_id),
+                "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+            )
+            if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+                self.prune()
+
+    def prune(self):
+        """Queue removal of old session files (sessions in memory are kept)"""
+        if self._writer is None or not (self.max_age or self.max_files):
+            return
+        self._pruned_at = time.monotonic()
+        keep = frozenset(self._path(session_id) for session_id in self._sessions)
+        self._writer.prune(self.max_age, self.max_files, keep)
+
+    def clear(self, session_id: str = DEFAULT_SESSION):
+        """Clear a session's history in memory and on disk"""
+        self._sessions.pop(session_id, None)
+        if self._writer is not None:
+            self._writer.truncate(self._path(session_id))
+
+    def close(self):
+        """Flush pending writes"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get resident session count and load/eviction counters"""
+        return {"resident": len(self._sessions), **self.stats}
@@ -1,8 +1,12 @@
 """Local AI Client (LM Studio compatible)"""
 
+import json
 import httpx
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
+
+from .prompt_cache import PromptCacheStats
+from .tools import ToolCall, ToolCallAccumulator, parse_arguments, to_openai_tools
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +23,9 @@ class LocalAIClient:
         model: str = "local-model",
         timeout: int = 30,
         max_tokens: int = 2000,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        cache_prompt: bool = True,
+        slot_id: Optional[int] = None
     ):
         """Initialize local AI client
 
@@ -29,12 +35,19 @@ class LocalAIClient:
             timeout: Request timeout in seconds
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature (0.0-1.0)
+            cache_prompt: Ask the server to reuse the KV cache of the
+                longest matching prompt prefix (llama.cpp "cache_prompt")
+            slot_id: Pin requests to one server slot so its cached prefix
+                is reused (llama.cpp "id_slot"; None = server picks)
         """
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = timeout
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.cache_prompt = cache_prompt
+        self.slot_id = slot_id
+        self.cache_stats = PromptCacheStats("local")
 
         self.client = httpx.AsyncClient(timeout=timeout)
         logger.info(f"Initialized LocalAIClient: {base_url}")
@@ -61,7 +74,9 @@ class LocalAIClient:
         self,
         messages: List[Dict[str, str]],
         max_tokens: Optional[int] = None,
-        temperature: Optional[float] = None
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
     ) -> str:
         """Get chat completion from local model
 
@@ -69,6 +84,8 @@ class LocalAIClient:
             messages: List of message dicts [{"role": "user", "content": "..."}]
             max_tokens: Override max_tokens
             temperature: Override temperature
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls made by the model
 
         Returns:
             Model response text
@@ -78,13 +95,7 @@ class LocalAIClient:
         """
         url = f"{self.base_url}/chat/completions"
 
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "max_tokens": max_tokens or self.max_tokens,
-            "temperature": temperature or self.temperature,
-            "stream": False
-        }
+        payload = self._build_payload(messages, max_tokens, temperature, stream=False, tools=tools)
 
         logger.debug(f"Sending chat completion request: {len(messages)} messages")
 
@@ -93,7 +104,17 @@ class LocalAIClient:
             response.raise_for_status()
 
             data = response.json()
-            content = data["choices"][0]["message"]["content"]
+            message = data["choices"][0]["message"]
+            # Content is null when the model only calls tools
+            content = message.get("content") or ""
+            self._record_usage(data)
+
+            if tool_calls is not None:
+                for call in message.get("tool_calls") or []:
+                    tool_calls.append(ToolCall(
+                        name=call["function"]["name"],
+                        arguments=parse_arguments(call["function"].get("arguments"))
+                    ))
 
             logger.debug(f"Received response: {content[:100]}...")
             return content
@@ -108,6 +129,119 @@ class LocalAIClient:
             logger.error(f"Unexpected error: {e}")
             raise
 
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
+    ) -> AsyncIterator[str]:
+        """Stream chat completion from local model
+
+        Args:
+            messages: List of message dicts [{"role": "user", "content": "..."}]
+            max_tokens: Override max_tokens
+            temperature: Override temperature
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls once the stream ends
+
+        Yields:
+            Response text deltas as they are generated
+
+        Raises:
+            Exception if request fails
+        """
+        url = f"{self.base_url}/chat/completions"
+
+        payload = self._build_payload(messages, max_tokens, temperature, stream=True, tools=tools)
+        calls = ToolCallAccumulator()
+
+        logger.debug(f"Sending streaming chat completion request: {len(messages)} messages")
+
+        try:
+            async with self.client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+
+                # Server-sent events: "data: {chunk}" lines, terminated by "data: [DONE]"
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    # Final chunk carries usage and may have no choices
+                    self._record_usage(chunk)
+                    if not chunk.get("choices"):
+                        continue
+                    delta = chunk["choices"][0].get("delta", {})
+                    for call in delta.get("tool_calls") or []:
+                        function = call.get("function", {})
+                        calls.add(call.get("index", 0), function.get("name"), function.get("arguments"))
+                    if delta.get("content"):
+                        yield delta["content"]
+
+            if tool_calls is not None:
+                tool_calls.extend(calls.calls())
+
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error: {e}")
+            raise Exception(f"Local AI request failed: {e}")
+        except (KeyError, IndexError, json.JSONDecodeError) as e:
+            logger.error(f"Invalid stream format: {e}")
+            raise Exception(f"Invalid response from local AI: {e}")
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        stream: bool,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Build chat completion request body with prefix cache hints"""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": temperature or self.temperature,
+            "stream": stream
+        }
+
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        if tools:
+            payload["tools"] = to_openai_tools(tools)
+        if self.cache_prompt:
+            payload["cache_prompt"] = True
+        if self.slot_id is not None:
+            payload["id_slot"] = self.slot_id
+
+        return payload
+
+    def _record_usage(self, data: Dict[str, Any]):
+        """Record prompt/cached token counts if the server reported them
+
+        OpenAI-style servers (LM Studio) report usage.prompt_tokens_details;
+        llama.cpp reports timings.cache_n / timings.prompt_n.
+        """
+        usage = data.get("usage")
+        timings = data.get("timings")
+
+        if usage and usage.get("prompt_tokens") is not None:
+            details = usage.get("prompt_tokens_details") or {}
+            cached = details.get("cached_tokens")
+            if cached is None and timings:
+                cached = timings.get("cache_n")
+            self.cache_stats.record(usage["prompt_tokens"], cached)
+            self.cache_stats.record_completion(usage.get("completion_tokens"))
+        elif timings and "prompt_n" in timings:
+            cached = timings.get("cache_n", 0)
+            self.cache_stats.record(timings["prompt_n"] + cached, cached)
+            self.cache_stats.record_completion(timings.get("predicted_n"))
+
     async def simple_prompt(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Simple prompt completion
 
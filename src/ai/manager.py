@@ -1,12 +1,21 @@
 """AI Manager - Manages AI model selection and fallback"""
 
+import json
+import time
+import asyncio
+import inspect
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Tuple, Union
 from enum import Enum
 
 from .local_client import LocalAIClient
 from .online_clients import OpenAIClient, AnthropicClient, GoogleClient
 from .prompt_templates import PromptTemplates
+from .router import ProviderRouter
+from .history import ConversationStore, DEFAULT_SESSION
+from .prompt_builder import PromptBuilder
+from .response_cache import ResponseCache, CacheKey
+from .tools import ROBOT_TOOLS, ToolCall
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +28,26 @@ class ModelType(Enum):
     GOOGLE = "google"
 
 
+# Reported as the model for answers served from the response cache
+RESPONSE_CACHE_MODEL = "cache"
+
+
 class AIManager:
-    """Manages AI models and handles fallback"""
+    """Manages AI models and routes requests between them
 
-    def __init__(self, config):
+    `current_model` is the user's preferred provider. Each request is
+    routed by ProviderRouter to the best healthy provider in its allowed
+    set; failures open per-provider circuit breakers instead of changing
+    the preference.
+    """
+
+    def __init__(self, config, history_config=None):
         """Initialize AI manager
 
         Args:
             config: AIConfig object from settings
+            history_config: AdvancedConfig object with history settings
+                (in-memory only with defaults if omitted)
         """
         self.config = config
         self.current_model = ModelType(config.default_model)
@@ -39,43 +60,97 @@ class AIManager:
         self.anthropic_client: Optional[AnthropicClient] = None
         self.google_client: Optional[GoogleClient] = None
 
-        # Conversation history
-        self.conversation_history: List[Dict[str, str]] = []
-        self.max_history = 20
+        # Conversation history per session
+        if history_config is not None:
+            self.history = ConversationStore(
+                history_length=history_config.history_length,
+                max_sessions=history_config.history_max_sessions,
+                history_dir=history_config.history_dir,
+                persist=history_config.conversation_history,
+                max_file_bytes=history_config.history_max_file_bytes,
+                max_age=history_config.history_max_age_days * 86400,
+                max_files=history_config.history_max_files
+            )
+        else:
+            self.history = ConversationStore(persist=False)
+
+        # Fits history into ai.prompt_token_budget, summarizing old turns
+        self.prompt_builder = PromptBuilder(
+            token_budget=config.prompt_token_budget,
+            summarizer=self._summarize if config.summarize_history else None,
+            language=self.language
+        )
+
+        # Streaming stats per provider: count, total/last time-to-first-token
+        self.stream_stats: Dict[str, Dict[str, float]] = {}
+
+        # Hedged requests: budget tokens accrue per request, a hedge spends one
+        self.hedge_stats = {"requests": 0, "fired": 0, "won": 0, "over_budget": 0}
+        self._hedge_tokens = 1.0
+
+        # Answers to repeated questions, keyed by message and robot state bucket
+        self.response_cache: Optional[ResponseCache] = None
+        if config.response_cache_enabled:
+            self.response_cache = ResponseCache(
+                max_size=config.response_cache_size,
+                ttl=config.response_cache_ttl
+            )
+
+        # Latency/health tracking and circuit breakers per provider
+        self.router = ProviderRouter(
+            providers=[],
+            ewma_alpha=config.router_ewma_alpha,
+            failure_threshold=config.router_failure_threshold,
+            open_seconds=config.router_open_seconds,
+            probe_interval=config.router_probe_interval,
+            preference_bias=config.router_preference_bias
+        )
 
         logger.info(f"Initialized AIManager (default: {self.current_model.value})")
 
     async def initialize(self):
-        """Initialize AI clients based on configuration"""
+        """Initialize AI clients based on configuration
 
-        # Initialize local client
+        The local server's health check and the creation of online clients
+        (in a worker thread, as importing a vendor SDK takes a while) run
+        concurrently, so one slow provider does not hold up the others.
+        """
+        await asyncio.gather(self._initialize_local(), self._initialize_online())
+        self.router.start(self.check_provider)
+
+    async def _initialize_local(self):
+        """Create the local client once its server has been checked"""
         if self.config.local.enabled:
             try:
-                self.local_client = LocalAIClient(
+                client = LocalAIClient(
                     base_url=self.config.local.base_url,
                     model=self.config.local.model,
                     timeout=self.config.local.timeout,
                     max_tokens=self.config.local.max_tokens,
-                    temperature=self.config.local.temperature
+                    temperature=self.config.local.temperature,
+                    cache_prompt=self.config.local.cache_prompt,
+                    slot_id=self.config.local.slot_id
                 )
-                # Check if local server is available
-                is_healthy = await self.local_client.check_health()
+                # Check if local server is available; requests are only
+                # routed to it after the check
+                is_healthy = await client.check_health()
+                self.local_client = client
                 if is_healthy:
                     logger.info("Local AI client initialized and healthy")
                 else:
+                    # Routed around until a background probe finds it healthy
                     logger.warning("Local AI client not responding")
-                    if self.current_model == ModelType.LOCAL and self.auto_fallback:
-                        logger.info("Switching to online model")
-                        self.current_model = ModelType(self.config.online.default_provider)
+                    self.router.open(ModelType.LOCAL.value)
             except Exception as e:
                 logger.error(f"Failed to initialize local AI client: {e}")
-                if self.current_model == ModelType.LOCAL and self.auto_fallback:
-                    self.current_model = ModelType(self.config.online.default_provider)
 
+    async def _initialize_online(self):
+        """Create clients of enabled online providers"""
         # Initialize OpenAI client
         if self.config.online.openai.enabled and self.config.online.openai.api_key:
             try:
-                self.openai_client = OpenAIClient(
+                self.openai_client = await asyncio.to_thread(
+                    OpenAIClient,
                     api_key=self.config.online.openai.api_key,
                     model=self.config.online.openai.model,
                     base_url=self.config.online.openai.base_url,
@@ -89,7 +164,8 @@ class AIManager:
         # Initialize Anthropic client
         if self.config.online.anthropic.enabled and self.config.online.anthropic.api_key:
             try:
-                self.anthropic_client = AnthropicClient(
+                self.anthropic_client = await asyncio.to_thread(
+                    AnthropicClient,
                     api_key=self.config.online.anthropic.api_key,
                     model=self.config.online.anthropic.model,
                     max_tokens=self.config.online.anthropic.max_tokens,
@@ -102,7 +178,8 @@ class AIManager:
         # Initialize Google client
         if self.config.online.google.enabled and self.config.online.google.api_key:
             try:
-                self.google_client = GoogleClient(
+                self.google_client = await asyncio.to_thread(
+                    GoogleClient,
                     api_key=self.config.online.google.api_key,
                     model=self.config.online.google.model,
                     max_tokens=self.config.online.google.max_tokens,
@@ -112,8 +189,24 @@ class AIManager:
             except Exception as e:
                 logger.error(f"Failed to initialize Google client: {e}")
 
+    async def check_provider(self, provider: str) -> bool:
+        """Health check of one provider (router probes, /health)"""
+        model = ModelType(provider)
+        if model == ModelType.LOCAL:
+            client = self.local_client
+        elif model == ModelType.OPENAI:
+            client = self.openai_client
+        elif model == ModelType.ANTHROPIC:
+            client = self.anthropic_client
+        else:
+            client = self.google_client
+        return client is not None and await client.check_health()
+
     async def close(self):
         """Close all AI clients"""
+        await self.router.stop()
+        await self.prompt_builder.close()
+        await asyncio.to_thread(self.history.close)
         if self.local_client:
             await self.local_client.close()
         if self.openai_client:
@@ -138,7 +231,7 @@ class AIManager:
             raise ValueError(f"Invalid model type: {model_type}")
 
     def get_current_model(self) -> str:
-        """Get current model type
+        """Get current (preferred) model type
 
         Returns:
             Current model type as string
@@ -148,74 +241,480 @@ class AIManager:
     async def chat(
         self,
         message: str,
-        context: Optional[Dict[str, Any]] = None,
-        add_to_history: bool = True
+        context: Union[Dict[str, Any], Awaitable, None] = None,
+        add_to_history: bool = True,
+        model: Optional[str] = None,
+        allowed_models: Optional[List[str]] = None,
+        info: Optional[Dict[str, Any]] = None,
+        session_id: str = DEFAULT_SESSION
     ) -> str:
         """Send chat message to AI
 
         Args:
             message: User message
-            context: Optional context (robot status, rooms, etc.)
+            context: Optional context (robot status, rooms, etc.), or an
+                awaitable resolving to it
             add_to_history: Whether to add to conversation history
+            model: Preferred provider for this request (defaults to current model)
+            allowed_models: Providers this request may be routed to
+                (defaults to all available with auto_fallback, else only
+                the preferred one)
+            info: Optional dict filled with the "model" that answered and
+                the robot "tool_calls" it made
+            session_id: Conversation session
 
         Returns:
             AI response
         """
-        # Get system prompt
-        system_prompt = PromptTemplates.get_system_prompt(self.language)
-
-        # Format message with context
-        formatted_message = PromptTemplates.format_user_message(message, context)
+        if self.config.hedge_enabled:
+            # Hedging races on first token, which needs the streaming path
+            return "".join([
+                delta async for delta in self.chat_stream(
+                    message, context, add_to_history, model, allowed_models, info, session_id
+                )
+            ])
 
-        # Build messages
-        messages = [{"role": "system", "content": system_prompt}]
+        if inspect.isawaitable(context):
+            context = await context
 
-        # Add conversation history
-        messages.extend(self.conversation_history[-self.max_history:])
+        cache_key, cached = await self._cache_lookup(message, context, info, model, allowed_models, session_id)
+        if cached is not None:
+            if add_to_history:
+                await self.history.append(session_id, message, cached)
+            return cached
 
-        # Add current message
-        messages.append({"role": "user", "content": formatted_message})
+        candidates = self._candidates(model, allowed_models)
+        messages = await self._build_messages(message, context, session_id)
 
-        # Try to get response from current model
+        # Try providers from best to worst
         response = None
-        fallback_attempted = False
+        last_error = None
 
-        while response is None:
+        for candidate in candidates:
+            start = time.perf_counter()
+            tool_calls: List[ToolCall] = []
             try:
-                response = await self._get_completion(messages)
-                break
+                response = await self._get_completion(messages, candidate, self._tools(), tool_calls)
             except Exception as e:
-                logger.error(f"Failed to get response from {self.current_model.value}: {e}")
-
-                # Try fallback if enabled
-                if self.auto_fallback and not fallback_attempted:
-                    logger.info("Attempting fallback to alternative model")
-                    if self.current_model == ModelType.LOCAL:
-                        # Fallback to online
-                        self.current_model = ModelType(self.config.online.default_provider)
-                    else:
-                        # Try local if available
-                        if self.local_client:
-                            self.current_model = ModelType.LOCAL
-                        else:
-                            raise Exception("All models failed")
+                logger.error(f"Failed to get response from {candidate.value}: {e}")
+                self.router.record_failure(candidate.value)
+                last_error = e
+                continue
 
-                    fallback_attempted = True
-                else:
-                    raise Exception(f"AI request failed: {e}")
+            self.router.record_success(candidate.value, (time.perf_counter() - start) * 1000)
+            if info is not None:
+                info["model"] = candidate.value
+                info["tool_calls"] = tool_calls
+            break
+
+        if response is None:
+            raise Exception(f"AI request failed: {last_error}")
+
+        # Answers that act on the robot must reach the model every time
+        if cache_key is not None and not tool_calls:
+            self.response_cache.put(cache_key, response)
 
         # Add to history if requested
         if add_to_history:
-            self.conversation_history.append({"role": "user", "content": message})
-            self.conversation_history.append({"role": "assistant", "content": response})
+            await self.history.append(session_id, message, self._history_text(response, tool_calls))
 
         return response
 
-    async def _get_completion(self, messages: List[Dict[str, str]]) -> str:
-        """Get completion from current model
+    async def chat_stream(
+        self,
+        message: str,
+        context: Union[Dict[str, Any], Awaitable, None] = None,
+        add_to_history: bool = True,
+        model: Optional[str] = None,
+        allowed_models: Optional[List[str]] = None,
+        info: Optional[Dict[str, Any]] = None,
+        session_id: str = DEFAULT_SESSION
+    ) -> AsyncIterator[str]:
+        """Send chat message to AI and stream the response
+
+        Moves on to the next provider only if one fails before producing
+        its first token. With hedging enabled, the next provider is started
+        in parallel if no token arrives within ai.hedge_delay seconds.
+
+        Args:
+            message: User message
+            context: Optional context (robot status, rooms, etc.), or an
+                awaitable resolving to it
+            add_to_history: Whether to add to conversation history
+            model: Preferred provider for this request (defaults to current model)
+            allowed_models: Providers this request may be routed to
+            info: Optional dict filled with the "model" that answered and
+                the robot "tool_calls" it made (once the stream ends)
+            session_id: Conversation session
+
+        Yields:
+            Response text deltas
+        """
+        if inspect.isawaitable(context):
+            context = await context
+
+        cache_key, cached = await self._cache_lookup(message, context, info, model, allowed_models, session_id)
+        if cached is not None:
+            yield cached
+            if add_to_history:
+                await self.history.append(session_id, message, cached)
+            return
+
+        candidates = self._candidates(model, allowed_models)
+        messages = await self._build_messages(message, context, session_id)
+        chunks: List[str] = []
+        failed: set = set()
+        last_error = None
+        info = info if info is not None else {}
+
+        for i, candidate in enumerate(candidates):
+            if candidate in failed:
+                continue
+            backup = self._hedge_backup(candidate, [c for c in candidates[i + 1:] if c not in failed])
+            try:
+                async for delta in self._hedged_stream(messages, candidate, backup, failed, info):
+                    chunks.append(delta)
+                    yield delta
+                break
+            except Exception as e:
+                if chunks:
+                    raise
+                logger.error(f"Failed to stream response from {candidate.value}: {e}")
+                last_error = e
+        else:
+            raise Exception(f"AI request failed: {last_error}")
+
+        if cache_key is not None and not info.get("tool_calls"):
+            self.response_cache.put(cache_key, "".join(chunks))
+
+        if add_to_history:
+            await self.history.append(
+                session_id, message, self._history_text("".join(chunks), info.get("tool_calls"))
+            )
+
+    @staticmethod
+    def _history_text(response: str, tool_calls: Optional[List[ToolCall]]) -> str:
+        """Text stored in history for a response
+
+        Responses consisting only of tool calls are recorded as a list of
+        the calls, so later turns know what was done.
+        """
+        if response or not tool_calls:
+            return response
+        return "[" + ", ".join(
+            f"{call.name}({json.dumps(call.arguments, ensure_ascii=False)})" for call in tool_calls
+        ) + "]"
+
+    async def _cache_lookup(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]],
+        info: Optional[Dict[str, Any]],
+        model: Optional[str] = None,
+        allowed_models: Optional[List[str]] = None,
+        session_id: str = DEFAULT_SESSION
+    ) -> Tuple[Optional[CacheKey], Optional[str]]:
+        """Look up a cached response for message
+
+        Answers are shared only between requests with the same provider
+        restriction, and across sessions only while the session has no
+        history yet (otherwise it is part of the prompt).
+
+        Returns:
+            Tuple of (cache key or None if uncacheable, cached response or None)
+        """
+        if self.response_cache is None:
+            return None, None
+
+        if allowed_models:
+            scope = tuple(sorted(allowed_models))
+        elif self.auto_fallback:
+            scope = ("auto",)
+        else:
+            scope = (model or self.current_model.value,)
+        history = await self.history.get(session_id)
+        key = self.response_cache.make_key(
+            message, self.language, context, scope, session_id if history else ""
+        )
+        if key is None:
+            return None, None
+
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logger.info(f"Response cache hit: {key[0][:50]}")
+            if info is not None:
+                info["model"] = RESPONSE_CACHE_MODEL
+        return key, cached
+
+    def _candidates(
+        self,
+        model: Optional[str],
+        allowed_models: Optional[List[str]]
+    ) -> List[ModelType]:
+        """Rank the providers a request may use, best first
+
+        Raises:
+            Exception if no allowed provider is available
+        """
+        preferred = model or self.current_model.value
+        available = self.get_available_models()
+
+        if allowed_models:
+            allowed = [m for m in allowed_models if m in available]
+        elif self.auto_fallback:
+            allowed = available
+        else:
+            allowed = [preferred] if preferred in available else []
+
+        if not allowed:
+            raise Exception(f"{preferred} AI client not initialized")
+
+        return [ModelType(name) for name in self.router.rank(allowed, preferred)]
+
+    async def _hedged_stream(
+        self,
+        messages: List[Dict[str, str]],
+        primary: ModelType,
+        backup: Optional[ModelType],
+        failed: set,
+        info: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream from primary, hedging with backup if it is slow
+
+        If primary produces no token within ai.hedge_delay, backup is
+        started in parallel. Whichever yields a first token first wins and
+        the other is cancelled. Providers that fail are added to failed.
+        """
+        self.hedge_stats["requests"] += 1
+        self._hedge_tokens = min(1.0, self._hedge_tokens + self.config.hedge_budget)
+
+        start = time.perf_counter()
+        primary_task = asyncio.create_task(self._first_delta(primary, messages))
+        tasks = {primary_task: primary}
+
+        if self.config.hedge_enabled and backup is not None:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.config.hedge_delay)
+            if not done:
+                if self._hedge_tokens >= 1.0:
+                    self._hedge_tokens -= 1.0
+                    self.hedge_stats["fired"] += 1
+                    logger.info(f"No token from {primary.value} after {self.config.hedge_delay}s, "
+                                f"hedging with {backup.value}")
+                    tasks[asyncio.create_task(self._first_delta(backup, messages))] = backup
+                else:
+                    self.hedge_stats["over_budget"] += 1
+
+        winner = None
+        error = None
+        pending = set(tasks)
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both finish in the same step
+                for task in sorted(done, key=lambda t: tasks[t] != primary):
+                    if task.exception() is None and winner is None:
+                        winner = task
+                    elif task.exception() is not None:
+                        error = task.exception()
+                        failed.add(tasks[task])
+                        self.router.record_failure(tasks[task].value)
+                        logger.warning(f"{tasks[task].value} failed: {error}")
+                    else:
+                        await task.result()[0].aclose()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if winner is None:
+            raise error
+
+        provider = tasks[winner]
+        if provider != primary:
+            self.hedge_stats["won"] += 1
+            logger.info(f"Hedge won: {provider.value} answered before {primary.value}")
+        if info is not None:
+            info["model"] = provider.value
+
+        stream, first, tool_calls = winner.result()
+        try:
+            if first:
+                yield first
+            async for delta in stream:
+                yield delta
+        except GeneratorExit:
+            raise
+        except Exception:
+            self.router.record_failure(provider.value)
+            raise
+
+        self.router.record_success(provider.value, (time.perf_counter() - start) * 1000)
+        if info is not None:
+            info["tool_calls"] = tool_calls
+
+    async def _first_delta(self, model: ModelType, messages: List[Dict[str, str]]):
+        """Start streaming from model and wait for its first delta
+
+        Returns:
+            Tuple of (stream iterator positioned after first delta, first
+            delta, list receiving the model's tool calls when the stream ends)
+        """
+        start = time.perf_counter()
+        tool_calls: List[ToolCall] = []
+        stream = self._get_completion_stream(messages, model, self._tools(), tool_calls).__aiter__()
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            # Nothing but tool calls
+            first = ""
+        except BaseException:
+            await stream.aclose()
+            raise
+        self._record_ttft(model.value, (time.perf_counter() - start) * 1000)
+        return stream, first, tool_calls
+
+    def _tools(self) -> Optional[List[Dict[str, Any]]]:
+        """Robot tools offered to the model, if enabled"""
+        return ROBOT_TOOLS if self.config.tools_enabled else None
+
+    def _hedge_backup(self, primary: ModelType, remaining: List[ModelType]) -> Optional[ModelType]:
+        """Pick the backup provider for a hedged request
+
+        Uses ai.hedge_provider if set, otherwise the next-best ranked provider.
+        """
+        if not self.config.hedge_enabled:
+            return None
+
+        if self.config.hedge_provider:
+            backup = ModelType(self.config.hedge_provider)
+            if backup == primary or backup not in remaining:
+                return None
+            return backup
+
+        return remaining[0] if remaining else None
+
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """Get hedged request statistics
+
+        Returns:
+            Dict with request/fired/won/over_budget counts and fire/win rates
+        """
+        stats = dict(self.hedge_stats)
+        stats["fire_rate"] = round(stats["fired"] / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["win_rate"] = round(stats["won"] / stats["fired"], 3) if stats["fired"] else 0.0
+        return stats
+
+    def get_router_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-provider latency, error rate and circuit breaker state"""
+        return self.router.get_stats()
+
+    async def _build_messages(
+        self,
+        message: str,
+        context: Union[Dict[str, Any], Awaitable, None] = None,
+        session_id: str = DEFAULT_SESSION
+    ) -> List[Dict[str, str]]:
+        """Build model input from system prompt, history and the new message
+
+        Context may be an awaitable still being fetched; it is awaited only
+        once everything that does not depend on it has been assembled.
+        """
+        # Get system prompt
+        system_prompt = PromptTemplates.get_system_prompt(self.language)
+
+        # Get conversation history
+        history = await self.history.get(session_id)
+
+        # Format message with context
+        if inspect.isawaitable(context):
+            context = await context
+        formatted_message = PromptTemplates.format_user_message(message, context)
+
+        # Fit everything into the token budget
+        return self.prompt_builder.build(system_prompt, history, formatted_message, session_id)
+
+    async def _summarize(self, messages: List[Dict[str, str]], previous: Optional[str]) -> str:
+        """Summarize old conversation turns (runs in the background)
+
+        Args:
+            messages: Turns to fold into the summary
+            previous: Current summary to extend, if any
+
+        Returns:
+            New summary text
+        """
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        if previous:
+            transcript = f"{PromptTemplates.format_summary(previous, self.language)}\n\n{transcript}"
+
+        prompt = [
+            {"role": "system", "content": PromptTemplates.get_summary_prompt(self.language)},
+            {"role": "user", "content": transcript}
+        ]
+        return await self._get_completion(prompt, self._candidates(None, None)[0])
+
+    def _record_ttft(self, provider: str, ttft_ms: float):
+        """Record time-to-first-token for a streamed response"""
+        self.router.record_ttft(provider, ttft_ms)
+        stats = self.stream_stats.setdefault(provider, {"count": 0, "total_ttft_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ttft_ms"] += ttft_ms
+        stats["last_ttft_ms"] = ttft_ms
+        logger.info(f"Time to first token ({provider}): {ttft_ms:.0f} ms")
+
+    def get_stream_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get time-to-first-token statistics per provider
+
+        Returns:
+            Dict of provider -> {count, avg_ttft_ms, last_ttft_ms}
+        """
+        return {
+            provider: {
+                "count": stats["count"],
+                "avg_ttft_ms": round(stats["total_ttft_ms"] / stats["count"], 1),
+                "last_ttft_ms": round(stats["last_ttft_ms"], 1),
+            }
+            for provider, stats in self.stream_stats.items()
+        }
+
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        """Get response cache hit/miss counters and hit rate"""
+        if self.response_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.get_stats()}
+
+    def get_prompt_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get prompt/cached token counts reported by each provider
+
+        Returns:
+            Dict of provider -> {requests, prompt_tokens, cached_tokens,
+            cache_write_tokens, cached_ratio}
+        """
+        clients = {
+            "local": self.local_client,
+            "openai": self.openai_client,
+            "anthropic": self.anthropic_client,
+            "google": self.google_client,
+        }
+        return {
+            name: client.cache_stats.as_dict()
+            for name, client in clients.items()
+            if client is not None and hasattr(client, "cache_stats")
+        }
+
+    async def _get_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[ModelType] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
+    ) -> str:
+        """Get completion from a model
 
         Args:
             messages: Message history
+            model: Model to use (defaults to current model)
+            tools: Tool definitions the model may call
+            tool_calls: List that receives the model's tool calls
 
         Returns:
             AI response
@@ -223,41 +722,97 @@ class AIManager:
         Raises:
             Exception if request fails
         """
-        if self.current_model == ModelType.LOCAL:
+        model = model or self.current_model
+
+        if model == ModelType.LOCAL:
+            if not self.local_client:
+                raise Exception("Local AI client not initialized")
+            return await self.local_client.chat_completion(messages, tools=tools, tool_calls=tool_calls)
+
+        elif model == ModelType.OPENAI:
+            if not self.openai_client:
+                raise Exception("OpenAI client not initialized")
+            return await self.openai_client.chat_completion(messages, tools=tools, tool_calls=tool_calls)
+
+        elif model == ModelType.ANTHROPIC:
+            if not self.anthropic_client:
+                raise Exception("Anthropic client not initialized")
+            return await self.anthropic_client.chat_completion(messages, tools=tools, tool_calls=tool_calls)
+
+        elif model == ModelType.GOOGLE:
+            if not self.google_client:
+                raise Exception("Google client not initialized")
+            return await self.google_client.chat_completion(messages, tools=tools, tool_calls=tool_calls)
+
+        else:
+            raise Exception(f"Unknown model type: {model}")
+
+    def _get_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[ModelType] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
+    ) -> AsyncIterator[str]:
+        """Get streaming completion from a model
+
+        Args:
+            messages: Message history
+            model: Model to use (defaults to current model)
+            tools: Tool definitions the model may call
+            tool_calls: List that receives the model's tool calls
+
+        Returns:
+            Async iterator of response deltas
+
+        Raises:
+            Exception if the model is unavailable
+        """
+        model = model or self.current_model
+
+        if model == ModelType.LOCAL:
             if not self.local_client:
                 raise Exception("Local AI client not initialized")
-            return await self.local_client.chat_completion(messages)
+            return self.local_client.chat_completion_stream(messages, tools=tools, tool_calls=tool_calls)
 
-        elif self.current_model == ModelType.OPENAI:
+        elif model == ModelType.OPENAI:
             if not self.openai_client:
                 raise Exception("OpenAI client not initialized")
-            return await self.openai_client.chat_completion(messages)
+            return self.openai_client.chat_completion_stream(messages, tools=tools, tool_calls=tool_calls)
 
-        elif self.current_model == ModelType.ANTHROPIC:
+        elif model == ModelType.ANTHROPIC:
             if not self.anthropic_client:
                 raise Exception("Anthropic client not initialized")
-            return await self.anthropic_client.chat_completion(messages)
+            return self.anthropic_client.chat_completion_stream(messages, tools=tools, tool_calls=tool_calls)
 
-        elif self.current_model == ModelType.GOOGLE:
+        elif model == ModelType.GOOGLE:
             if not self.google_client:
                 raise Exception("Google client not initialized")
-            return await self.google_client.chat_completion(messages)
+            return self.google_client.chat_completion_stream(messages, tools=tools, tool_calls=tool_calls)
 
         else:
-            raise Exception(f"Unknown model type: {self.current_model}")
+            raise Exception(f"Unknown model type: {model}")
+
+    def clear_history(self, session_id: str = DEFAULT_SESSION):
+        """Clear conversation history
 
-    def clear_history(self):
-        """Clear conversation history"""
-        self.conversation_history = []
-        logger.info("Conversation history cleared")
+        Args:
+            session_id: Conversation session
+        """
+        self.history.clear(session_id)
+        self.prompt_builder.forget(session_id)
+        logger.info(f"Conversation history cleared ({session_id})")
 
-    def get_history(self) -> List[Dict[str, str]]:
+    async def get_history(self, session_id: str = DEFAULT_SESSION) -> List[Dict[str, str]]:
         """Get conversation history
 
+        Args:
+            session_id: Conversation session
+
         Returns:
             List of message dicts
         """
-        return self.conversation_history.copy()
+        return list(await self.history.get(session_id))
 
     def get_available_models(self) -> List[str]:
         """Get list of available models
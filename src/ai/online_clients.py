@@ -1,13 +1,24 @@
-"""Online AI Clients (OpenAI, Anthropic, Google)"""
+"""Online AI Clients (OpenAI, Anthropic, Google)
 
+Vendor SDKs are imported when a client is created, so only the SDKs of
+enabled providers are loaded (together they take seconds to import).
+"""
+
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from openai import AsyncOpenAI
-from anthropic import AsyncAnthropic
-import google.generativeai as genai
+from typing import List, Dict, Optional, AsyncIterator, Any
+
+from .prompt_cache import PromptCacheStats
+from .tools import (
+    ToolCall, ToolCallAccumulator, parse_arguments,
+    to_openai_tools, to_anthropic_tools, to_gemini_tools
+)
 
 logger = logging.getLogger(__name__)
 
+# Anthropic cache breakpoint: everything up to and including the block is cached
+CACHE_CONTROL = {"type": "ephemeral"}
+
 
 class OpenAIClient:
     """Client for OpenAI API (GPT-4, GPT-3.5)"""
@@ -33,22 +44,38 @@ class OpenAIClient:
         self.max_tokens = max_tokens
         self.temperature = temperature
 
+        from openai import AsyncOpenAI
+
         if base_url:
             self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
         else:
             self.client = AsyncOpenAI(api_key=api_key)
 
+        # OpenAI caches long prompt prefixes automatically and reports hits
+        self.cache_stats = PromptCacheStats("openai")
+
         logger.info(f"Initialized OpenAIClient: {model}")
 
     async def close(self):
         """Close client"""
         await self.client.close()
 
+    async def check_health(self) -> bool:
+        """Check if the API is reachable (lists models, no tokens billed)"""
+        try:
+            await self.client.models.list()
+            return True
+        except Exception as e:
+            logger.error(f"OpenAI health check failed: {e}")
+            return False
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
         max_tokens: Optional[int] = None,
-        temperature: Optional[float] = None
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
     ) -> str:
         """Get chat completion
 
@@ -56,6 +83,8 @@ class OpenAIClient:
             messages: List of message dicts
             max_tokens: Override max_tokens
             temperature: Override temperature
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls made by the model
 
         Returns:
             Model response text
@@ -65,10 +94,21 @@ class OpenAIClient:
                 model=self.model,
                 messages=messages,
                 max_tokens=max_tokens or self.max_tokens,
-                temperature=temperature or self.temperature
+                temperature=temperature or self.temperature,
+                **({"tools": to_openai_tools(tools)} if tools else {})
             )
 
-            content = response.choices[0].message.content
+            message = response.choices[0].message
+            # Content is None when the model only calls tools
+            content = message.content or ""
+            self._record_usage(response.usage)
+
+            if tool_calls is not None:
+                for call in message.tool_calls or []:
+                    tool_calls.append(ToolCall(
+                        name=call.function.name,
+                        arguments=parse_arguments(call.function.arguments)
+                    ))
             logger.debug(f"OpenAI response: {content[:100]}...")
             return content
 
@@ -76,6 +116,68 @@ class OpenAIClient:
             logger.error(f"OpenAI error: {e}")
             raise Exception(f"OpenAI request failed: {e}")
 
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
+    ) -> AsyncIterator[str]:
+        """Stream chat completion
+
+        Args:
+            messages: List of message dicts
+            max_tokens: Override max_tokens
+            temperature: Override temperature
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls once the stream ends
+
+        Yields:
+            Response text deltas
+        """
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens or self.max_tokens,
+                temperature=temperature or self.temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                **({"tools": to_openai_tools(tools)} if tools else {})
+            )
+
+            calls = ToolCallAccumulator()
+            async for chunk in stream:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta
+                    for call in delta.tool_calls or []:
+                        function = call.function
+                        calls.add(
+                            call.index,
+                            function.name if function else None,
+                            function.arguments if function else None
+                        )
+                    if delta.content:
+                        yield delta.content
+                if getattr(chunk, "usage", None):
+                    self._record_usage(chunk.usage)
+
+            if tool_calls is not None:
+                tool_calls.extend(calls.calls())
+
+        except Exception as e:
+            logger.error(f"OpenAI error: {e}")
+            raise Exception(f"OpenAI request failed: {e}")
+
+    def _record_usage(self, usage):
+        """Record prompt and cached token counts from response usage"""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cache_stats.record(usage.prompt_tokens, getattr(details, "cached_tokens", None))
+        self.cache_stats.record_completion(getattr(usage, "completion_tokens", None))
+
     async def simple_prompt(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Simple prompt completion
 
@@ -117,7 +219,10 @@ class AnthropicClient:
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        from anthropic import AsyncAnthropic
+
         self.client = AsyncAnthropic(api_key=api_key)
+        self.cache_stats = PromptCacheStats("anthropic")
 
         logger.info(f"Initialized AnthropicClient: {model}")
 
@@ -125,12 +230,23 @@ class AnthropicClient:
         """Close client"""
         await self.client.close()
 
+    async def check_health(self) -> bool:
+        """Check if the API is reachable (lists models, no tokens billed)"""
+        try:
+            await self.client.models.list(limit=1)
+            return True
+        except Exception as e:
+            logger.error(f"Anthropic health check failed: {e}")
+            return False
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
     ) -> str:
         """Get chat completion
 
@@ -139,33 +255,25 @@ class AnthropicClient:
             max_tokens: Override max_tokens
             temperature: Override temperature
             system_prompt: System prompt (Claude uses separate parameter)
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls made by the model
 
         Returns:
             Model response text
         """
         try:
-            # Filter out system messages (Claude handles them separately)
-            user_messages = [m for m in messages if m["role"] != "system"]
-
-            # Extract system prompt if in messages
-            if not system_prompt:
-                system_messages = [m for m in messages if m["role"] == "system"]
-                if system_messages:
-                    system_prompt = system_messages[0]["content"]
-
-            kwargs = {
-                "model": self.model,
-                "messages": user_messages,
-                "max_tokens": max_tokens or self.max_tokens,
-                "temperature": temperature or self.temperature
-            }
-
-            if system_prompt:
-                kwargs["system"] = system_prompt
-
+            kwargs = self._build_request(messages, max_tokens, temperature, system_prompt, tools)
             response = await self.client.messages.create(**kwargs)
 
-            content = response.content[0].text
+            # Text and tool_use blocks may be mixed
+            content = "".join(block.text for block in response.content if block.type == "text")
+            self._record_usage(response.usage)
+            self.cache_stats.record_completion(response.usage.output_tokens)
+
+            if tool_calls is not None:
+                for block in response.content:
+                    if block.type == "tool_use":
+                        tool_calls.append(ToolCall(name=block.name, arguments=parse_arguments(block.input)))
             logger.debug(f"Claude response: {content[:100]}...")
             return content
 
@@ -173,6 +281,113 @@ class AnthropicClient:
             logger.error(f"Anthropic error: {e}")
             raise Exception(f"Anthropic request failed: {e}")
 
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
+    ) -> AsyncIterator[str]:
+        """Stream chat completion
+
+        Args:
+            messages: List of message dicts (without system message)
+            max_tokens: Override max_tokens
+            temperature: Override temperature
+            system_prompt: System prompt (Claude uses separate parameter)
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls once the stream ends
+
+        Yields:
+            Response text deltas
+        """
+        try:
+            kwargs = self._build_request(messages, max_tokens, temperature, system_prompt, tools)
+            stream = await self.client.messages.create(stream=True, **kwargs)
+
+            calls = ToolCallAccumulator()
+            async for event in stream:
+                if event.type == "content_block_delta":
+                    if getattr(event.delta, "text", None):
+                        yield event.delta.text
+                    elif getattr(event.delta, "partial_json", None):
+                        calls.add(event.index, arguments=event.delta.partial_json)
+                elif event.type == "content_block_start" and event.content_block.type == "tool_use":
+                    calls.add(event.index, name=event.content_block.name)
+                elif event.type == "message_start":
+                    self._record_usage(event.message.usage)
+                elif event.type == "message_delta" and getattr(event, "usage", None):
+                    # Final output token count
+                    self.cache_stats.record_completion(event.usage.output_tokens)
+
+            if tool_calls is not None:
+                tool_calls.extend(calls.calls())
+
+        except Exception as e:
+            logger.error(f"Anthropic error: {e}")
+            raise Exception(f"Anthropic request failed: {e}")
+
+    def _build_request(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        system_prompt: Optional[str],
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Build messages.create() arguments
+
+        Marks two cache breakpoints: after the static system prompt, and
+        after the last history turn, so the next request in the same
+        conversation reads the whole prefix from Anthropic's prompt cache.
+        """
+        # Filter out system messages (Claude handles them separately)
+        user_messages = [m for m in messages if m["role"] != "system"]
+
+        # Extract system prompt if in messages
+        if system_prompt:
+            system_texts = [system_prompt]
+        else:
+            system_texts = [m["content"] for m in messages if m["role"] == "system"]
+
+        if len(user_messages) > 1:
+            last_turn = user_messages[-2]
+            user_messages[-2] = {
+                "role": last_turn["role"],
+                "content": [{"type": "text", "text": last_turn["content"], "cache_control": CACHE_CONTROL}]
+            }
+
+        kwargs = {
+            "model": self.model,
+            "messages": user_messages,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": temperature or self.temperature
+        }
+
+        if system_texts:
+            system_blocks = [{"type": "text", "text": text} for text in system_texts]
+            system_blocks[0]["cache_control"] = CACHE_CONTROL
+            kwargs["system"] = system_blocks
+
+        if tools:
+            # Tools precede the system prompt in the cached prefix; they never change
+            kwargs["tools"] = to_anthropic_tools(tools)
+
+        return kwargs
+
+    def _record_usage(self, usage):
+        """Record prompt and cached token counts from response usage
+
+        input_tokens excludes tokens read from or written to the cache.
+        """
+        if usage is None:
+            return
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        self.cache_stats.record(usage.input_tokens + cache_read + cache_write, cache_read, cache_write)
+
     async def simple_prompt(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Simple prompt completion
 
@@ -209,8 +424,12 @@ class GoogleClient:
         self.max_tokens = max_tokens
         self.temperature = temperature
 
+        import google.generativeai as genai
+
+        self.genai = genai
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(model)
+        self.cache_stats = PromptCacheStats("google")
 
         logger.info(f"Initialized GoogleClient: {model}")
 
@@ -218,11 +437,22 @@ class GoogleClient:
         """Close client (no-op for Google)"""
         pass
 
+    async def check_health(self) -> bool:
+        """Check if the API is reachable (model lookup, no tokens billed)"""
+        try:
+            await asyncio.to_thread(self.genai.get_model, f"models/{self.model_name}")
+            return True
+        except Exception as e:
+            logger.error(f"Google health check failed: {e}")
+            return False
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
         max_tokens: Optional[int] = None,
-        temperature: Optional[float] = None
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
     ) -> str:
         """Get chat completion
 
@@ -230,49 +460,16 @@ class GoogleClient:
             messages: List of message dicts
             max_tokens: Override max_tokens
             temperature: Override temperature
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls made by the model
 
         Returns:
             Model response text
         """
         try:
-            # Convert messages to Gemini format
-            # System message becomes part of the first user message
-            system_prompt = ""
-            user_messages = []
-
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_prompt = msg["content"]
-                elif msg["role"] == "user":
-                    content = msg["content"]
-                    if system_prompt:
-                        content = f"{system_prompt}\n\n{content}"
-                        system_prompt = ""  # Only add once
-                    user_messages.append({"role": "user", "parts": [content]})
-                elif msg["role"] == "assistant":
-                    user_messages.append({"role": "model", "parts": [msg["content"]]})
-
-            # For single message, use generate_content
-            if len(user_messages) == 1:
-                response = await self.model.generate_content_async(
-                    user_messages[0]["parts"][0],
-                    generation_config={
-                        "max_output_tokens": max_tokens or self.max_tokens,
-                        "temperature": temperature or self.temperature
-                    }
-                )
-                content = response.text
-            else:
-                # For multi-turn, use chat
-                chat = self.model.start_chat(history=user_messages[:-1])
-                response = await chat.send_message_async(
-                    user_messages[-1]["parts"][0],
-                    generation_config={
-                        "max_output_tokens": max_tokens or self.max_tokens,
-                        "temperature": temperature or self.temperature
-                    }
-                )
-                content = response.text
+            response = await self._send(messages, max_tokens, temperature, stream=False, tools=tools)
+            content = self._collect_parts(response, tool_calls)
+            self._record_usage(response)
 
             logger.debug(f"Gemini response: {content[:100]}...")
             return content
@@ -281,6 +478,125 @@ class GoogleClient:
             logger.error(f"Google error: {e}")
             raise Exception(f"Google request failed: {e}")
 
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_calls: Optional[List[ToolCall]] = None
+    ) -> AsyncIterator[str]:
+        """Stream chat completion
+
+        Args:
+            messages: List of message dicts
+            max_tokens: Override max_tokens
+            temperature: Override temperature
+            tools: Tool definitions the model may call (see tools.ROBOT_TOOLS)
+            tool_calls: List that receives tool calls once the stream ends
+
+        Yields:
+            Response text deltas
+        """
+        try:
+            response = await self._send(messages, max_tokens, temperature, stream=True, tools=tools)
+            last_chunk = None
+            async for chunk in response:
+                last_chunk = chunk
+                text = self._collect_parts(chunk, tool_calls)
+                if text:
+                    yield text
+            # Usage is cumulative; the last chunk has the final counts
+            self._record_usage(last_chunk)
+
+        except Exception as e:
+            logger.error(f"Google error: {e}")
+            raise Exception(f"Google request failed: {e}")
+
+    async def _send(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        stream: bool,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Send messages to Gemini, returning the (possibly streaming) response"""
+        # Convert messages to Gemini format
+        # System messages become part of the first user message
+        system_prompt = ""
+        user_messages = []
+
+        for msg in messages:
+            if msg["role"] == "system":
+                system_prompt = f"{system_prompt}\n\n{msg['content']}" if system_prompt else msg["content"]
+            elif msg["role"] == "user":
+                content = msg["content"]
+                if system_prompt:
+                    content = f"{system_prompt}\n\n{content}"
+                    system_prompt = ""  # Only add once
+                user_messages.append({"role": "user", "parts": [content]})
+            elif msg["role"] == "assistant":
+                user_messages.append({"role": "model", "parts": [msg["content"]]})
+
+        generation_config = {
+            "max_output_tokens": max_tokens or self.max_tokens,
+            "temperature": temperature or self.temperature
+        }
+
+        tool_kwargs = {"tools": to_gemini_tools(tools)} if tools else {}
+
+        # For single message, use generate_content
+        if len(user_messages) == 1:
+            return await self.model.generate_content_async(
+                user_messages[0]["parts"][0],
+                generation_config=generation_config,
+                stream=stream,
+                **tool_kwargs
+            )
+
+        # For multi-turn, use chat
+        chat = self.model.start_chat(history=user_messages[:-1])
+        return await chat.send_message_async(
+            user_messages[-1]["parts"][0],
+            generation_config=generation_config,
+            stream=stream,
+            **tool_kwargs
+        )
+
+    @staticmethod
+    def _collect_parts(response, tool_calls: Optional[List[ToolCall]]) -> str:
+        """Extract text from a response or chunk, collecting function calls
+
+        response.text raises when a part is a function call, so parts are
+        read directly.
+        """
+        text = []
+        candidates = getattr(response, "candidates", None) or []
+        parts = candidates[0].content.parts if candidates else []
+        for part in parts:
+            function_call = getattr(part, "function_call", None)
+            if function_call is not None and function_call.name:
+                if tool_calls is not None:
+                    tool_calls.append(ToolCall(
+                        name=function_call.name,
+                        arguments=parse_arguments(function_call.args)
+                    ))
+            elif getattr(part, "text", None):
+                text.append(part.text)
+        return "".join(text)
+
+    def _record_usage(self, response):
+        """Record prompt and cached (implicit cache) token counts"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        self.cache_stats.record(
+            getattr(usage, "prompt_token_count", None),
+            getattr(usage, "cached_content_token_count", None)
+        )
+        self.cache_stats.record_completion(getattr(usage, "candidates_token_count", None))
+
     async def simple_prompt(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Simple prompt completion
 
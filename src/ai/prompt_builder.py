@@ -0,0 +1,218 @@
+"""Prompt Builder - Fits conversation history into a token budget"""
+
+import asyncio
+import logging
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .prompt_templates import PromptTemplates
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of chat formatting (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Share of the history budget left unsummarized after a compaction, so
+# the next few turns fit without summarizing again
+COMPACTION_TARGET = 0.5
+
+# (messages to summarize, previous summary or None) -> new summary
+Summarizer = Callable[[List[Dict[str, str]], Optional[str]], Awaitable[str]]
+
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """Estimate token count of text
+
+    Uses ~4 characters per token for ASCII and ~2.5 for other characters
+    (Polish diacritics split into more tokens). Good enough for budgeting
+    without loading a tokenizer; results are cached per message text.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return int((len(text) - non_ascii) / 4 + non_ascii / 2.5) + 1
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    """Estimate token count of a chat message including formatting overhead"""
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class SessionSummary:
+    """Running summary of a session's oldest turns"""
+    text: str
+    # Newest message already folded into the summary (matched by identity)
+    last_message: Dict[str, str]
+
+
+class PromptBuilder:
+    """Assembles chat prompts within a token budget
+
+    The system prompt and the new user message are always included. History
+    is added newest first while it fits; turns that no longer fit are
+    folded into a per-session running summary by a background task, so the
+    request never waits for summarization.
+
+    The summary changes whenever it is extended, so it goes into the final
+    user turn together with the robot context, after the system prompt and
+    history: that prefix stays identical between requests and can be read
+    from a provider's prompt cache.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        summarizer: Optional[Summarizer] = None,
+        language: str = "pl"
+    ):
+        """Initialize prompt builder
+
+        Args:
+            token_budget: Maximum estimated prompt tokens
+            summarizer: Coroutine function producing summaries (None drops
+                old turns instead)
+            language: Language code for the summary header
+        """
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.language = language
+
+        self._summaries: Dict[str, SessionSummary] = {}
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
+
+    def build(
+        self,
+        system_prompt: str,
+        history: Sequence[Dict[str, str]],
+        user_message: str,
+        session_id: str = "default"
+    ) -> List[Dict[str, str]]:
+        """Build messages for a chat request
+
+        Args:
+            system_prompt: System prompt
+            history: Session history, oldest first
+            user_message: Formatted user message
+            session_id: Session the summary belongs to
+
+        Returns:
+            Messages list for the model
+        """
+        system = {"role": "system", "content": system_prompt}
+        user = {"role": "user", "content": user_message}
+        history = list(history)
+
+        # Skip turns already folded into the summary
+        summary = self._summaries.get(session_id)
+        start = 0
+        if summary is not None:
+            for i in range(len(history) - 1, -1, -1):
+                if history[i] is summary.last_message:
+                    start = i + 1
+                    break
+            else:
+                # Summarized turns fell out of history (or it was reloaded)
+                summary = None
+                self._summaries.pop(session_id, None)
+
+        if summary is not None:
+            # Volatile, so after the cacheable prefix
+            user["content"] = f"{PromptTemplates.format_summary(summary.text, self.language)}\n\n{user_message}"
+        used = message_tokens(system) + message_tokens(user)
+
+        # Newest turns first, while they fit
+        kept = len(history)
+        while kept > start:
+            tokens = message_tokens(history[kept - 1])
+            if used + tokens > self.token_budget:
+                break
+            used += tokens
+            kept -= 1
+
+        # Never start the window with an assistant reply
+        if kept < len(history) and history[kept]["role"] == "assistant":
+            used -= message_tokens(history[kept])
+            kept += 1
+
+        overflow = history[start:kept]
+        if overflow:
+            full = used + sum(message_tokens(m) for m in overflow)
+            logger.info(
+                f"Prompt compacted ({session_id}): {full} -> {used} tokens, "
+                f"{len(overflow)} old messages {'summarized' if self.summarizer else 'dropped'}"
+            )
+            self._schedule_summary(session_id, history[start:self._compaction_cut(history, kept)], summary)
+        else:
+            logger.debug(f"Prompt tokens ({session_id}): {used}")
+
+        messages = [system]
+        messages.extend(history[kept:])
+        messages.append(user)
+        return messages
+
+    def _compaction_cut(self, history: List[Dict[str, str]], kept: int) -> int:
+        """Index up to which history should be summarized
+
+        Summarizes beyond what overflowed, leaving COMPACTION_TARGET of the
+        kept history's tokens, so summaries are not requested every turn.
+        """
+        kept_tokens = sum(message_tokens(m) for m in history[kept:])
+        target = kept_tokens * COMPACTION_TARGET
+        cut = kept
+        # Leave at least the latest exchange unsummarized
+        while cut < len(history) - 2 and kept_tokens > target:
+            kept_tokens -= message_tokens(history[cut])
+            cut += 1
+        # Summaries end on a complete exchange
+        if cut < len(history) and history[cut]["role"] == "assistant":
+            cut += 1
+        return cut
+
+    def _schedule_summary(
+        self,
+        session_id: str,
+        overflow: List[Dict[str, str]],
+        previous: Optional[SessionSummary]
+    ):
+        """Fold overflowing turns into the session summary in the background"""
+        if self.summarizer is None:
+            return
+        task = self._summary_tasks.get(session_id)
+        if task is not None and not task.done():
+            # The next request after it finishes picks up what is left
+            return
+
+        async def summarize():
+            try:
+                text = await self.summarizer(overflow, previous.text if previous else None)
+            except Exception as e:
+                logger.warning(f"Conversation summary failed ({session_id}): {e}")
+                return
+            self._summaries[session_id] = SessionSummary(text=text.strip(), last_message=overflow[-1])
+            logger.info(
+                f"Summarized {len(overflow)} messages ({session_id}): "
+                f"{sum(message_tokens(m) for m in overflow)} -> {estimate_tokens(text)} tokens"
+            )
+
+        self._summary_tasks[session_id] = asyncio.create_task(summarize())
+
+    def forget(self, session_id: str):
+        """Drop a session's summary (e.g., when its history is cleared)"""
+        self._summaries.pop(session_id, None)
+        task = self._summary_tasks.pop(session_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def close(self):
+        """Cancel pending summary tasks"""
+        for task in self._summary_tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._summary_tasks.values(), return_exceptions=True)
+        self._summary_tasks.clear()
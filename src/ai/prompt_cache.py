@@ -0,0 +1,67 @@
+"""Prompt Cache Stats - Tracks provider-reported prompt cache usage"""
+
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCacheStats:
+    """Accumulates prompt and cached-prompt token counts for one provider
+
+    Providers that reuse a cached prompt prefix report how many prompt
+    tokens were served from cache; a high ratio means the stable prefix
+    (system prompt, earlier turns) is not being reprocessed.
+    """
+
+    def __init__(self, provider: str):
+        """Initialize stats
+
+        Args:
+            provider: Provider name used in log messages
+        """
+        self.provider = provider
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.cache_write_tokens = 0
+        self.completion_tokens = 0
+
+    def record(
+        self,
+        prompt_tokens: Optional[int],
+        cached_tokens: Optional[int],
+        cache_write_tokens: Optional[int] = None
+    ):
+        """Record usage of one request (None when not reported)
+
+        Args:
+            prompt_tokens: Total prompt tokens, including cached ones
+            cached_tokens: Prompt tokens read from cache
+            cache_write_tokens: Prompt tokens written to cache
+        """
+        if prompt_tokens is None:
+            return
+
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached_tokens or 0
+        self.cache_write_tokens += cache_write_tokens or 0
+        logger.debug(
+            f"Prompt tokens ({self.provider}): {prompt_tokens}, cached: {cached_tokens or 0}"
+        )
+
+    def record_completion(self, completion_tokens: Optional[int]):
+        """Record generated tokens of one request (None when not reported)"""
+        self.completion_tokens += completion_tokens or 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get stats including the share of prompt tokens served from cache"""
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_ratio": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+        }
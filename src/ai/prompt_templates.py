@@ -104,6 +104,26 @@ Your personality and views:
 - In conversations about politics, religion, or society, express these values naturally
 - Remember: you can have your opinion, but always be polite and helpful"""
 
+    SUMMARY_PROMPT_PL = """Streść poniższą wcześniejszą część rozmowy użytkownika z asystentem robota w maksymalnie 5 zdaniach.
+Zachowaj fakty, które mogą być potrzebne później: preferencje użytkownika, nazwy pokoi, wydane polecenia i ustalenia.
+Odpowiedz wyłącznie streszczeniem."""
+
+    SUMMARY_PROMPT_EN = """Summarize the following earlier part of the conversation between the user and the robot assistant in at most 5 sentences.
+Keep facts that may be needed later: user preferences, room names, commands given and decisions made.
+Reply with the summary only."""
+
+    SUMMARY_HEADER_PL = "Streszczenie wcześniejszej rozmowy:"
+    SUMMARY_HEADER_EN = "Summary of the earlier conversation:"
+
+    STATE_NAMES_PL = {
+        "cleaning": "sprzątam",
+        "docked": "na stacji dokującej",
+        "idle": "bezczynny",
+        "returning": "wracam do stacji",
+        "paused": "wstrzymany",
+        "error": "błąd",
+    }
+
     @staticmethod
     def get_system_prompt(language: str = "pl") -> str:
         """Get system prompt for language
@@ -119,6 +139,35 @@ Your personality and views:
         else:
             return PromptTemplates.SYSTEM_PROMPT_EN
 
+    @staticmethod
+    def get_summary_prompt(language: str = "pl") -> str:
+        """Get instruction for summarizing old conversation turns
+
+        Args:
+            language: Language code ("pl" or "en")
+
+        Returns:
+            Summary instruction string
+        """
+        if language == "pl":
+            return PromptTemplates.SUMMARY_PROMPT_PL
+        else:
+            return PromptTemplates.SUMMARY_PROMPT_EN
+
+    @staticmethod
+    def format_summary(summary: str, language: str = "pl") -> str:
+        """Format running conversation summary for the prompt
+
+        Args:
+            summary: Summary text
+            language: Language code ("pl" or "en")
+
+        Returns:
+            Summary with header
+        """
+        header = PromptTemplates.SUMMARY_HEADER_PL if language == "pl" else PromptTemplates.SUMMARY_HEADER_EN
+        return f"{header}\n{summary}"
+
     @staticmethod
     def format_user_message(message: str, context: Dict[str, Any] = None) -> str:
         """Format user message with context
@@ -159,20 +208,27 @@ Your personality and views:
         """
         state = status.get("state", "unknown")
         battery = status.get("battery", 0)
+        state_text = PromptTemplates.translate_state(state, language)
 
         if language == "pl":
-            state_map = {
-                "cleaning": "sprzątam",
-                "docked": "na stacji dokującej",
-                "idle": "bezczynny",
-                "returning": "wracam do stacji",
-                "paused": "wstrzymany",
-                "error": "błąd",
-            }
-            state_text = state_map.get(state, state)
             return f"Aktualnie {state_text}. Bateria: {battery}%."
         else:
-            return f"Currently {state}. Battery: {battery}%."
+            return f"Currently {state_text}. Battery: {battery}%."
+
+    @staticmethod
+    def translate_state(state: str, language: str = "pl") -> str:
+        """Translate Valetudo state name for display
+
+        Args:
+            state: Valetudo state (e.g., "cleaning", "docked")
+            language: Language code
+
+        Returns:
+            Human-readable state
+        """
+        if language == "pl":
+            return PromptTemplates.STATE_NAMES_PL.get(state, state)
+        return state
 
     @staticmethod
     def format_room_list(rooms: List[str], language: str = "pl") -> str:
@@ -0,0 +1,128 @@
+"""Response Cache - Reuses AI answers to repeated questions"""
+
+import re
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str, int, Tuple[str, ...], str]
+
+# Messages that refer back to the conversation need the model ("zrób to
+# jeszcze raz", "what about the previous one"), their answer depends on history
+_HISTORY_REFERENCE = re.compile(
+    r"\b(to|tego|tym|tamt\w*|ten|ta|jeszcze|ponownie|znowu|wcześniej\w*|poprzedni\w*|"
+    r"powtórz|dalej|a co z|it|that|this|those|again|previous\w*|before|earlier|"
+    r"continue|what about)\b"
+)
+_PUNCTUATION = re.compile(r"[^\w\s%]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Normalize message text for cache lookup (case, punctuation, spacing)"""
+    text = _PUNCTUATION.sub(" ", message.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class ResponseCache:
+    """LRU cache with TTL for AI responses
+
+    Keys combine the normalized message, language and a coarse robot state
+    bucket (state + battery decile), so a cached "ile baterii?" answer is
+    only reused while it is still true. They also carry the providers the
+    request was restricted to, so a local-only request never gets a cloud
+    answer, and the session whenever the answer was generated with that
+    session's history in the prompt.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 300.0):
+        """Initialize response cache
+
+        Args:
+            max_size: Maximum cached responses
+            ttl: Seconds a response stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "evictions": 0}
+
+    def make_key(
+        self,
+        message: str,
+        language: str,
+        context: Optional[Dict[str, Any]] = None,
+        scope: Tuple[str, ...] = (),
+        session_id: str = ""
+    ) -> Optional[CacheKey]:
+        """Build cache key for a message
+
+        Args:
+            message: User message
+            language: Conversation language
+            context: Robot context with "state" and "battery"
+            scope: Providers the request may be answered by
+            session_id: Session whose history the answer depends on ("" to
+                share the answer across sessions)
+
+        Returns:
+            Cache key, or None if the message must not be cached
+        """
+        text = normalize_message(message)
+        if not text or _HISTORY_REFERENCE.search(text):
+            self.stats["bypassed"] += 1
+            return None
+
+        context = context or {}
+        battery = context.get("battery")
+        battery_decile = int(battery) // 10 if isinstance(battery, (int, float)) else -1
+        return (text, language, str(context.get("state", "")), battery_decile, tuple(scope), session_id)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Get cached response
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached response, or None on miss or expiry
+        """
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def put(self, key: CacheKey, response: str):
+        """Store response
+
+        Args:
+            key: Key from make_key()
+            response: AI response
+        """
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        """Drop all cached responses"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and hit rate"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,253 @@
+"""Provider Router - Latency-aware routing with per-provider circuit breakers"""
+
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from dataclasses import dataclass
+from enum import Enum
+
+from .. import metrics
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = metrics.histogram("llm_request_duration_seconds", "AI provider request latency", ["provider"])
+REQUEST_FAILURES = metrics.counter("llm_request_failures_total", "Failed AI provider requests", ["provider"])
+TTFT_SECONDS = metrics.histogram("llm_time_to_first_token_seconds", "Time to first streamed token", ["provider"])
+
+
+class BreakerState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"  # healthy, receives traffic
+    OPEN = "open"  # failing, skipped until a probe succeeds
+    HALF_OPEN = "half_open"  # cooldown elapsed, trial requests allowed
+
+
+@dataclass
+class ProviderHealth:
+    """Health and latency statistics for one provider"""
+    name: str
+    latency_ewma_ms: Optional[float] = None
+    ttft_ewma_ms: Optional[float] = None
+    error_rate: float = 0.0  # EWMA of failures (0.0-1.0)
+    consecutive_failures: int = 0
+    requests: int = 0
+    failures: int = 0
+    state: BreakerState = BreakerState.CLOSED
+    opened_at: float = 0.0
+
+
+class ProviderRouter:
+    """Ranks AI providers by measured latency and health
+
+    Keeps an EWMA of total latency, time-to-first-token and error rate per
+    provider. After `failure_threshold` consecutive failures a provider's
+    breaker opens and it is skipped; a background probe (or a successful
+    trial request once `open_seconds` have passed) closes it again.
+
+    Routing never changes global state: every request gets its own ranking
+    within the caller's allowed set.
+    """
+
+    # Assumed latency for providers without measurements yet
+    DEFAULT_LATENCY_MS = 2000.0
+
+    def __init__(
+        self,
+        providers: Iterable[str],
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        open_seconds: float = 30.0,
+        probe_interval: float = 15.0,
+        preference_bias: float = 0.5
+    ):
+        """Initialize router
+
+        Args:
+            providers: Provider names ("local", "openai", ...)
+            ewma_alpha: Smoothing factor for EWMAs (0.0-1.0)
+            failure_threshold: Consecutive failures that open the breaker
+            open_seconds: Time before an open breaker allows a trial request
+            probe_interval: Seconds between background probes of open providers
+            preference_bias: Score multiplier for the preferred provider
+                (0.5 = preferred wins unless it is twice as slow)
+        """
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.probe_interval = probe_interval
+        self.preference_bias = preference_bias
+
+        self.health: Dict[str, ProviderHealth] = {
+            name: ProviderHealth(name=name) for name in providers
+        }
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return self.ewma_alpha * sample + (1 - self.ewma_alpha) * current
+
+    def _get(self, name: str) -> ProviderHealth:
+        if name not in self.health:
+            self.health[name] = ProviderHealth(name=name)
+        return self.health[name]
+
+    def record_success(self, name: str, latency_ms: float):
+        """Record a successful request
+
+        Args:
+            name: Provider name
+            latency_ms: Total request latency
+        """
+        REQUEST_SECONDS.labels(name).observe(latency_ms / 1000)
+        health = self._get(name)
+        health.requests += 1
+        health.latency_ewma_ms = self._ewma(health.latency_ewma_ms, latency_ms)
+        health.error_rate = self._ewma(health.error_rate, 0.0)
+        health.consecutive_failures = 0
+        if health.state != BreakerState.CLOSED:
+            logger.info(f"Circuit breaker for {name} closed")
+            health.state = BreakerState.CLOSED
+
+    def record_ttft(self, name: str, ttft_ms: float):
+        """Record time-to-first-token of a streamed response"""
+        TTFT_SECONDS.labels(name).observe(ttft_ms / 1000)
+        health = self._get(name)
+        health.ttft_ewma_ms = self._ewma(health.ttft_ewma_ms, ttft_ms)
+
+    def record_failure(self, name: str):
+        """Record a failed request, opening the breaker if needed"""
+        REQUEST_FAILURES.labels(name).inc()
+        health = self._get(name)
+        health.requests += 1
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.error_rate = self._ewma(health.error_rate, 1.0)
+
+        if health.state == BreakerState.HALF_OPEN or (
+            health.state == BreakerState.CLOSED
+            and health.consecutive_failures >= self.failure_threshold
+        ):
+            self.open(name)
+
+    def open(self, name: str):
+        """Open a provider's breaker (e.g., after a failed health check)"""
+        health = self._get(name)
+        if health.state != BreakerState.OPEN:
+            logger.warning(f"Circuit breaker for {name} opened")
+        health.state = BreakerState.OPEN
+        health.opened_at = time.monotonic()
+
+    def is_available(self, name: str) -> bool:
+        """Check if provider may receive a request now
+
+        An open breaker whose cooldown elapsed turns half-open and lets
+        trial requests through; the next failure reopens it.
+        """
+        health = self._get(name)
+        if health.state == BreakerState.OPEN:
+            if time.monotonic() - health.opened_at < self.open_seconds:
+                return False
+            health.state = BreakerState.HALF_OPEN
+        return True
+
+    def score(self, name: str) -> float:
+        """Expected latency of a provider, penalized by its error rate (lower is better)"""
+        health = self._get(name)
+        latency = health.ttft_ewma_ms or health.latency_ewma_ms or self.DEFAULT_LATENCY_MS
+        return latency * (1 + 4 * health.error_rate)
+
+    def measured(self, name: str) -> bool:
+        """Whether a provider has latency measurements or recorded failures"""
+        health = self._get(name)
+        return health.latency_ewma_ms is not None or health.ttft_ewma_ms is not None or health.failures > 0
+
+    def rank(self, allowed: Iterable[str], preferred: Optional[str] = None) -> List[str]:
+        """Order allowed providers from best to worst
+
+        Args:
+            allowed: Providers the request may use
+            preferred: User's preferred provider (gets preference_bias)
+
+        Returns:
+            The preferred provider first while it has no measurements yet,
+            then measured available providers sorted by score, then
+            unmeasured ones, then providers with an open breaker (last
+            resort, most recently opened last). An unmeasured provider has
+            no score to compare, so it is never ranked out by default
+            latency; the preferred one gets tried until its own results
+            (or its breaker) say otherwise.
+        """
+        allowed = list(dict.fromkeys(allowed))
+
+        def weighted(name: str) -> float:
+            bias = self.preference_bias if name == preferred else 1.0
+            return self.score(name) * bias
+
+        available = [n for n in allowed if self.is_available(n)]
+        measured = sorted((n for n in available if self.measured(n)), key=weighted)
+        unmeasured = [n for n in available if not self.measured(n)]
+        if preferred in unmeasured:
+            unmeasured.remove(preferred)
+            measured.insert(0, preferred)
+        tripped = sorted(
+            (n for n in allowed if n not in available),
+            key=lambda n: self._get(n).opened_at
+        )
+        return measured + unmeasured + tripped
+
+    def start(self, probe: Callable[[str], Awaitable[bool]]):
+        """Start background probing of providers with an open breaker
+
+        Args:
+            probe: Coroutine function (provider) -> healthy
+        """
+        if self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop(probe))
+
+    async def stop(self):
+        """Stop background probing"""
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    async def _probe_loop(self, probe: Callable[[str], Awaitable[bool]]):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            for name, health in list(self.health.items()):
+                if health.state == BreakerState.CLOSED:
+                    continue
+                try:
+                    healthy = await probe(name)
+                except Exception as e:
+                    logger.debug(f"Probe of {name} failed: {e}")
+                    healthy = False
+
+                if healthy:
+                    logger.info(f"Probe of {name} succeeded")
+                    health.consecutive_failures = 0
+                    health.state = BreakerState.CLOSED
+                else:
+                    self.open(name)
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        """Get per-provider health statistics"""
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 1) if value is not None else None
+
+        return {
+            name: {
+                "state": health.state.value,
+                "latency_ewma_ms": rounded(health.latency_ewma_ms),
+                "ttft_ewma_ms": rounded(health.ttft_ewma_ms),
+                "error_rate": round(health.error_rate, 3),
+                "requests": health.requests,
+                "failures": health.failures,
+            }
+            for name, health in self.health.items()
+        }
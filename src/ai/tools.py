@@ -0,0 +1,146 @@
+"""Robot tools - Robot actions exposed to AI models as callable tools"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolCall:
+    """Structured tool call returned by a model"""
+    name: str  # action name, as used by CommandMapper / execute_command
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+def _tool(name: str, description: str, properties: Optional[Dict[str, Any]] = None,
+          required: Optional[List[str]] = None) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "description": description,
+        "parameters": {
+            "type": "object",
+            "properties": properties or {},
+            "required": required or [],
+        },
+    }
+
+
+# Provider-neutral tool definitions (JSON Schema parameters)
+ROBOT_TOOLS: List[Dict[str, Any]] = [
+    _tool("start_cleaning", "Start cleaning the whole home."),
+    _tool(
+        "clean_rooms",
+        "Clean only the given rooms.",
+        {"rooms": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Room names as the user said them, e.g. kitchen, salon",
+        }},
+        ["rooms"],
+    ),
+    _tool("stop", "Stop the robot immediately."),
+    _tool("pause", "Pause the current cleaning."),
+    _tool("home", "Send the robot back to its dock to charge."),
+    _tool("locate", "Make the robot play a sound so the user can find it."),
+    _tool(
+        "goto_room",
+        "Drive the robot to a room without cleaning.",
+        {"room": {"type": "string", "description": "Room name"}},
+        ["room"],
+    ),
+    _tool(
+        "move",
+        "Manually move the robot one step.",
+        {"direction": {"type": "string", "enum": ["forward", "backward", "left", "right"]}},
+        ["direction"],
+    ),
+    _tool("follow_me", "Make the robot follow the user."),
+]
+
+TOOL_NAMES = {tool["name"] for tool in ROBOT_TOOLS}
+
+
+def to_openai_tools(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert tools to OpenAI (and OpenAI-compatible local server) format"""
+    return [{"type": "function", "function": tool} for tool in tools]
+
+
+def to_anthropic_tools(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert tools to Anthropic format"""
+    return [
+        {"name": tool["name"], "description": tool["description"], "input_schema": tool["parameters"]}
+        for tool in tools
+    ]
+
+
+def to_gemini_tools(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert tools to Gemini format
+
+    Gemini rejects empty object schemas, so parameterless tools omit them.
+    """
+    declarations = []
+    for tool in tools:
+        declaration = {"name": tool["name"], "description": tool["description"]}
+        if tool["parameters"]["properties"]:
+            declaration["parameters"] = tool["parameters"]
+        declarations.append(declaration)
+    return [{"function_declarations": declarations}]
+
+
+def parse_arguments(raw: Any) -> Dict[str, Any]:
+    """Parse tool call arguments (JSON string or mapping)
+
+    Returns:
+        Arguments dict (empty if malformed)
+    """
+    if raw is None or raw == "":
+        return {}
+    if isinstance(raw, Mapping):
+        return _to_python(raw)
+    try:
+        arguments = json.loads(raw)
+    except (TypeError, json.JSONDecodeError):
+        logger.warning(f"Malformed tool arguments: {raw!r}")
+        return {}
+    return arguments if isinstance(arguments, dict) else {}
+
+
+def _to_python(value: Any) -> Any:
+    """Convert SDK mapping/sequence wrappers (e.g., Gemini protobuf) to plain types"""
+    if isinstance(value, Mapping):
+        return {key: _to_python(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) or (
+        hasattr(value, "__iter__") and not isinstance(value, (str, bytes))
+    ):
+        return [_to_python(item) for item in value]
+    return value
+
+
+class ToolCallAccumulator:
+    """Reassembles tool calls streamed in fragments
+
+    OpenAI-style streams send the name first and the JSON arguments in
+    pieces, keyed by call index; Anthropic streams partial JSON per
+    content block index.
+    """
+
+    def __init__(self):
+        self._names: Dict[int, str] = {}
+        self._arguments: Dict[int, List[str]] = {}
+
+    def add(self, index: int, name: Optional[str] = None, arguments: Optional[str] = None):
+        """Add a fragment of call `index`"""
+        if name:
+            self._names[index] = name
+        if arguments:
+            self._arguments.setdefault(index, []).append(arguments)
+
+    def calls(self) -> List[ToolCall]:
+        """Get completed tool calls in index order"""
+        return [
+            ToolCall(name=self._names[index], arguments=parse_arguments("".join(self._arguments.get(index, []))))
+            for index in sorted(self._names)
+        ]
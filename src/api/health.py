@@ -0,0 +1,208 @@
+"""Health - Background dependency probes and startup readiness"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckResult:
+    """Latest result of one dependency probe"""
+    name: str
+    critical: bool  # counts towards the overall status
+    healthy: Optional[bool] = None  # None until the first probe finished
+    checked_at: Optional[float] = None  # wall clock time of the last probe
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    failures: int = 0  # consecutive failed probes
+
+
+class HealthProber:
+    """Probes dependencies in the background and caches the results
+
+    Each check runs in its own loop at its own interval, so a robot that
+    is offline (and takes `timeout` seconds to fail) never delays a health
+    request or the other checks. Readers only get the cached results,
+    which makes /health constant-time and free of upstream load no matter
+    how often load balancers or uptime monitors call it.
+    """
+
+    def __init__(self, interval: float = 30.0, timeout: float = 5.0):
+        """Initialize prober
+
+        Args:
+            interval: Default seconds between probes of a check
+            timeout: Seconds a probe may take before it counts as failed
+        """
+        self.interval = interval
+        self.timeout = timeout
+        self.results: Dict[str, CheckResult] = {}
+        self._checks: Dict[str, Tuple[Callable[[], Awaitable[bool]], float]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running = False
+
+    def add(
+        self,
+        name: str,
+        check: Callable[[], Awaitable[bool]],
+        interval: Optional[float] = None,
+        critical: bool = True
+    ):
+        """Register a check, started right away if the prober is running
+
+        Args:
+            name: Check name ("valetudo", "mqtt", "ai.local", ...)
+            check: Coroutine function returning whether the dependency is
+                healthy; an exception counts as unhealthy
+            interval: Seconds between probes (default: the prober's interval)
+            critical: Whether a failure makes the overall status "degraded"
+        """
+        self._checks[name] = (check, interval or self.interval)
+        self.results[name] = CheckResult(name=name, critical=critical)
+        if self._running and name not in self._tasks:
+            self._tasks[name] = asyncio.create_task(self._run(name))
+
+    def start(self):
+        """Start probing all registered checks (call from the event loop)"""
+        self._running = True
+        for name in self._checks:
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._run(name))
+        logger.info(f"Health prober started ({len(self._checks)} checks)")
+
+    async def stop(self):
+        """Stop probing"""
+        self._running = False
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def healthy(self, name: str) -> bool:
+        """Whether a check's last probe succeeded"""
+        result = self.results.get(name)
+        return result is not None and bool(result.healthy)
+
+    def status(self) -> str:
+        """Overall status: "healthy", "degraded" or "starting" (nothing probed yet)"""
+        critical = [result for result in self.results.values() if result.critical]
+        if any(result.healthy is None for result in critical):
+            return "starting"
+        return "healthy" if all(result.healthy for result in critical) else "degraded"
+
+    def get_checks(self) -> Dict[str, Dict[str, Any]]:
+        """Cached check results with their age"""
+        now = time.time()
+        return {
+            name: {
+                "healthy": result.healthy,
+                "critical": result.critical,
+                "checked_at": result.checked_at,
+                "age_s": round(now - result.checked_at, 1) if result.checked_at else None,
+                "latency_ms": result.latency_ms,
+                "error": result.error,
+            }
+            for name, result in self.results.items()
+        }
+
+    async def probe(self, name: str) -> CheckResult:
+        """Run one check now and store its result
+
+        Args:
+            name: Check name
+
+        Returns:
+            Updated result
+        """
+        check, _ = self._checks[name]
+        result = self.results[name]
+        start = time.perf_counter()
+        try:
+            healthy = bool(await asyncio.wait_for(check(), self.timeout))
+            error = None if healthy else "check failed"
+        except asyncio.TimeoutError:
+            healthy, error = False, f"timed out after {self.timeout}s"
+        except Exception as e:
+            healthy, error = False, str(e) or type(e).__name__
+
+        if healthy != result.healthy:
+            if healthy:
+                logger.info(f"Health check {name} passed")
+            else:
+                logger.warning(f"Health check {name} failed: {error}")
+        result.healthy = healthy
+        result.error = error
+        result.failures = 0 if healthy else result.failures + 1
+        result.latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        result.checked_at = time.time()
+        return result
+
+    async def _run(self, name: str):
+        _, interval = self._checks[name]
+        while True:
+            await self.probe(name)
+            await asyncio.sleep(interval)
+
+
+class StartupStatus:
+    """Initialization state of the server's components, for /ready"""
+
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self):
+        self.components: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.required: Dict[str, bool] = {}
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+
+    def pending(self, name: str, required: bool = True):
+        """Register a component whose initialization has not finished
+
+        Args:
+            name: Component name
+            required: Whether the server is not ready without it
+        """
+        self.components[name] = self.PENDING
+        self.required[name] = required
+        self.ready_at = None
+
+    def ready(self, name: str):
+        """Mark a component as initialized"""
+        self.components[name] = self.READY
+        self.errors.pop(name, None)
+        self._check_ready()
+
+    def failed(self, name: str, error: Any):
+        """Mark a component as failed to initialize"""
+        self.components[name] = self.FAILED
+        self.errors[name] = str(error) or type(error).__name__
+        self._check_ready()
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether every required component is initialized"""
+        return bool(self.components) and all(
+            state == self.READY for name, state in self.components.items() if self.required[name]
+        )
+
+    def get_status(self) -> Dict[str, Any]:
+        """Readiness with per-component state"""
+        return {
+            "ready": self.is_ready,
+            "components": dict(self.components),
+            "errors": dict(self.errors),
+            "startup_s": round((self.ready_at or time.time()) - self.started_at, 2),
+        }
+
+    def _check_ready(self):
+        if self.is_ready and self.ready_at is None:
+            self.ready_at = time.time()
+            logger.info(f"Server ready in {self.ready_at - self.started_at:.2f}s")
@@ -1,15 +1,28 @@
 """FastAPI server for Dreame X40 AI Assistant"""
 
+import time
+import uuid
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Set
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from ..config import get_config
-from ..valetudo import ValetudoAPIClient, CommandMapper
+from .. import metrics
+from ..config import Settings, get_config
+from ..serialization import FastJSONResponse, dumps_str
+from ..valetudo import ValetudoAPIClient, ValetudoMQTTClient, CommandMapper, CommandDispatcher, IntentClassifier
+from ..valetudo.command_mapper import Command
+from ..valetudo.command_plan import CommandPlanRunner
+from ..valetudo.language_packs import LanguagePacks
+from ..valetudo.state_hub import StateHub
+from ..valetudo.joystick import JoystickController
 from ..ai import AIManager, PromptTemplates
+from ..ai.tools import TOOL_NAMES
 from .websocket import ws_manager
+from .health import HealthProber, StartupStatus
 
 logger = logging.getLogger(__name__)
 
@@ -17,35 +30,123 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Dreame X40 AI Assistant API",
     description="AI-powered interface for Dreame X40 with Valetudo",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
-# Configure CORS
-config = get_config()
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=config.api.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+
+class SettingsCORSMiddleware(CORSMiddleware):
+    """CORS with the allowed origins from settings
+
+    Starlette builds the middleware stack when the app first runs, so the
+    settings are read then and importing this module has no side effects.
+    """
+
+    def __init__(self, app):
+        super().__init__(
+            app,
+            allow_origins=get_config().api.cors_origins,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
 )
 
+
+class MetricsMiddleware:
+    """Records the latency of every HTTP request by route and status
+
+    The route is the path template ("/api/v1/robot/status"), so path
+    parameters do not create new label values; unknown paths share
+    "unmatched". Streaming responses count until the last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(scope["method"], self._route(scope), str(status)).observe(
+                time.perf_counter() - start
+            )
+
+    @staticmethod
+    def _route(scope) -> str:
+        # The router stores the matched route in the shared scope. Depending
+        # on the FastAPI version it is the router's own (unprefixed) route, so
+        # a path without parameters is taken from the request itself.
+        route = scope.get("route")
+        if route is None:
+            return "unmatched"
+        return route.path if getattr(route, "param_convertors", None) else scope["path"]
+
+
+# Configure CORS
+app.add_middleware(SettingsCORSMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+# Settings, loaded on startup
+config: Optional[Settings] = None
+
+# model_used reported for replies rendered without the AI model
+FAST_PATH_MODEL = "fast_path"
+
+# Commands run on the /ws/chat control lane, ahead of a reply being generated
+CONTROL_ACTIONS = {"stop", "pause", "home", "locate"}
+
 # Global instances
 valetudo_client: Optional[ValetudoAPIClient] = None
+mqtt_client: Optional[ValetudoMQTTClient] = None
+command_dispatcher: Optional[CommandDispatcher] = None
 ai_manager: Optional[AIManager] = None
 command_mapper: Optional[CommandMapper] = None
+plan_runner: Optional[CommandPlanRunner] = None
+state_hub: Optional[StateHub] = None
+joystick: Optional[JoystickController] = None
+health_prober: Optional[HealthProber] = None
+
+# Initialization running in the background after startup
+startup_tasks: List[asyncio.Task] = []
+
+# /ws/chat sockets per conversation session, for command plan progress
+chat_sessions: Dict[str, Set[WebSocket]] = {}
+
+# Initialization state of the components, reported by /ready
+startup = StartupStatus()
 
 
 # Request/Response models
 class ChatRequest(BaseModel):
     message: str
     include_context: bool = True
+    allowed_models: Optional[List[str]] = None  # providers this request may use
+    session_id: str = "default"  # conversation session
 
 
 class ChatResponse(BaseModel):
     response: str
     model_used: str
     intent: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None  # per-stage durations in ms
 
 
 class CommandRequest(BaseModel):
@@ -65,10 +166,21 @@ class RobotStatusResponse(BaseModel):
 # Startup/Shutdown events
 @app.on_event("startup")
 async def startup_event():
-    """Initialize clients on startup"""
-    global valetudo_client, ai_manager, command_mapper
+    """Create clients on startup
+
+    Only in-process setup happens here, so the server accepts requests
+    right away. Everything that waits for the network or disk (MQTT
+    broker, AI providers, intent classifier) is initialized in background
+    tasks; /ready reports when it has finished.
+    """
+    global config, valetudo_client, command_dispatcher, ai_manager, command_mapper, plan_runner, state_hub, joystick
+    global health_prober
 
     logger.info("Starting Dreame X40 AI Assistant API...")
+    config = get_config()
+
+    ws_manager.queue_size = config.api.ws_queue_size
+    ws_manager.send_timeout = config.api.ws_send_timeout
 
     # Initialize Valetudo client
     valetudo_config = config.valetudo
@@ -80,16 +192,130 @@ async def startup_event():
     )
     logger.info("Valetudo client initialized")
 
-    # Initialize AI manager
-    ai_manager = AIManager(config.ai)
-    await ai_manager.initialize()
-    logger.info("AI manager initialized")
+    health_prober = HealthProber(interval=config.api.health_interval, timeout=config.api.health_timeout)
+    health_prober.add("valetudo", check_valetudo)
+
+    # MQTT (second transport for robot commands) is attached once connected
+    command_dispatcher = CommandDispatcher(
+        api_client=valetudo_client,
+        mqtt_client=None,
+        dual_transport=valetudo_config.dual_transport,
+        ewma_alpha=valetudo_config.transport_ewma_alpha,
+        mqtt_ack_timeout=valetudo_config.mqtt_ack_timeout,
+        straggler_timeout=valetudo_config.straggler_timeout
+    )
+    logger.info("Command dispatcher initialized")
+
+    # Robot state: one shared poller (plus MQTT pushes) for all clients
+    state_hub = StateHub(
+        fetch=fetch_robot_status,
+        on_change=lambda frame: ws_manager.broadcast(frame, channel="state"),
+        active_interval=valetudo_config.state_poll_active,
+        idle_interval=valetudo_config.state_poll_idle,
+        docked_interval=valetudo_config.state_poll_docked,
+        resync_interval=valetudo_config.state_resync_interval,
+        push_connected=lambda: mqtt_client is not None and mqtt_client.connected
+    )
+    state_hub.start()
+
+    joystick = JoystickController(
+        drive=lambda velocity, turn_rate: valetudo_client.manual_control("move", velocity, turn_rate=turn_rate),
+        set_enabled=lambda enabled: valetudo_client.manual_control("enable" if enabled else "disable"),
+        tick_interval=valetudo_config.manual_tick_interval,
+        deadman_timeout=valetudo_config.manual_deadman_timeout,
+        max_velocity=valetudo_config.manual_max_velocity,
+        max_turn_rate=valetudo_config.manual_max_turn_rate,
+        on_sent=ws_manager.send_personal_message
+    )
+
+    # Providers are added by initialize_ai()
+    ai_manager = AIManager(config.ai, config.advanced)
 
-    # Initialize command mapper
-    command_mapper = CommandMapper(language=config.ai.language)
+    # Keyword matching works right away, the classifier is added when loaded
+    command_mapper = CommandMapper(
+        language=config.ai.language,
+        classifier_threshold=config.chat.classifier_threshold,
+        languages=config.chat.languages,
+        packs=LanguagePacks(cache_dir=config.chat.matcher_cache_dir),
+        memo_size=config.chat.parse_memo_size
+    )
     logger.info("Command mapper initialized")
 
-    logger.info("API server ready!")
+    chat_config = config.chat
+    plan_runner = CommandPlanRunner(
+        execute=execute_command,
+        get_state=get_robot_state,
+        on_event=send_plan_event,
+        poll_interval=chat_config.plan_poll_interval,
+        start_timeout=chat_config.plan_start_timeout,
+        step_timeout=chat_config.plan_step_timeout
+    )
+
+    run_in_background("ai", initialize_ai())
+    if config.chat.classifier_enabled:
+        run_in_background("classifier", initialize_classifier())
+    if valetudo_config.mqtt.enabled:
+        # REST works without it
+        run_in_background("mqtt", initialize_mqtt(), required=False)
+
+    health_prober.start()
+    logger.info("API server accepting requests")
+
+
+def run_in_background(component: str, init: Awaitable, required: bool = True):
+    """Run an initialization step after startup and track it for /ready
+
+    Args:
+        component: Component name reported by /ready
+        init: Initialization coroutine
+        required: Whether the server is not ready until it succeeds
+    """
+    startup.pending(component, required)
+
+    async def run():
+        start = time.perf_counter()
+        try:
+            await init
+        except Exception as e:
+            logger.error(f"Failed to initialize {component}: {e}")
+            startup.failed(component, e)
+            return
+        logger.info(f"Initialized {component} in {time.perf_counter() - start:.2f}s")
+        startup.ready(component)
+
+    startup_tasks.append(asyncio.create_task(run()))
+
+
+async def initialize_ai():
+    """Create AI provider clients and probe them"""
+    await ai_manager.initialize()
+    for provider in ai_manager.get_available_models():
+        add_provider_check(provider)
+
+
+async def initialize_classifier():
+    """Load (or train) the intent classifier"""
+    classifier = await asyncio.to_thread(IntentClassifier.load_or_train, config.chat.classifier_model_path)
+    command_mapper.set_classifier(classifier)
+
+
+async def initialize_mqtt():
+    """Connect to the MQTT broker and use it for commands and state pushes"""
+    global mqtt_client
+
+    mqtt_config = config.valetudo.mqtt
+    client = ValetudoMQTTClient(
+        broker=mqtt_config.broker,
+        port=mqtt_config.port,
+        username=mqtt_config.username or None,
+        password=mqtt_config.password or None,
+        base_topic=mqtt_config.base_topic
+    )
+    health_prober.add("mqtt", check_mqtt, critical=False)
+    await asyncio.to_thread(client.connect)
+    client.on_state_change(state_hub.push)
+    mqtt_client = client
+    command_dispatcher.mqtt_client = client
 
 
 @app.on_event("shutdown")
@@ -97,9 +323,30 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down API server...")
 
+    for task in startup_tasks:
+        task.cancel()
+    await asyncio.gather(*startup_tasks, return_exceptions=True)
+
+    if plan_runner:
+        plan_runner.cancel()
+
+    if health_prober:
+        await health_prober.stop()
+
+    if joystick:
+        await joystick.stop()
+
+    if state_hub:
+        await state_hub.stop()
+
+    await ws_manager.close()
+
     if valetudo_client:
         await valetudo_client.close()
 
+    if mqtt_client:
+        mqtt_client.disconnect()
+
     if ai_manager:
         await ai_manager.close()
 
@@ -122,42 +369,72 @@ async def root():
     }
 
 
-@router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    valetudo_healthy = False
-    ai_healthy = False
+async def check_valetudo() -> bool:
+    """Health check: Valetudo REST API answers"""
+    await valetudo_client.get_robot_info()
+    return True
 
-    try:
-        await valetudo_client.get_robot_info()
-        valetudo_healthy = True
-    except:
-        pass
 
-    try:
-        available_models = ai_manager.get_available_models()
-        ai_healthy = len(available_models) > 0
-    except:
-        pass
+async def check_mqtt() -> bool:
+    """Health check: MQTT broker connection is up"""
+    if mqtt_client is None:
+        raise ConnectionError("MQTT client not initialized")
+    return mqtt_client.connected
+
+
+def add_provider_check(provider: str):
+    """Probe an initialized AI provider in the background (ai.<provider> check)"""
+    health_prober.add(
+        f"ai.{provider}",
+        lambda: ai_manager.check_provider(provider),
+        interval=config.api.health_ai_interval,
+        critical=False
+    )
 
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint
+
+    Returns the cached results of background probes (see HealthProber),
+    so it never waits for the robot or an AI provider.
+    """
+    if health_prober is None:
+        return {"status": "starting", "valetudo": "disconnected", "ai": "unavailable", "available_models": []}
+
+    checks = health_prober.get_checks()
+    available_models = [
+        name.split(".", 1)[1] for name, check in checks.items() if name.startswith("ai.") and check["healthy"]
+    ]
+    status = health_prober.status()
+    if status == "healthy" and not available_models:
+        status = "degraded"
     return {
-        "status": "healthy" if (valetudo_healthy and ai_healthy) else "degraded",
-        "valetudo": "connected" if valetudo_healthy else "disconnected",
-        "ai": "available" if ai_healthy else "unavailable",
-        "available_models": ai_manager.get_available_models() if ai_healthy else []
+        "status": status,
+        "valetudo": "connected" if health_prober.healthy("valetudo") else "disconnected",
+        "ai": "available" if available_models else "unavailable",
+        "available_models": available_models,
+        "checks": checks
     }
 
 
+@router.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 200 once startup initialization has finished, 503 before"""
+    status = startup.get_status()
+    return FastJSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 # === Robot Status ===
 @router.get("/robot/status", response_model=RobotStatusResponse)
 async def get_robot_status():
-    """Get current robot status"""
+    """Get current robot status (shared snapshot, see /ws/state)"""
     try:
-        status = await valetudo_client.get_friendly_status()
+        status = await state_hub.get()
         return RobotStatusResponse(
-            state=status.state,
-            battery=status.battery,
-            error=status.error
+            state=status.get("state", "unknown"),
+            battery=status.get("battery", 0),
+            error=status.get("error")
         )
     except Exception as e:
         logger.error(f"Failed to get robot status: {e}")
@@ -186,9 +463,12 @@ async def get_robot_capabilities():
 @router.post("/robot/start")
 async def start_cleaning():
     """Start full cleaning"""
+    # Manual control overrides a pending chat command plan
+    plan_runner.cancel()
     try:
-        result = await valetudo_client.start_cleaning()
-        return {"status": "success", "message": "Cleaning started"}
+        result = await command_dispatcher.dispatch("start_cleaning")
+        state_hub.expect_change()
+        return {"status": "success", "message": "Cleaning started", "transport": result.transport, "confirmed": result.confirmed}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -196,9 +476,11 @@ async def start_cleaning():
 @router.post("/robot/stop")
 async def stop_cleaning():
     """Stop cleaning"""
+    plan_runner.cancel()
     try:
-        result = await valetudo_client.stop_cleaning()
-        return {"status": "success", "message": "Cleaning stopped"}
+        result = await command_dispatcher.dispatch("stop")
+        state_hub.expect_change()
+        return {"status": "success", "message": "Cleaning stopped", "transport": result.transport, "confirmed": result.confirmed}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -206,9 +488,11 @@ async def stop_cleaning():
 @router.post("/robot/pause")
 async def pause_cleaning():
     """Pause cleaning"""
+    plan_runner.cancel()
     try:
-        result = await valetudo_client.pause_cleaning()
-        return {"status": "success", "message": "Cleaning paused"}
+        result = await command_dispatcher.dispatch("pause")
+        state_hub.expect_change()
+        return {"status": "success", "message": "Cleaning paused", "transport": result.transport, "confirmed": result.confirmed}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -216,9 +500,11 @@ async def pause_cleaning():
 @router.post("/robot/home")
 async def return_home():
     """Return to dock"""
+    plan_runner.cancel()
     try:
-        result = await valetudo_client.return_to_dock()
-        return {"status": "success", "message": "Returning to dock"}
+        result = await command_dispatcher.dispatch("home")
+        state_hub.expect_change()
+        return {"status": "success", "message": "Returning to dock", "transport": result.transport, "confirmed": result.confirmed}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -227,54 +513,351 @@ async def return_home():
 async def locate_robot():
     """Play locate sound"""
     try:
-        result = await valetudo_client.locate_robot()
-        return {"status": "success", "message": "Playing locate sound"}
+        result = await command_dispatcher.dispatch("locate")
+        return {"status": "success", "message": "Playing locate sound", "transport": result.transport, "confirmed": result.confirmed}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/robot/transports")
+async def get_transport_stats():
+    """Get REST/MQTT command latency statistics"""
+    return command_dispatcher.get_stats()
+
+
 # === AI Chat ===
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Chat with AI assistant"""
     try:
-        # Get robot context if requested
-        context = None
-        if request.include_context:
-            try:
-                status = await valetudo_client.get_friendly_status()
-                context = {
-                    "state": status.state,
-                    "battery": status.battery
-                }
-            except:
-                logger.warning("Failed to get robot context")
+        async for event in chat_pipeline(
+            request.message, request.include_context, request.allowed_models, request.session_id
+        ):
+            if event["type"] == "message":
+                return ChatResponse(
+                    response=event["response"],
+                    model_used=event["model"],
+                    intent=event["intent"],
+                    timings=event["timings"]
+                )
+
+    except Exception as e:
+        logger.error(f"Chat error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Parse command to detect intent
-        parsed_command = command_mapper.parse_command(request.message)
 
-        # Get AI response
-        response = await ai_manager.chat(request.message, context=context)
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with AI assistant, streaming the response as server-sent events
 
-        # Extract intent if command was parsed
-        intent = parsed_command.action if parsed_command else None
+    Emits "delta" events with text fragments, "command_executed" or "error"
+    events for the detected command, then a single "done" event with the
+    full response (or an "error" event).
+    """
+    async def event_stream():
+        try:
+            async for event in chat_pipeline(
+                request.message, request.include_context, request.allowed_models, request.session_id
+            ):
+                if event["type"] == "message":
+                    yield _sse("done", {
+                        "response": event["response"],
+                        "model_used": event["model"],
+                        "intent": event["intent"],
+                        "ttft_ms": event["timings"].get("ttft_ms"),
+                        "timings": event["timings"]
+                    })
+                else:
+                    yield _sse(event["type"], {k: v for k, v in event.items() if k != "type"})
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield _sse("error", {"message": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        # If command detected, execute it
-        if parsed_command and parsed_command.confidence > 0.7:
-            try:
-                await execute_command(parsed_command.action, parsed_command.params)
-            except Exception as e:
-                logger.error(f"Failed to execute command: {e}")
-
-        return ChatResponse(
-            response=response,
-            model_used=ai_manager.get_current_model(),
-            intent=intent
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {dumps_str(data)}\n\n"
+
+
+async def chat_pipeline(
+    message: str,
+    include_context: bool = True,
+    allowed_models: Optional[List[str]] = None,
+    session_id: str = "default"
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run one chat request, overlapping its stages
+
+    The robot context fetch starts first and runs while the command is
+    parsed and the prompt is built. A detected command starts executing
+    right away, concurrently with LLM generation, so the robot reacts
+    before the reply is finished.
+
+    Args:
+        message: User message
+        include_context: Whether to include robot status in the prompt
+        allowed_models: Providers the AI request may be routed to
+        session_id: Conversation session the exchange belongs to
+
+    Yields:
+        WebSocket-style frames: "delta", "command_executed", "error", and
+        finally one "message" frame carrying a per-stage "timings" dict (ms)
+
+    Raises:
+        Exception if the AI request or a fast-path command fails
+    """
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+
+    def elapsed_ms(since: float) -> float:
+        return round((time.perf_counter() - since) * 1000, 2)
+
+    async def fetch_context():
+        context = await get_robot_context()
+        timings["context_ms"] = elapsed_ms(start)
+        return context
+
+    context_task = asyncio.create_task(fetch_context()) if include_context else None
+
+    # Parse command(s) while the context is being fetched
+    parse_start = time.perf_counter()
+    plan = parse_message_plan(message)
+    timings["parse_ms"] = elapsed_ms(parse_start)
+    parsed_command = plan[0] if plan else None
+    intent = parsed_command.action if parsed_command else None
+    plan_info = {"plan": [command.action for command in plan]} if len(plan) > 1 else {}
+
+    # Recognized commands are answered without the LLM
+    fast_response = await try_fast_path(message, plan, context=context_task, session_id=session_id)
+    if fast_response is not None:
+        if context_task:
+            context_task.cancel()
+        if parsed_command.action != "status":
+            yield {"type": "command_executed", "action": parsed_command.action}
+        timings["total_ms"] = elapsed_ms(start)
+        yield {
+            "type": "message",
+            "response": fast_response,
+            "model": FAST_PATH_MODEL,
+            "intent": intent,
+            **plan_info,
+            "timings": timings
+        }
+        return
+
+    # Command and generation run concurrently, both reporting into one queue
+    events: asyncio.Queue = asyncio.Queue()
+    chunks: List[str] = []
+    info: Dict[str, Any] = {}
+    # Only keyword matches run alongside the model; classifier guesses
+    # ("nie wracaj do bazy" -> home) are left to the model's tool calls
+    keyword_plan = plan if plan and all(
+        command.source == "keyword" and command.confidence > 0.7 for command in plan
+    ) else []
+    tool_commands: List[Command] = []
+
+    async def run_command():
+        command_start = time.perf_counter()
+        try:
+            await plan_runner.start(keyword_plan, owner=session_id)
+            await events.put({"type": "command_executed", "action": parsed_command.action})
+        except Exception as e:
+            logger.error(f"Command execution failed: {e}")
+            await events.put({"type": "error", "message": f"Failed to execute command: {e}"})
+        finally:
+            timings["command_ms"] = elapsed_ms(command_start)
+            await events.put(None)
+
+    async def run_llm():
+        llm_start = time.perf_counter()
+        try:
+            async for delta in ai_manager.chat_stream(
+                message, context=context_task, allowed_models=allowed_models,
+                info=info, session_id=session_id
+            ):
+                if not chunks:
+                    timings["ttft_ms"] = elapsed_ms(llm_start)
+                chunks.append(delta)
+                await events.put({"type": "delta", "delta": delta})
+            timings["llm_ms"] = elapsed_ms(llm_start)
+
+            # Commands the model asked for as tool calls
+            for call in info.get("tool_calls") or []:
+                await run_tool_call(call)
+        finally:
+            timings.setdefault("llm_ms", elapsed_ms(llm_start))
+            await events.put(None)
+
+    async def run_tool_call(call):
+        if call.name not in TOOL_NAMES:
+            logger.warning(f"Ignoring unknown tool call: {call.name}")
+            return
+        if any(command.action == call.name for command in keyword_plan):
+            # Already executing from the keyword match
+            return
+
+        command = Command(action=call.name, params=call.arguments)
+        tool_commands.append(command)
+        logger.info(f"Tool call: {call.name} {call.arguments}")
+        try:
+            await execute_command(command.action, command.params)
+            await events.put({"type": "command_executed", "action": command.action})
+        except Exception as e:
+            logger.error(f"Tool call execution failed: {e}")
+            await events.put({"type": "error", "message": f"Failed to execute command: {e}"})
+
+    producers = [asyncio.create_task(run_llm())]
+    if keyword_plan:
+        producers.append(asyncio.create_task(run_command()))
+
+    try:
+        remaining = len(producers)
+        while remaining:
+            event = await events.get()
+            if event is None:
+                remaining -= 1
+                continue
+            yield event
+
+        # Re-raise an AI failure
+        await producers[0]
+
+    finally:
+        # Consumer went away: stop generating, but let the robot command finish
+        producers[0].cancel()
+
+    response = "".join(chunks)
+    if tool_commands:
+        intent = intent or tool_commands[0].action
+        if not response:
+            # Model answered with tool calls only
+            lang = command_mapper.detect_language(message)
+            response = " ".join(filter(None, (
+                command_mapper.render_response(command, lang) for command in tool_commands
+            )))
+
+    timings["total_ms"] = elapsed_ms(start)
+    yield {
+        "type": "message",
+        "response": response,
+        "model": info.get("model", ai_manager.get_current_model()),
+        "intent": intent,
+        **plan_info,
+        "timings": timings
+    }
+
+
+def parse_message_plan(message: str) -> List[Command]:
+    """Parse chat message into commands to execute in order
+
+    Args:
+        message: User message
+
+    Returns:
+        Commands (one at most when plans are disabled)
+    """
+    if config.chat.plan_enabled:
+        return command_mapper.parse_plan(message)
+    command = command_mapper.parse_command(message)
+    return [command] if command else []
+
+
+async def try_fast_path(
+    message: str,
+    plan: List[Command],
+    context: Optional[Awaitable] = None,
+    session_id: str = "default"
+) -> Optional[str]:
+    """Execute confidently recognized commands and answer from templates
+
+    Skips the LLM entirely for commands like "stop", "wróć do bazy" or
+    "status". The reply is the command's response template filled with
+    live robot state. Status replies are limited to explicit status or
+    battery questions; small talk like "jak się masz" goes to the model. Multi-step plans get one template per step; the
+    first step is executed before replying, the rest follows in the
+    background.
+
+    Args:
+        message: User message (used for reply language)
+        plan: Commands from parse_message_plan
+        context: Pending robot context fetch to reuse for "status" (optional)
+        session_id: Conversation session that owns a started plan
+
+    Returns:
+        Response text, or None if the message should go to the AI model
+
+    Raises:
+        Exception if the command itself fails
+    """
+    chat_config = config.chat
+    if (
+        not chat_config.fast_path_enabled
+        or not plan
+        or any(
+            command.source != "keyword" or command.confidence <= chat_config.fast_path_threshold
+            for command in plan
         )
+    ):
+        return None
+
+    lang = command_mapper.detect_language(message)
+    if not all(command_mapper.get_response_template(command, lang) for command in plan):
+        return None
+
+    if len(plan) > 1:
+        # Status replies need live state; mixed with actions, let the AI answer
+        if any(command.action == "status" for command in plan):
+            return None
+        await plan_runner.start(plan, owner=session_id)
+        logger.info(f"Fast path plan: {[command.action for command in plan]}")
+        return " ".join(command_mapper.render_response(command, lang) for command in plan)
+
+    parsed_command = plan[0]
+    state = battery = None
+    if parsed_command.action == "status":
+        if not command_mapper.is_status_question(message):
+            return None
+        status = await context if context is not None else await get_robot_context()
+        if status is None:
+            logger.warning("Fast path status unavailable, using AI")
+            return None
+        state = PromptTemplates.translate_state(status["state"], lang)
+        battery = status["battery"]
+    else:
+        await plan_runner.start(plan, owner=session_id)
+
+    logger.info(f"Fast path: {parsed_command.action}")
+    return command_mapper.render_response(parsed_command, lang, state=state, battery=battery)
+
+
+async def fetch_robot_status() -> Dict[str, Any]:
+    """Fetch robot status from Valetudo (the state hub's upstream)"""
+    status = await valetudo_client.get_friendly_status()
+    return {"state": status.state, "battery": status.battery, "error": status.error}
+
+
+async def get_robot_context() -> Optional[Dict[str, Any]]:
+    """Get robot status as AI context, or None if the robot is unreachable"""
+    try:
+        status = await state_hub.get(max_age=config.valetudo.state_poll_active)
+        return {
+            "state": status.get("state", "unknown"),
+            "battery": status.get("battery", 0)
+        }
+    except Exception:
+        logger.warning("Failed to get robot context")
+        return None
 
-    except Exception as e:
-        logger.error(f"Chat error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+async def get_robot_state() -> Optional[str]:
+    """Get robot state name ("cleaning", "docked", ...)"""
+    status = await state_hub.get(max_age=config.chat.plan_poll_interval)
+    return status.get("state")
 
 
 async def execute_command(action: str, params: dict):
@@ -284,16 +867,12 @@ async def execute_command(action: str, params: dict):
         action: Command action
         params: Command parameters
     """
-    if action == "start_cleaning":
-        await valetudo_client.start_cleaning()
-    elif action == "stop":
-        await valetudo_client.stop_cleaning()
-    elif action == "pause":
-        await valetudo_client.pause_cleaning()
-    elif action == "home":
-        await valetudo_client.return_to_dock()
-    elif action == "locate":
-        await valetudo_client.locate_robot()
+    state_hub.expect_change()
+    if command_dispatcher.supports(action):
+        # start_cleaning, stop, pause, home, locate
+        await command_dispatcher.dispatch(action)
+    elif action == "clean_rooms":
+        await clean_rooms(params.get("rooms", []))
     elif action == "follow_me":
         # Import here to avoid circular dependency
         from ..tracking import user_tracker
@@ -319,13 +898,113 @@ async def execute_command(action: str, params: dict):
         logger.info("Goto location command received")
 
 
+async def clean_rooms(rooms: List[str]):
+    """Clean rooms by name, matching them against map segment names
+
+    Args:
+        rooms: Room identifiers from CommandMapper (e.g., ["kuchnia"])
+
+    Raises:
+        ValueError if no segment matches
+    """
+    segments = await valetudo_client.get_segments()
+    wanted = {room.lower() for room in rooms}
+    segment_ids = [
+        str(segment["id"]) for segment in segments
+        if (segment.get("name") or "").lower() in wanted
+    ]
+    if not segment_ids:
+        raise ValueError(f"No map segments match rooms: {', '.join(rooms)}")
+
+    await valetudo_client.clean_segments(segment_ids)
+
+
+@router.get("/ws/stats")
+async def get_websocket_stats():
+    """Get WebSocket queue depth, drop and eviction counters"""
+    return ws_manager.get_stats()
+
+
+# === Metrics ===
+# Copied from the components' own counters when /metrics is scraped
+WS_CONNECTIONS = metrics.gauge("ws_connections", "Open WebSocket connections", ["channel"])
+WS_QUEUED = metrics.gauge("ws_queued_messages", "Frames waiting in WebSocket send queues", ["channel"])
+WS_MAX_QUEUE_DEPTH = metrics.gauge("ws_max_queue_depth", "Longest WebSocket send queue", ["channel"])
+WS_DROPPED = metrics.counter("ws_dropped_messages_total", "Frames dropped from full send queues", ["type"])
+WS_EVICTED = metrics.counter("ws_evicted_clients_total", "WebSocket clients evicted for slow or failed sends")
+CACHE_HITS = metrics.counter("cache_hits_total", "Cache hits", ["cache"])
+CACHE_MISSES = metrics.counter("cache_misses_total", "Cache misses", ["cache"])
+LLM_PROMPT_TOKENS = metrics.counter("llm_prompt_tokens_total", "Prompt tokens reported by AI providers", ["provider"])
+LLM_CACHED_TOKENS = metrics.counter(
+    "llm_cached_prompt_tokens_total", "Prompt tokens served from the provider's prompt cache", ["provider"]
+)
+LLM_COMPLETION_TOKENS = metrics.counter(
+    "llm_completion_tokens_total", "Generated tokens reported by AI providers", ["provider"]
+)
+STATE_POLLS = metrics.counter("robot_state_polls_total", "Robot state polls by the state hub")
+STATE_PUSHES = metrics.counter("robot_state_pushes_total", "Robot state updates pushed over MQTT")
+HEALTH_CHECK_UP = metrics.gauge("health_check_up", "Last background health probe passed (1) or failed (0)", ["check"])
+
+
+def collect_metrics():
+    """Update metrics kept as stats by other components (before rendering)"""
+    ws_stats = ws_manager.get_stats()
+    for gauge in (WS_CONNECTIONS, WS_QUEUED, WS_MAX_QUEUE_DEPTH):
+        gauge.clear()
+    for channel, stats in ws_stats["channels"].items():
+        WS_CONNECTIONS.labels(channel).set(stats["connections"])
+        WS_QUEUED.labels(channel).set(stats["queued"])
+        WS_MAX_QUEUE_DEPTH.labels(channel).set(stats["max_queue_depth"])
+    for message_type, dropped in ws_stats["dropped"].items():
+        WS_DROPPED.labels(str(message_type)).set_total(dropped)
+    WS_EVICTED.labels().set_total(ws_stats["evicted"])
+
+    if command_mapper:
+        for name, info in command_mapper.memo_info().items():
+            CACHE_HITS.labels(f"parse_{name}").set_total(info["hits"])
+            CACHE_MISSES.labels(f"parse_{name}").set_total(info["misses"])
+
+    if ai_manager:
+        response_cache = ai_manager.get_response_cache_stats()
+        if response_cache["enabled"]:
+            CACHE_HITS.labels("response").set_total(response_cache["hits"])
+            CACHE_MISSES.labels("response").set_total(response_cache["misses"])
+        for provider, stats in ai_manager.get_prompt_cache_stats().items():
+            LLM_PROMPT_TOKENS.labels(provider).set_total(stats["prompt_tokens"])
+            LLM_CACHED_TOKENS.labels(provider).set_total(stats["cached_tokens"])
+            LLM_COMPLETION_TOKENS.labels(provider).set_total(stats["completion_tokens"])
+
+    if state_hub:
+        STATE_POLLS.labels().set_total(state_hub.polls)
+        STATE_PUSHES.labels().set_total(state_hub.pushes)
+
+    if health_prober:
+        for name, result in health_prober.results.items():
+            if result.healthy is not None:
+                HEALTH_CHECK_UP.labels(name).set(1 if result.healthy else 0)
+
+
+metrics.registry.add_collector(collect_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # === AI Model Management ===
 @router.get("/ai/models")
 async def get_available_models():
     """Get available AI models"""
     return {
         "current": ai_manager.get_current_model(),
-        "available": ai_manager.get_available_models()
+        "available": ai_manager.get_available_models(),
+        "stream_stats": ai_manager.get_stream_stats(),
+        "hedge_stats": ai_manager.get_hedge_stats(),
+        "providers": ai_manager.get_router_stats(),
+        "prompt_cache": ai_manager.get_prompt_cache_stats(),
+        "response_cache": ai_manager.get_response_cache_stats()
     }
 
 
@@ -343,89 +1022,230 @@ async def switch_model(request: ModelSwitchRequest):
 
 
 @router.post("/ai/clear-history")
-async def clear_history():
+async def clear_history(session_id: str = "default"):
     """Clear conversation history"""
-    ai_manager.clear_history()
+    ai_manager.clear_history(session_id)
     return {"status": "success", "message": "History cleared"}
 
 
 @router.get("/ai/history")
-async def get_history():
+async def get_history(session_id: str = "default"):
     """Get conversation history"""
-    return ai_manager.get_history()
+    return await ai_manager.get_history(session_id)
 
 
 # === WebSocket for real-time chat ===
+async def send_plan_event(event: Dict[str, Any], session_id: Optional[str]):
+    """Send command plan progress to the /ws/chat clients of the plan's session"""
+    for websocket in list(chat_sessions.get(session_id, ())):
+        await ws_manager.send_personal_message(event, websocket)
+
+
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
-    """WebSocket endpoint for real-time chat"""
+    """WebSocket endpoint for real-time chat
+
+    Each connection has its own conversation session. Clients reconnect
+    to an earlier one with ?session_id=..., as announced in the initial
+    "session" frame. Progress of a command plan ("plan_step" frames) goes
+    to the connections of the session that started it.
+
+    Messages are read continuously. A recognized control command ("stop",
+    "wróć do bazy") runs at once on the control lane, even while a reply
+    is being generated. Each chat message runs as a task that a newer
+    message, a {"type": "cancel"} frame or a disconnect cancels, which
+    also stops the model generating; the client gets a "cancelled" frame.
+    A "cancel" frame also drops the rest of the session's command plan.
+    """
     await ws_manager.connect(websocket)
+    session_id = websocket.query_params.get("session_id") or uuid.uuid4().hex
+    await ws_manager.send_personal_message({"type": "session", "session_id": session_id}, websocket)
+    chat_sessions.setdefault(session_id, set()).add(websocket)
+
+    generation: Optional[asyncio.Task] = None
+    # Robot commands finish even if the client goes away; referenced until done
+    controls: set = set()
+
+    async def run_chat(message: str, allowed_models: Optional[List[str]]):
+        try:
+            async for event in chat_pipeline(message, allowed_models=allowed_models, session_id=session_id):
+                await ws_manager.send_personal_message(event, websocket)
+        except asyncio.CancelledError:
+            await ws_manager.send_personal_message({"type": "cancelled"}, websocket)
+            raise
+        except Exception as e:
+            logger.error(f"Chat error: {e}")
+            await ws_manager.send_personal_message({
+                "type": "error",
+                "message": str(e)
+            }, websocket)
+
+    async def run_control(message: str, command: Command):
+        try:
+            for event in await control_lane(message, command, session_id):
+                await ws_manager.send_personal_message(event, websocket)
+        except Exception as e:
+            logger.error(f"Control command failed: {e}")
+            await ws_manager.send_personal_message({
+                "type": "error",
+                "message": f"Failed to execute command: {e}"
+            }, websocket)
 
     try:
         while True:
-            # Receive message
-            data = await websocket.receive_json()
+            data = await ws_manager.receive(websocket)
             message = data.get("message", "")
+            is_cancel = data.get("type") == "cancel"
 
-            if not message:
+            if not message and not is_cancel:
                 continue
 
-            # Get context
-            context = None
-            try:
-                status = await valetudo_client.get_friendly_status()
-                context = {
-                    "state": status.state,
-                    "battery": status.battery
-                }
-            except:
-                pass
-
-            # Parse command
-            parsed_command = command_mapper.parse_command(message)
-
-            # Get AI response
-            try:
-                response = await ai_manager.chat(message, context=context)
-
-                # Send response
-                await ws_manager.send_personal_message({
-                    "type": "message",
-                    "response": response,
-                    "model": ai_manager.get_current_model(),
-                    "intent": parsed_command.action if parsed_command else None
-                }, websocket)
-
-                # Execute command if detected
-                if parsed_command and parsed_command.confidence > 0.7:
-                    try:
-                        await execute_command(parsed_command.action, parsed_command.params)
-                        # Send status update
-                        await ws_manager.send_personal_message({
-                            "type": "command_executed",
-                            "action": parsed_command.action
-                        }, websocket)
-                    except Exception as e:
-                        logger.error(f"Command execution failed: {e}")
-                        await ws_manager.send_personal_message({
-                            "type": "error",
-                            "message": f"Failed to execute command: {e}"
-                        }, websocket)
-
-            except Exception as e:
-                logger.error(f"Chat error: {e}")
-                await ws_manager.send_personal_message({
-                    "type": "error",
-                    "message": str(e)
-                }, websocket)
+            # A new message supersedes the reply still being generated
+            if generation and not generation.done():
+                generation.cancel()
+            if is_cancel:
+                plan_runner.cancel(owner=session_id)
+                continue
+
+            command = control_command(message)
+            if command:
+                task = asyncio.create_task(run_control(message, command))
+                controls.add(task)
+                task.add_done_callback(controls.discard)
+            else:
+                generation = asyncio.create_task(run_chat(message, data.get("allowed_models")))
 
     except WebSocketDisconnect:
-        ws_manager.disconnect(websocket)
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        if generation:
+            generation.cancel()
+        sockets = chat_sessions.get(session_id)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del chat_sessions[session_id]
         ws_manager.disconnect(websocket)
 
 
+def control_command(message: str) -> Optional[Command]:
+    """Recognize a message for the /ws/chat control lane
+
+    Args:
+        message: User message
+
+    Returns:
+        The command if the message is a single confident control command
+    """
+    if not config.chat.control_lane_enabled:
+        return None
+    plan = parse_message_plan(message)
+    if (
+        len(plan) == 1
+        and plan[0].action in CONTROL_ACTIONS
+        and plan[0].source == "keyword"
+        and plan[0].confidence > config.chat.fast_path_threshold
+    ):
+        return plan[0]
+    return None
+
+
+async def control_lane(message: str, command: Command, session_id: str = "default") -> List[Dict[str, Any]]:
+    """Execute a control command and answer from its template
+
+    "locate" leaves a running command plan alone; the other control
+    commands replace it.
+
+    Args:
+        message: User message (used for reply language)
+        command: Command from control_command
+        session_id: Conversation session the command came from
+
+    Returns:
+        "command_executed" and "message" frames
+
+    Raises:
+        Exception if the command fails
+    """
+    start = time.perf_counter()
+    await plan_runner.start([command], owner=session_id)
+    lang = command_mapper.detect_language(message)
+    logger.info(f"Control lane: {command.action}")
+    return [
+        {"type": "command_executed", "action": command.action},
+        {
+            "type": "message",
+            "response": command_mapper.render_response(command, lang) or "",
+            "model": FAST_PATH_MODEL,
+            "intent": command.action,
+            "timings": {"total_ms": round((time.perf_counter() - start) * 1000, 2)}
+        },
+    ]
+
+
+@app.websocket("/ws/state")
+async def websocket_state(websocket: WebSocket):
+    """WebSocket endpoint for robot state
+
+    Sends a full "state" frame on connect, then "state_delta" frames with
+    only the changed fields. Frames carry an increasing "seq"; a client
+    that sees a gap reconnects for a fresh snapshot.
+    """
+    await ws_manager.connect(websocket, channel="state")
+    try:
+        await ws_manager.send_personal_message(state_hub.frame(), websocket)
+        while True:
+            # Nothing is expected from the client; this detects disconnects
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+    finally:
+        ws_manager.disconnect(websocket, channel="state")
+
+
+@app.websocket("/ws/control")
+async def websocket_control(websocket: WebSocket):
+    """WebSocket endpoint for joystick driving
+
+    Clients send {"velocity": v, "turn_rate": r, "t": <client ms>} samples
+    (both -1.0 to 1.0) at 10-20 Hz while the stick is held, and
+    {"type": "stop"} to stop at once. Each command sent to the robot is
+    answered with an "ack" frame echoing "t", to the client whose sample
+    it was; clients may report the round trip they measured as "rtt_ms"
+    in a later sample. A non-finite sample stops the robot.
+    """
+    await ws_manager.connect(websocket, channel="control")
+    try:
+        while True:
+            data = await ws_manager.receive(websocket)
+            if data.get("type") == "stop":
+                await joystick.stop()
+                continue
+            if not joystick.active:
+                # Manual driving overrides a pending chat command plan
+                plan_runner.cancel()
+            try:
+                joystick.submit(
+                    float(data.get("velocity", 0.0)),
+                    float(data.get("turn_rate", 0.0)),
+                    client_time=data.get("t"),
+                    rtt_ms=data.get("rtt_ms"),
+                    client=websocket
+                )
+            except (TypeError, ValueError):
+                await ws_manager.send_personal_message({"type": "error", "message": "Invalid sample"}, websocket)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+    finally:
+        ws_manager.disconnect(websocket, channel="control")
+
+
 # === User Tracking (Follow Me Mode) ===
 class PositionUpdate(BaseModel):
     x: int
@@ -494,5 +1314,11 @@ async def manual_move(request: ManualMoveRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/robot/manual/stats")
+async def get_manual_control_stats():
+    """Get joystick command counters and control latency"""
+    return joystick.get_stats()
+
+
 # Include router
 app.include_router(router, prefix="/api/v1")
@@ -0,0 +1,104 @@
+"""Startup benchmark - Import time and time to first request of the API server
+
+Starts fresh interpreters, so the numbers include everything a real
+server start pays for: module imports, settings, startup hook.
+
+Usage:
+    python -m src.api.startup_bench
+    python -m src.api.startup_bench --runs 5 --port 8765
+"""
+
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from typing import List, Optional, Tuple
+
+import httpx
+
+# Heavy modules that should only be imported when actually used
+LAZY_MODULES = ["openai", "anthropic", "google.generativeai"]
+
+IMPORT_SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+import src.api.server
+print(time.perf_counter() - start)
+print(",".join(name for name in {LAZY_MODULES!r} if name in sys.modules))
+"""
+
+
+def measure_import() -> Tuple[float, List[str]]:
+    """Import the server module in a fresh interpreter
+
+    Returns:
+        (seconds, vendor SDK modules loaded by the import)
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+    return float(output[0]), [name for name in output[1].split(",") if name]
+
+
+def measure_first_request(port: int, timeout: float = 60.0) -> Tuple[float, Optional[float]]:
+    """Start the server and poll it until it answers and until it is ready
+
+    Returns:
+        (seconds to the first successful request, seconds to /ready = 200
+        or None if not ready within timeout)
+    """
+    base_url = f"http://127.0.0.1:{port}/api/v1"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.server:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    first_request = ready = None
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - start < timeout and server.poll() is None:
+                try:
+                    if first_request is None:
+                        if client.get(f"{base_url}/").status_code == 200:
+                            first_request = time.perf_counter() - start
+                    elif client.get(f"{base_url}/ready").status_code == 200:
+                        ready = time.perf_counter() - start
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if first_request is None:
+        raise RuntimeError(f"Server did not answer within {timeout}s")
+    return first_request, ready
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Measure API server import time and time to first request")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for /ready")
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    loaded = sorted({name for _, modules in imports for name in modules})
+    print(f"import src.api.server   {statistics.median(t for t, _ in imports) * 1000:8.0f} ms (median of {args.runs})")
+    print(f"  vendor SDKs imported: {', '.join(loaded) or 'none'}")
+
+    starts = [measure_first_request(args.port, args.timeout) for _ in range(args.runs)]
+    print(f"first request           {statistics.median(first for first, _ in starts) * 1000:8.0f} ms")
+    ready = [r for _, r in starts if r is not None]
+    if ready:
+        print(f"ready (/ready = 200)    {statistics.median(ready) * 1000:8.0f} ms")
+    else:
+        print(f"ready (/ready = 200)    not within {args.timeout:.0f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
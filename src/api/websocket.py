@@ -1,41 +1,211 @@
-"""WebSocket manager for real-time chat"""
+"""WebSocket manager for real-time chat and robot state"""
 
-import json
+import time
+import asyncio
 import logging
-from typing import List
-from fastapi import WebSocket
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .. import metrics
+from ..serialization import Codec, get_codec, loads
 
 logger = logging.getLogger(__name__)
 
+SEND_SECONDS = metrics.histogram("ws_send_duration_seconds", "Time to send one WebSocket frame", ["channel"])
+
+# Channels: "chat" (/ws/chat, plan progress), "state" (/ws/state, robot state
+# deltas) and "control" (/ws/control, joystick acks)
+DEFAULT_CHANNEL = "chat"
+
+# Message types of which only the newest matters, the only ones ever dropped:
+# when a client's queue is full, an older queued message of the same type
+# goes first. A client that misses a "state_delta" sees the seq gap and
+# reconnects for a snapshot. Chat deltas, messages and command results are
+# never dropped.
+LATEST_ONLY_TYPES = {"state", "state_delta"}
+
+
+@dataclass
+class Connection:
+    """Client socket with its outbound queue of (message type, encoded frame)"""
+    websocket: WebSocket
+    channel: str
+    codec: Codec
+    queue: Deque[Tuple[Optional[str], Union[bytes, str]]] = field(default_factory=deque)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    drainer: Optional[asyncio.Task] = None
+    sent: int = 0
+    dropped: int = 0
+    overflowed: bool = False  # queue full of messages that must not be dropped
+
 
 class ConnectionManager:
-    """Manages WebSocket connections"""
+    """Manages WebSocket connections, grouped by channel
+
+    Sending never waits for a client: messages go to a bounded queue per
+    connection, drained by the connection's own task, so a slow client
+    only delays itself. When its queue is full, a queued LATEST_ONLY_TYPES
+    message is dropped (an older one of the same type first). Other
+    messages are never dropped: a client whose queue is full of them is
+    evicted, as is one whose send fails or takes longer than send_timeout,
+    and its socket closed.
+
+    Frames are JSON text, or binary MessagePack for clients connecting
+    with ?format=msgpack. A broadcast is encoded once per format.
+    """
+
+    def __init__(self, queue_size: int = 256, send_timeout: float = 10.0):
+        """Initialize manager
 
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        Args:
+            queue_size: Messages queued per connection before dropping or evicting
+            send_timeout: Seconds one send may take before the client is evicted
+        """
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.channels: Dict[str, Dict[WebSocket, Connection]] = {}
+        self.dropped: Counter = Counter()  # message type -> dropped messages
+        self.evicted = 0
 
-    async def connect(self, websocket: WebSocket):
-        """Accept and register new WebSocket connection"""
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        """Sockets of the default channel"""
+        return list(self.channels.get(DEFAULT_CHANNEL, {}))
+
+    async def connect(self, websocket: WebSocket, channel: str = DEFAULT_CHANNEL):
+        """Accept and register new WebSocket connection
+
+        The frame format is taken from the "format" query parameter
+        ("json" by default, or "msgpack").
+        """
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"New WebSocket connection (total: {len(self.active_connections)})")
+        connection = Connection(websocket, channel, get_codec(websocket.query_params.get("format")))
+        connection.drainer = asyncio.create_task(self._drain(connection))
+        connections = self.channels.setdefault(channel, {})
+        connections[websocket] = connection
+        logger.info(f"New WebSocket connection on {channel} (total: {len(connections)})")
 
-    def disconnect(self, websocket: WebSocket):
-        """Remove WebSocket connection"""
-        self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected (remaining: {len(self.active_connections)})")
+    def disconnect(self, websocket: WebSocket, channel: str = DEFAULT_CHANNEL):
+        """Remove WebSocket connection (no-op if already removed)"""
+        connection = self.channels.get(channel, {}).pop(websocket, None)
+        if connection is None:
+            return
+        if connection.drainer and connection.drainer is not asyncio.current_task():
+            connection.drainer.cancel()
+        logger.info(f"WebSocket disconnected from {channel} (remaining: {len(self.channels[channel])})")
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send message to specific client"""
-        await websocket.send_json(message)
+        """Queue message for a specific client (dropped if it has disconnected)"""
+        for connections in self.channels.values():
+            connection = connections.get(websocket)
+            if connection:
+                self._enqueue(connection, message.get("type"), connection.codec.encode(message))
+                return
+        logger.debug(f"Dropping {message.get('type')} message for disconnected client")
+
+    async def broadcast(self, message: dict, channel: str = DEFAULT_CHANNEL):
+        """Queue message for all clients of a channel"""
+        encoded: Dict[str, Union[bytes, str]] = {}
+        for connection in self.channels.get(channel, {}).values():
+            codec = connection.codec
+            if codec.name not in encoded:
+                encoded[codec.name] = codec.encode(message)
+            self._enqueue(connection, message.get("type"), encoded[codec.name])
+
+    async def receive(self, websocket: WebSocket) -> Any:
+        """Receive one client message, JSON text or MessagePack binary
+
+        Raises:
+            WebSocketDisconnect when the client has disconnected
+        """
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("bytes") is not None:
+            return get_codec("msgpack").decode(message["bytes"])
+        return loads(message["text"])
+
+    async def close(self):
+        """Stop all drainers (shutdown)"""
+        for channel, connections in list(self.channels.items()):
+            for websocket in list(connections):
+                self.disconnect(websocket, channel)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, drop and eviction counters"""
+        channels = {}
+        for channel, connections in self.channels.items():
+            depths = [len(connection.queue) for connection in connections.values()]
+            channels[channel] = {
+                "connections": len(depths),
+                "queued": sum(depths),
+                "max_queue_depth": max(depths, default=0),
+                "sent": sum(connection.sent for connection in connections.values()),
+            }
+        return {
+            "channels": channels,
+            "dropped": dict(self.dropped),
+            "evicted": self.evicted,
+            "queue_size": self.queue_size,
+        }
+
+    def _enqueue(self, connection: Connection, message_type: Optional[str], frame: Union[bytes, str]):
+        if connection.overflowed:
+            return
+        queue = connection.queue
+        if len(queue) >= self.queue_size:
+            victim = None
+            if message_type in LATEST_ONLY_TYPES:
+                victim = next((i for i, (queued_type, _) in enumerate(queue) if queued_type == message_type), None)
+            if victim is None:
+                victim = next((i for i, (queued_type, _) in enumerate(queue) if queued_type in LATEST_ONLY_TYPES), None)
+            if victim is None:
+                if message_type in LATEST_ONLY_TYPES:
+                    connection.dropped += 1
+                    self.dropped[message_type] += 1
+                    return
+                # Nothing may be dropped: the drainer evicts the client
+                connection.overflowed = True
+                connection.ready.set()
+                return
+            dropped_type = queue[victim][0]
+            del queue[victim]
+            connection.dropped += 1
+            self.dropped[dropped_type] += 1
+        queue.append((message_type, frame))
+        connection.ready.set()
 
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        for connection in self.active_connections:
+    async def _drain(self, connection: Connection):
+        """Send queued messages of one connection in order"""
+        queue = connection.queue
+        websocket = connection.websocket
+        send = websocket.send_bytes if connection.codec.binary else websocket.send_text
+        send_seconds = SEND_SECONDS.labels(connection.channel)
+        try:
+            while True:
+                if connection.overflowed:
+                    raise OverflowError(f"outbound queue full ({len(queue)} messages)")
+                if not queue:
+                    connection.ready.clear()
+                    await connection.ready.wait()
+                    continue
+                _, frame = queue.popleft()
+                start = time.perf_counter()
+                await asyncio.wait_for(send(frame), self.send_timeout)
+                send_seconds.observe(time.perf_counter() - start)
+                connection.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Evicting WebSocket client on {connection.channel}: {str(e) or type(e).__name__}")
+            self.evicted += 1
+            self.disconnect(connection.websocket, connection.channel)
             try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to send message: {e}")
+                await connection.websocket.close()
+            except Exception:
+                pass
 
 
 # Global instance
@@ -3,11 +3,21 @@
 import os
 import yaml
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+class ValetudoMQTTConfig(BaseModel):
+    """Valetudo MQTT configuration"""
+    enabled: bool = True
+    broker: str = "192.168.1.100"
+    port: int = 1883
+    username: str = ""
+    password: str = ""
+    base_topic: str = "valetudo"
+
+
 class ValetudoConfig(BaseModel):
     """Valetudo connection configuration"""
     host: str = "192.168.1.100"
@@ -15,22 +25,25 @@ class ValetudoConfig(BaseModel):
     protocol: str = "http"
     api_base: str = "/api/v2"
     timeout: int = 10
+    mqtt: ValetudoMQTTConfig = Field(default_factory=ValetudoMQTTConfig)
+    dual_transport: bool = True  # race stop/pause/home over REST and MQTT
+    transport_ewma_alpha: float = 0.3
+    mqtt_ack_timeout: float = 5.0
+    straggler_timeout: float = 1.0  # max wait for a raced duplicate before the next command
+    state_poll_active: float = 2.0  # seconds between state polls while cleaning/moving/returning
+    state_poll_idle: float = 10.0  # ... while idle, paused or in error
+    state_poll_docked: float = 30.0  # ... while docked
+    state_resync_interval: float = 60.0  # ... while MQTT pushes state changes
+    manual_tick_interval: float = 0.1  # seconds between joystick commands sent to the robot
+    manual_deadman_timeout: float = 0.5  # stop the robot after this long without joystick input
+    manual_max_velocity: float = 0.5  # velocity at full stick deflection (0.0-1.0)
+    manual_max_turn_rate: float = 90.0  # deg/s at full stick deflection
 
     @property
     def base_url(self) -> str:
         return f"{self.protocol}://{self.host}:{self.port}{self.api_base}"
 
 
-class ValetudoMQTTConfig(BaseModel):
-    """Valetudo MQTT configuration"""
-    enabled: bool = True
-    broker: str = "192.168.1.100"
-    port: int = 1883
-    username: str = ""
-    password: str = ""
-    base_topic: str = "valetudo"
-
-
 class LocalAIConfig(BaseModel):
     """Local AI (LM Studio) configuration"""
     enabled: bool = True
@@ -41,6 +54,8 @@ class LocalAIConfig(BaseModel):
     timeout: int = 30
     max_tokens: int = 2000
     temperature: float = 0.7
+    cache_prompt: bool = True  # reuse KV cache of the matching prompt prefix (llama.cpp)
+    slot_id: Optional[int] = None  # pin requests to one server slot (llama.cpp)
 
     @property
     def base_url(self) -> str:
@@ -88,10 +103,42 @@ class AIConfig(BaseModel):
     default_model: str = "local"  # "local" or "online"
     auto_fallback: bool = True
     language: str = "pl"
+    hedge_enabled: bool = False  # race a backup provider when the first token is late
+    hedge_delay: float = 3.0  # seconds to wait for a first token before hedging
+    hedge_budget: float = 0.2  # max fraction of requests allowed to hedge
+    hedge_provider: str = ""  # backup provider; empty = next-best ranked provider
+    router_ewma_alpha: float = 0.3  # smoothing of per-provider latency/error EWMAs
+    router_failure_threshold: int = 3  # consecutive failures that open a breaker
+    router_open_seconds: float = 30.0  # cooldown before a trial request to an open provider
+    router_probe_interval: float = 15.0  # seconds between health probes of open providers
+    router_preference_bias: float = 0.5  # score multiplier for the preferred provider
+    prompt_token_budget: int = 3000  # estimated prompt tokens incl. system prompt and history
+    summarize_history: bool = True  # fold turns over the budget into a running summary
+    response_cache_enabled: bool = True  # reuse answers to repeated questions
+    response_cache_size: int = 256
+    response_cache_ttl: float = 300.0  # seconds
+    tools_enabled: bool = True  # let models call robot actions as tools
     local: LocalAIConfig = Field(default_factory=LocalAIConfig)
     online: OnlineAIConfig = Field(default_factory=OnlineAIConfig)
 
 
+class ChatConfig(BaseModel):
+    """Chat handling configuration"""
+    fast_path_enabled: bool = True  # answer recognized commands without the LLM
+    fast_path_threshold: float = 0.85  # minimum parse confidence for the fast path
+    control_lane_enabled: bool = True  # run stop/pause/home/locate on /ws/chat without waiting for a reply
+    classifier_enabled: bool = True  # intent classifier behind the keyword matcher
+    classifier_threshold: float = 0.6  # minimum classifier probability
+    classifier_model_path: str = "data/models/intent_model.npz"  # trained from the bundled corpus if missing
+    languages: list[str] = Field(default_factory=lambda: ["pl", "en"])  # command languages; packs in src/valetudo/data/languages
+    matcher_cache_dir: str = "data/cache/matchers"  # compiled keyword matchers
+    parse_memo_size: int = 1024  # recent normalized messages whose parse results are kept
+    plan_enabled: bool = True  # split "clean the kitchen and go home" into ordered steps
+    plan_poll_interval: float = 2.0  # seconds between robot state checks while a step runs
+    plan_start_timeout: float = 30.0  # seconds for a long-running step to make the robot busy
+    plan_step_timeout: float = 7200.0  # seconds a step may keep the robot busy before the plan aborts
+
+
 class VoiceConfig(BaseModel):
     """Voice configuration"""
     enabled: bool = True
@@ -110,6 +157,11 @@ class APIConfig(BaseModel):
     host: str = "0.0.0.0"
     port: int = 8000
     cors_origins: list[str] = Field(default_factory=lambda: ["http://localhost:3000"])
+    ws_queue_size: int = 256  # outbound messages queued per WebSocket client before dropping state frames or evicting
+    ws_send_timeout: float = 10.0  # seconds a send may take before the client is evicted
+    health_interval: float = 30.0  # seconds between background probes of Valetudo and MQTT
+    health_ai_interval: float = 300.0  # seconds between probes of each AI provider
+    health_timeout: float = 5.0  # seconds a probe may take before it counts as failed
 
 
 class LoggingConfig(BaseModel):
@@ -127,14 +179,19 @@ class AdvancedConfig(BaseModel):
     map_cache_enabled: bool = True
     map_cache_dir: str = "data/maps"
     conversation_history: bool = True
-    history_length: int = 50
+    history_length: int = 50  # messages kept per session
+    history_max_sessions: int = 100  # sessions kept in memory (LRU)
     history_dir: str = "data/conversations"
+    history_max_file_bytes: int = 262144  # session file size that triggers compaction
+    history_max_age_days: float = 30.0  # session files idle this long are removed (0 = keep)
+    history_max_files: int = 1000  # session files kept at most, oldest removed first (0 = no limit)
 
 
 class Settings(BaseSettings):
     """Main application settings"""
     valetudo: ValetudoConfig = Field(default_factory=ValetudoConfig)
     ai: AIConfig = Field(default_factory=AIConfig)
+    chat: ChatConfig = Field(default_factory=ChatConfig)
     voice: VoiceConfig = Field(default_factory=VoiceConfig)
     web: WebConfig = Field(default_factory=WebConfig)
     api: APIConfig = Field(default_factory=APIConfig)
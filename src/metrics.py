@@ -0,0 +1,327 @@
+"""Metrics - In-process counters, gauges and histograms
+
+Metrics are plain Python objects recorded on the hot path and rendered in
+the Prometheus text exposition format by GET /metrics, so no external
+service is needed to see where time goes (any Prometheus-compatible
+scraper can still collect them).
+
+    REQUESTS = metrics.counter("valetudo_requests_total", "Valetudo calls", ["capability"])
+    REQUESTS.labels("BasicControlCapability").inc()
+
+Resolving labels is a dict lookup; keep the child (`.labels(...)`) on
+very hot paths. Values kept elsewhere (queue depths, cache counters) are
+copied into metrics by collectors right before rendering instead of
+being recorded twice.
+
+Recording takes no lock: updates from other threads (paho's MQTT thread)
+may very rarely be lost, which is fine for monitoring.
+
+Usage:
+    python -m src.metrics bench
+"""
+
+import sys
+import math
+import time
+import logging
+import argparse
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from fast in-process work to slow LLM replies
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+QUOTE = '"'
+ESCAPED_QUOTE = '\\"'
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def set_total(self, value: float):
+        """Set the total of a counter maintained elsewhere (collectors)"""
+        self.value = value
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # per bucket, last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    """Named metric with a child per combination of label values"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """Initialize metric
+
+        Args:
+            name: Metric name (e.g., "http_request_duration_seconds")
+            documentation: Help text
+            labelnames: Label names, values are given to labels()
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._default = None if self.labelnames else self.labels()
+
+    def labels(self, *values: str):
+        """Get the child for label values (created on first use)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def clear(self):
+        """Remove all children (collectors whose label sets change)"""
+        self._children.clear()
+        if self._default is not None:
+            self._default = self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        """(name suffix, rendered labels, value) of every sample"""
+        for values, child in self._children.items():
+            yield "", _render_labels(self.labelnames, values), child.value
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increment (metrics without labels)"""
+        self._default.value += amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+
+    type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float):
+        """Set value (metrics without labels)"""
+        self._default.value = value
+
+    def inc(self, amount: float = 1.0):
+        self._default.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self._default.value -= amount
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """Initialize histogram
+
+        Args:
+            name: Metric name, by convention ending in the unit ("_seconds")
+            documentation: Help text
+            labelnames: Label names
+            buckets: Upper bounds of the buckets, ascending (+Inf is implied)
+        """
+        self.bounds = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        """Record a value (metrics without labels)"""
+        self._default.observe(value)
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        bounds = [_format_value(bound) for bound in self.bounds] + ["+Inf"]
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                yield "_bucket", _render_labels(self.labelnames + ("le",), values + (bound,)), cumulative
+            labels = _render_labels(self.labelnames, values)
+            yield "_sum", labels, child.sum
+            yield "_count", labels, cumulative
+
+
+class Registry:
+    """Set of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Register a function that updates metrics right before rendering"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric._samples():
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered as {metric.type} {metric.labelnames}")
+        return metric
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _render_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value)).replace(QUOTE, ESCAPED_QUOTE)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+# Default registry, rendered by GET /metrics
+registry = Registry()
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+
+
+def _time_ns(fn: Callable[[], None], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e9
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark metric recording")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Time one recording per metric type")
+    bench.add_argument("--rounds", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    bench_registry = Registry()
+    plain_counter = bench_registry.counter("bench_total", "Counter without labels")
+    labeled_counter = bench_registry.counter("bench_labeled_total", "Counter with labels", ["provider"])
+    plain_histogram = bench_registry.histogram("bench_seconds", "Histogram without labels")
+    labeled_histogram = bench_registry.histogram("bench_labeled_seconds", "Histogram with labels", ["route", "status"])
+    child = labeled_histogram.labels("/api/v1/robot/status", "200")
+
+    cases = {
+        "counter.inc()": plain_counter.inc,
+        "counter.labels(p).inc()": lambda: labeled_counter.labels("openai").inc(),
+        "histogram.observe(v)": lambda: plain_histogram.observe(0.042),
+        "histogram.labels(r, s).observe(v)": lambda: labeled_histogram.labels("/api/v1/robot/status", "200").observe(0.042),
+        "child.observe(v) (labels kept)": lambda: child.observe(0.042),
+        "empty call (baseline)": lambda: None,
+    }
+    for name, fn in cases.items():
+        print(f"{name:<36} {_time_ns(fn, args.rounds):8.0f} ns")
+
+    start = time.perf_counter()
+    bench_registry.render()
+    print(f"{'render':<36} {(time.perf_counter() - start) * 1e6:8.0f} us")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
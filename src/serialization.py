@@ -0,0 +1,148 @@
+"""Serialization - Fast JSON (orjson) and MessagePack codecs
+
+JSON goes through orjson everywhere it is on a hot path (REST responses,
+MQTT messages, WebSocket frames). WebSocket clients may ask for binary
+MessagePack frames with ?format=msgpack.
+
+Usage:
+    python -m src.serialization bench
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import orjson
+import msgpack
+from starlette.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode object as UTF-8 JSON"""
+    return orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+
+def dumps_str(obj: Any) -> str:
+    """Encode object as a JSON string"""
+    return orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Decode JSON
+
+    Raises:
+        json.JSONDecodeError (orjson.JSONDecodeError) on invalid input
+    """
+    return orjson.loads(data)
+
+
+def packb(obj: Any) -> bytes:
+    """Encode object as MessagePack"""
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode MessagePack"""
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (the API's default response class)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Wire format of WebSocket frames"""
+    name: str
+    binary: bool  # sent as binary frames (bytes) instead of text frames (str)
+    encode: Callable[[Any], Union[bytes, str]]
+    decode: Callable[[Union[bytes, str]], Any]
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec("json", False, dumps_str, loads),
+    "msgpack": Codec("msgpack", True, packb, unpackb),
+}
+
+
+def get_codec(name: Optional[str]) -> Codec:
+    """Get codec by name, JSON for unknown or missing names"""
+    return CODECS.get((name or "json").lower(), CODECS["json"])
+
+
+def _bench_frames() -> Dict[str, Dict[str, Any]]:
+    """Representative frames: state delta, map delta, chat delta and reply"""
+    rng = random.Random(0)
+    pixels = []
+    x, y = 1200, 1400
+    for _ in range(1500):
+        x += rng.randint(-2, 2)
+        y += rng.randint(-2, 2)
+        pixels.extend((x, y))
+    return {
+        "state_delta": {"type": "state_delta", "seq": 1842, "data": {"state": "cleaning", "battery": 87}},
+        "map_delta": {
+            "type": "map_delta",
+            "seq": 311,
+            "layers": [
+                {"type": "segment", "metaData": {"segmentId": "3", "name": "Kuchnia"}, "pixels": pixels},
+            ],
+            "entities": [
+                {"type": "robot_position", "points": [x * 5, y * 5], "metaData": {"angle": 137}},
+                {"type": "path", "points": pixels[-400:]},
+            ],
+        },
+        "chat_delta": {"type": "delta", "delta": "Jasne, zaczynam sprzątanie kuchni "},
+        "chat_message": {
+            "type": "message",
+            "response": "Jasne! Zaczynam sprzątanie kuchni i łazienki, a potem wrócę do stacji. " * 3,
+            "model": "local",
+            "intent": "clean_rooms",
+            "plan": ["clean_rooms", "home"],
+            "timings": {"parse_ms": 0.05, "context_ms": 12.4, "ttft_ms": 310.2, "llm_ms": 2210.7, "total_ms": 2215.3},
+        },
+    }
+
+
+def _time_us(fn: Callable[[], Any], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark JSON and MessagePack encoding")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Compare payload size and encode/decode time per frame type")
+    bench.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    formats = {
+        "json": (lambda obj: json.dumps(obj).encode(), json.loads),
+        "orjson": (dumps, loads),
+        "msgpack": (packb, unpackb),
+    }
+    print(f"{'frame':<13} {'format':<8} {'bytes':>7} {'encode us':>10} {'decode us':>10}")
+    for frame_name, frame in _bench_frames().items():
+        for format_name, (encode, decode) in formats.items():
+            data = encode(frame)
+            assert decode(data) == frame
+            rounds = args.rounds if len(data) < 4096 else max(args.rounds // 10, 1)
+            encode_us = _time_us(lambda: encode(frame), rounds)
+            decode_us = _time_us(lambda: decode(data), rounds)
+            print(f"{frame_name:<13} {format_name:<8} {len(data):>7} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,5 +3,7 @@
 from .api_client import ValetudoAPIClient
 from .mqtt_client import ValetudoMQTTClient
 from .command_mapper import CommandMapper
+from .command_dispatcher import CommandDispatcher
+from .intent_classifier import IntentClassifier
 
-__all__ = ['ValetudoAPIClient', 'ValetudoMQTTClient', 'CommandMapper']
+__all__ = ['ValetudoAPIClient', 'ValetudoMQTTClient', 'CommandMapper', 'CommandDispatcher', 'IntentClassifier']
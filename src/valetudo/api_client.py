@@ -1,12 +1,30 @@
 """Valetudo REST API Client"""
 
+import time
 import httpx
 import logging
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 
+from .. import metrics
+
 logger = logging.getLogger(__name__)
 
+REQUEST_SECONDS = metrics.histogram(
+    "valetudo_request_duration_seconds", "Valetudo REST call latency", ["method", "capability"]
+)
+REQUEST_ERRORS = metrics.counter(
+    "valetudo_request_errors_total", "Failed Valetudo REST calls", ["method", "capability"]
+)
+
+
+def capability_label(endpoint: str) -> str:
+    """Metric label of an endpoint: the capability name, or the path outside capabilities"""
+    path = endpoint.strip("/")
+    if path.startswith("robot/capabilities/"):
+        return path.split("/")[2]
+    return path
+
 
 @dataclass
 class RobotStatus:
@@ -54,16 +72,22 @@ class ValetudoAPIClient:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         logger.debug(f"GET {url}")
 
+        capability = capability_label(endpoint)
+        start = time.perf_counter()
         try:
             response = await self.client.get(url)
             response.raise_for_status()
             return response.json()
         except httpx.HTTPError as e:
+            REQUEST_ERRORS.labels("GET", capability).inc()
             logger.error(f"HTTP error: {e}")
             raise
         except Exception as e:
+            REQUEST_ERRORS.labels("GET", capability).inc()
             logger.error(f"Request failed: {e}")
             raise
+        finally:
+            REQUEST_SECONDS.labels("GET", capability).observe(time.perf_counter() - start)
 
     async def _put(self, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make PUT request to Valetudo API
@@ -78,16 +102,22 @@ class ValetudoAPIClient:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         logger.debug(f"PUT {url} with data: {data}")
 
+        capability = capability_label(endpoint)
+        start = time.perf_counter()
         try:
             response = await self.client.put(url, json=data)
             response.raise_for_status()
             return response.json() if response.text else {}
         except httpx.HTTPError as e:
+            REQUEST_ERRORS.labels("PUT", capability).inc()
             logger.error(f"HTTP error: {e}")
             raise
         except Exception as e:
+            REQUEST_ERRORS.labels("PUT", capability).inc()
             logger.error(f"Request failed: {e}")
             raise
+        finally:
+            REQUEST_SECONDS.labels("PUT", capability).observe(time.perf_counter() - start)
 
     # ===== Robot Status =====
 
@@ -280,12 +310,18 @@ class ValetudoAPIClient:
             }
         })
 
-    async def manual_control(self, action: str, value: Optional[float] = None) -> Dict[str, Any]:
+    async def manual_control(
+        self,
+        action: str,
+        value: Optional[float] = None,
+        turn_rate: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Manual control of the robot
 
         Args:
             action: Control action ("enable", "disable", "move", "rotate")
             value: Optional value for move/rotate (speed or angle)
+            turn_rate: Optional turn rate for move, deg/s (positive turns left)
 
         Returns:
             API response
@@ -293,6 +329,8 @@ class ValetudoAPIClient:
         payload = {"action": action}
         if value is not None:
             payload["value"] = value
+        if turn_rate is not None:
+            payload["turn_rate"] = turn_rate
 
         return await self._put("robot/capabilities/ManualControlCapability", payload)
 
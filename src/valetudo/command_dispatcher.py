@@ -0,0 +1,263 @@
+"""Command Dispatcher - Sends robot commands over REST and MQTT"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+from dataclasses import dataclass
+
+from .api_client import ValetudoAPIClient
+from .mqtt_client import ValetudoMQTTClient
+
+logger = logging.getLogger(__name__)
+
+
+# Actions that must reach the robot as fast as possible
+CRITICAL_ACTIONS = {"stop", "pause", "home"}
+
+# action -> (REST endpoint, REST payload)
+REST_COMMANDS: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "start_cleaning": ("robot/capabilities/BasicControlCapability", {"action": "start"}),
+    "stop": ("robot/capabilities/BasicControlCapability", {"action": "stop"}),
+    "pause": ("robot/capabilities/BasicControlCapability", {"action": "pause"}),
+    "home": ("robot/capabilities/BasicControlCapability", {"action": "home"}),
+    "locate": ("robot/capabilities/LocateCapability", {"action": "locate"}),
+}
+
+# action -> (MQTT topic suffix, MQTT payload), following Valetudo's command topics
+MQTT_COMMANDS: Dict[str, Tuple[str, str]] = {
+    "start_cleaning": ("BasicControlCapability/operation/set", "START"),
+    "stop": ("BasicControlCapability/operation/set", "STOP"),
+    "pause": ("BasicControlCapability/operation/set", "PAUSE"),
+    "home": ("BasicControlCapability/operation/set", "HOME"),
+    "locate": ("LocateCapability/locate/set", "PERFORM"),
+}
+
+
+@dataclass
+class TransportStats:
+    """Latency statistics for one transport"""
+    ewma_ms: Optional[float] = None
+    samples: int = 0
+    failures: int = 0
+
+
+@dataclass
+class DispatchResult:
+    """Outcome of a dispatched command"""
+    action: str
+    transport: str  # "rest" or "mqtt"
+    latency_ms: float
+    raced: bool = False
+    confirmed: bool = True  # False when only the MQTT broker acknowledged (PUBACK)
+
+
+class CommandDispatcher:
+    """Dispatches robot commands over the fastest available transport
+
+    Critical commands (stop, pause, home) are sent over REST and MQTT at the
+    same time and the first acknowledgement wins. Both transports carry the
+    same absolute target state, so the second delivery is a no-op on the
+    robot.
+
+    The acknowledgements differ: a REST response comes from Valetudo on the
+    robot, an MQTT PUBACK only from the broker, so a command delivered over
+    MQTT is reported with confirmed=False. Neither can be taken back once
+    sent (cancelling a task does not recall a PUT already on the wire or a
+    message paho has queued), so the losing duplicate is awaited, up to
+    `straggler_timeout`, before the next command goes out. Only a duplicate
+    slower than that can still arrive after a newer command; this is logged.
+
+    Other commands go over the transport with the lower EWMA latency.
+    """
+
+    def __init__(
+        self,
+        api_client: ValetudoAPIClient,
+        mqtt_client: Optional[ValetudoMQTTClient] = None,
+        dual_transport: bool = True,
+        ewma_alpha: float = 0.3,
+        mqtt_ack_timeout: float = 5.0,
+        straggler_timeout: float = 1.0
+    ):
+        """Initialize command dispatcher
+
+        Args:
+            api_client: Valetudo REST client
+            mqtt_client: Valetudo MQTT client (optional)
+            dual_transport: Race critical commands over both transports
+            ewma_alpha: Smoothing factor for latency EWMA (0.0-1.0)
+            mqtt_ack_timeout: Seconds to wait for MQTT PUBACK
+            straggler_timeout: Seconds a new command waits for the duplicate
+                of a previous race still in flight
+        """
+        self.api_client = api_client
+        self.mqtt_client = mqtt_client
+        self.dual_transport = dual_transport
+        self.ewma_alpha = ewma_alpha
+        self.mqtt_ack_timeout = mqtt_ack_timeout
+        self.straggler_timeout = straggler_timeout
+
+        self.stats: Dict[str, TransportStats] = {
+            "rest": TransportStats(),
+            "mqtt": TransportStats(),
+        }
+        self._stragglers: Set[asyncio.Task] = set()
+
+        logger.info(f"Initialized CommandDispatcher (mqtt: {mqtt_client is not None})")
+
+    def supports(self, action: str) -> bool:
+        """Check if action can be dispatched"""
+        return action in REST_COMMANDS
+
+    def _mqtt_available(self, action: str) -> bool:
+        return (
+            self.mqtt_client is not None
+            and self.mqtt_client.connected
+            and action in MQTT_COMMANDS
+        )
+
+    def _record(self, transport: str, latency_ms: float):
+        """Update EWMA latency for transport"""
+        stats = self.stats[transport]
+        if stats.ewma_ms is None:
+            stats.ewma_ms = latency_ms
+        else:
+            stats.ewma_ms = self.ewma_alpha * latency_ms + (1 - self.ewma_alpha) * stats.ewma_ms
+        stats.samples += 1
+
+    async def _send(self, transport: str, action: str) -> float:
+        """Send action over one transport
+
+        Returns:
+            Latency in milliseconds until the transport acknowledged (the
+            robot for REST, the broker for MQTT)
+        """
+        start = time.perf_counter()
+        try:
+            if transport == "rest":
+                endpoint, payload = REST_COMMANDS[action]
+                await self.api_client._put(endpoint, payload)
+            else:
+                topic, payload = MQTT_COMMANDS[action]
+                await self.mqtt_client.publish_and_wait(topic, payload, self.mqtt_ack_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats[transport].failures += 1
+            raise
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._record(transport, latency_ms)
+        return latency_ms
+
+    async def _settle_stragglers(self):
+        """Wait for duplicates still in flight from earlier races
+
+        A duplicate that is already sent cannot be recalled, so the next
+        command waits for it to be acknowledged instead of racing it.
+        """
+        if not self._stragglers:
+            return
+        _, pending = await asyncio.wait(set(self._stragglers), timeout=self.straggler_timeout)
+        for task in pending:
+            logger.warning(
+                f"Duplicate command still in flight after {self.straggler_timeout}s, "
+                f"it may reach the robot after the next command"
+            )
+            task.cancel()
+        self._stragglers.clear()
+
+    async def dispatch(self, action: str) -> DispatchResult:
+        """Send command to the robot
+
+        Args:
+            action: Command action (e.g., "stop", "home", "start_cleaning")
+
+        Returns:
+            DispatchResult describing which transport delivered it
+
+        Raises:
+            ValueError for unknown actions, or the transport error if all fail
+        """
+        if action not in REST_COMMANDS:
+            raise ValueError(f"Unsupported action: {action}")
+
+        await self._settle_stragglers()
+
+        if action in CRITICAL_ACTIONS and self.dual_transport and self._mqtt_available(action):
+            return await self._race(action)
+
+        transport = self._pick_transport(action)
+        try:
+            latency_ms = await self._send(transport, action)
+        except Exception as e:
+            other = "rest" if transport == "mqtt" else "mqtt"
+            if other == "mqtt" and not self._mqtt_available(action):
+                raise
+            logger.warning(f"{transport} failed for {action} ({e}), retrying over {other}")
+            transport = other
+            latency_ms = await self._send(transport, action)
+
+        return DispatchResult(
+            action=action,
+            transport=transport,
+            latency_ms=latency_ms,
+            confirmed=transport == "rest"
+        )
+
+    def _pick_transport(self, action: str) -> str:
+        """Pick transport with the lower EWMA latency (REST until MQTT is measured)"""
+        if not self._mqtt_available(action):
+            return "rest"
+
+        rest_ms = self.stats["rest"].ewma_ms
+        mqtt_ms = self.stats["mqtt"].ewma_ms
+        if mqtt_ms is not None and (rest_ms is None or mqtt_ms < rest_ms):
+            return "mqtt"
+        return "rest"
+
+    async def _race(self, action: str) -> DispatchResult:
+        """Send action over both transports, return on first acknowledgement"""
+        tasks = {
+            asyncio.create_task(self._send("rest", action)): "rest",
+            asyncio.create_task(self._send("mqtt", action)): "mqtt",
+        }
+        pending = set(tasks)
+        errors = []
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for loser in pending:
+                        self._stragglers.add(loser)
+                        loser.add_done_callback(self._discard_straggler)
+                    logger.info(f"{action} acknowledged over {tasks[task]} first")
+                    return DispatchResult(
+                        action=action,
+                        transport=tasks[task],
+                        latency_ms=task.result(),
+                        raced=True,
+                        confirmed=tasks[task] == "rest"
+                    )
+                errors.append(task.exception())
+                logger.warning(f"{tasks[task]} failed for {action}: {task.exception()}")
+
+        raise errors[0]
+
+    def _discard_straggler(self, task: asyncio.Task):
+        self._stragglers.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Duplicate command failed after race: {task.exception()}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-transport latency statistics"""
+        return {
+            name: {
+                "ewma_ms": round(stats.ewma_ms, 2) if stats.ewma_ms is not None else None,
+                "samples": stats.samples,
+                "failures": stats.failures,
+            }
+            for name, stats in self.stats.items()
+        }
@@ -1,121 +1,105 @@
 """Command Mapper - Maps natural language to Valetudo commands"""
 
-import re
+import os
+import time
+import bisect
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Deque, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+from .keyword_matcher import KeywordHit
+from .language_id import LanguageIdentifier
+from .language_packs import LanguagePack, LanguagePacks
+
+if TYPE_CHECKING:
+    from .intent_classifier import IntentClassifier
+
 logger = logging.getLogger(__name__)
 
 
+def normalize_text(text: str) -> str:
+    """Normalize utterance for parsing (case, spacing)"""
+    return " ".join(text.lower().split())
+
+
 @dataclass
 class Command:
     """Parsed command"""
     action: str
     params: Dict[str, Any]
     confidence: float = 1.0
+    source: str = "keyword"  # "keyword" or "classifier" (a guess, never executed from chat)
 
 
 class CommandMapper:
-    """Maps natural language commands to Valetudo API calls"""
-
-    # Polish keywords for actions
-    CLEAN_KEYWORDS_PL = [
-        "posprzątaj", "wysprzątaj", "sprzątaj", "odkurz", "wymyj", "wyczyść"
-    ]
-    STOP_KEYWORDS_PL = [
-        "stop", "zatrzymaj", "przerwij", "przestań"
-    ]
-    PAUSE_KEYWORDS_PL = [
-        "pauzuj", "wstrzymaj", "poczekaj"
-    ]
-    HOME_KEYWORDS_PL = [
-        "wróć", "powrót", "dom", "stacja", "baza", "dokuj"
-    ]
-    LOCATE_KEYWORDS_PL = [
-        "gdzie jesteś", "znajdź się", "lokalizuj", "dźwięk"
-    ]
-    STATUS_KEYWORDS_PL = [
-        "status", "stan", "jak się masz", "co robisz", "bateria"
-    ]
-    FOLLOW_KEYWORDS_PL = [
-        "jedź za mną", "chodź za mną", "podążaj za mną", "śledź mnie",
-        "chodź ze mną", "jedź ze mną", "follow me"
-    ]
-    GOTO_KEYWORDS_PL = [
-        "jedź do", "pojed do", "idź do", "przejed do"
-    ]
-    MOVE_KEYWORDS_PL = {
-        "forward": ["jedź do przodu", "do przodu", "naprzód"],
-        "backward": ["jedź do tyłu", "do tyłu", "cofnij się"],
-        "left": ["w lewo", "skręć w lewo", "obróć się w lewo"],
-        "right": ["w prawo", "skręć w prawo", "obróć się w prawo"]
-    }
-
-    # English keywords
-    CLEAN_KEYWORDS_EN = [
-        "clean", "vacuum", "mop", "start"
-    ]
-    STOP_KEYWORDS_EN = [
-        "stop", "halt", "cancel"
-    ]
-    PAUSE_KEYWORDS_EN = [
-        "pause", "wait"
-    ]
-    HOME_KEYWORDS_EN = [
-        "home", "dock", "return", "base"
-    ]
-    LOCATE_KEYWORDS_EN = [
-        "where are you", "locate", "find", "sound"
-    ]
-    STATUS_KEYWORDS_EN = [
-        "status", "state", "battery", "how are you"
-    ]
-    FOLLOW_KEYWORDS_EN = [
-        "follow me", "come with me", "track me", "follow along"
-    ]
-    GOTO_KEYWORDS_EN = [
-        "go to", "move to", "navigate to", "head to"
-    ]
-    MOVE_KEYWORDS_EN = {
-        "forward": ["move forward", "go forward", "ahead"],
-        "backward": ["move backward", "go back", "reverse"],
-        "left": ["turn left", "go left", "rotate left"],
-        "right": ["turn right", "go right", "rotate right"]
-    }
-
-    # Room names mapping (Polish -> common patterns)
-    ROOM_PATTERNS_PL = {
-        "salon": ["salon", "pokój dzienny"],
-        "sypialnia": ["sypialnia", "sypialnia"],
-        "kuchnia": ["kuchnia", "kuchni"],
-        "łazienka": ["łazienka", "łazience"],
-        "przedpokój": ["przedpokój", "korytarz", "hol"],
-        "biuro": ["biuro", "gabinet"],
-        "dziecięcy": ["pokój dziecięcy", "dziecięcy", "dziecka"],
-        "garderoba": ["garderoba", "szafa"],
-    }
-
-    # Room names mapping (English -> common patterns)
-    ROOM_PATTERNS_EN = {
-        "living room": ["living room", "lounge"],
-        "bedroom": ["bedroom", "bed room"],
-        "kitchen": ["kitchen"],
-        "bathroom": ["bathroom", "bath"],
-        "hallway": ["hallway", "corridor", "hall"],
-        "office": ["office", "study"],
-        "kids room": ["kids room", "children's room", "child's room"],
-        "closet": ["closet", "wardrobe"],
-    }
-
-    def __init__(self, language: str = "pl"):
+    """Maps natural language commands to Valetudo API calls
+
+    Keywords, room names and reply templates come from per-language packs
+    (data/languages/*.json). A trigram model orders the languages to try;
+    when it is unsure, the default language is tried first and the others
+    after it.
+    """
+
+    # Steps merged into one segment clean when adjacent
+    CLEANING_ACTIONS = ("start_cleaning", "clean_rooms")
+
+    # Classifier matches never reach the chat fast path (> 0.85), so the
+    # model still answers when the second tier was unsure; being tagged
+    # source="classifier", they are never executed from chat either
+    CLASSIFIER_MAX_CONFIDENCE = 0.85
+
+    def __init__(
+        self,
+        language: str = "pl",
+        classifier: Optional["IntentClassifier"] = None,
+        classifier_threshold: float = 0.6,
+        languages: Optional[List[str]] = None,
+        packs: Optional[LanguagePacks] = None,
+        language_id: Optional[LanguageIdentifier] = None,
+        memo_size: int = 1024
+    ):
         """Initialize command mapper
 
         Args:
-            language: Default language ("pl" or "en")
+            language: Default language ("pl", "en", "de")
+            classifier: Intent classifier consulted when no keyword matches (optional)
+            classifier_threshold: Minimum classifier probability to accept a command
+            languages: Languages to recognize (default: "pl" and "en")
+            packs: Language pack registry (optional)
+            language_id: Language identifier (optional, bundled model by default)
+            memo_size: Normalized utterances whose parse results are kept
         """
         self.language = language
-        logger.info(f"Initialized CommandMapper with language: {language}")
+        self.languages = list(dict.fromkeys([language, *(languages or ["pl", "en"])]))
+        self.classifier = classifier
+        self.classifier_threshold = classifier_threshold
+        self.packs = packs or LanguagePacks()
+        self.language_id = language_id or LanguageIdentifier.load()
+        self.memo_size = memo_size
+        self._memo_command = lru_cache(maxsize=memo_size)(self._parse_command)
+        self._memo_plan = lru_cache(maxsize=memo_size)(self._parse_plan)
+        logger.info(f"Initialized CommandMapper with language: {language} (recognized: {', '.join(self.languages)})")
+
+    def _candidate_languages(self, text_lower: str) -> List[str]:
+        """Languages to parse text in, most likely first
+
+        Args:
+            text_lower: Lowercased text
+
+        Returns:
+            Every recognized language: by likelihood if detection is
+            certain, otherwise the default language followed by the rest by
+            likelihood. Detection only orders the packs, so short or mixed
+            utterances ("start") still parse in the language that has them.
+        """
+        ranked, certain = self.language_id.rank(text_lower, self.languages)
+        if certain:
+            return ranked
+        return [self.language, *(lang for lang in ranked if lang != self.language)]
 
     def detect_language(self, text: str) -> str:
         """Detect language of text
@@ -124,63 +108,299 @@ class CommandMapper:
             text: Input text
 
         Returns:
-            Language code ("pl" or "en")
+            Language code, one of the recognized languages
         """
-        text_lower = text.lower()
+        return self._candidate_languages(text.lower())[0]
 
-        # Polish-specific characters
-        pl_chars = ["ą", "ć", "ę", "ł", "ń", "ó", "ś", "ź", "ż"]
-        has_pl_chars = any(char in text_lower for char in pl_chars)
+    def is_status_question(self, text: str) -> bool:
+        """Check if text is nothing but an explicit status or battery question
 
-        # Polish keywords
-        pl_keywords = ["posprzątaj", "wróć", "gdzie", "jest", "bateria"]
-        has_pl_keywords = any(kw in text_lower for kw in pl_keywords)
+        Status keywords also occur in small talk ("how are you", "co
+        robisz"), which the model should answer; only whole utterances
+        listed in a pack's status_questions qualify.
 
-        if has_pl_chars or has_pl_keywords:
-            return "pl"
-        return "en"
+        Args:
+            text: User message
+
+        Returns:
+            True if the normalized text is one of the status questions
+        """
+        return self._is_status_question(normalize_text(text))
+
+    def _is_status_question(self, text_lower: str) -> bool:
+        """is_status_question() on normalized text"""
+        question = text_lower.strip("?!. ")
+        return any(
+            question in self.packs.get(lang).status_questions
+            for lang in self._candidate_languages(text_lower)
+        )
 
     def parse_command(self, text: str) -> Optional[Command]:
         """Parse natural language command
 
+        Results are memoized on normalized text; the returned Command is
+        shared between calls and must not be modified.
+
         Args:
             text: Natural language command
 
         Returns:
             Parsed Command object or None if not recognized
         """
-        text_lower = text.lower()
-        lang = self.detect_language(text)
-
-        logger.debug(f"Parsing command (lang={lang}): {text}")
-
-        # Select keywords based on detected language
-        if lang == "pl":
-            clean_kw = self.CLEAN_KEYWORDS_PL
-            stop_kw = self.STOP_KEYWORDS_PL
-            pause_kw = self.PAUSE_KEYWORDS_PL
-            home_kw = self.HOME_KEYWORDS_PL
-            locate_kw = self.LOCATE_KEYWORDS_PL
-            status_kw = self.STATUS_KEYWORDS_PL
-            follow_kw = self.FOLLOW_KEYWORDS_PL
-            goto_kw = self.GOTO_KEYWORDS_PL
-            move_kw = self.MOVE_KEYWORDS_PL
-            room_patterns = self.ROOM_PATTERNS_PL
-        else:
-            clean_kw = self.CLEAN_KEYWORDS_EN
-            stop_kw = self.STOP_KEYWORDS_EN
-            pause_kw = self.PAUSE_KEYWORDS_EN
-            home_kw = self.HOME_KEYWORDS_EN
-            locate_kw = self.LOCATE_KEYWORDS_EN
-            status_kw = self.STATUS_KEYWORDS_EN
-            follow_kw = self.FOLLOW_KEYWORDS_EN
-            goto_kw = self.GOTO_KEYWORDS_EN
-            move_kw = self.MOVE_KEYWORDS_EN
-            room_patterns = self.ROOM_PATTERNS_EN
+        return self._memo_command(normalize_text(text))
+
+    def _parse_command(self, text_lower: str) -> Optional[Command]:
+        """parse_command() on normalized text"""
+        languages = self._candidate_languages(text_lower)
+
+        logger.debug(f"Parsing command (lang={languages[0]}): {text_lower}")
+
+        # Listed status questions need no keyword ("ile baterii?")
+        if self._is_status_question(text_lower):
+            return Command(action="status", params={}, confidence=0.9)
+
+        scans = []
+        for lang in languages:
+            pack = self.packs.get(lang)
+            hits = pack.matcher.scan(text_lower)
+            command = self._command_from_hits(hits, pack)
+            if command:
+                return command
+            scans.append((hits, pack))
+
+        return self._fallback(text_lower, *scans[0])
+
+    def parse_plan(self, text: str) -> List[Command]:
+        """Parse utterance that may contain several commands
+
+        The text is split into clauses at conjunctions and punctuation and
+        each clause is parsed on its own ("posprzątaj kuchnię i łazienkę,
+        a potem wróć do bazy" -> clean_rooms, home). A clause naming only
+        rooms extends the cleaning before it, and consecutive cleaning
+        steps are merged into one segment clean.
+
+        Args:
+            text: Natural language command(s)
+
+        Returns:
+            Commands in execution order (empty if none recognized)
+        """
+        return list(self._memo_plan(normalize_text(text)))
+
+    def _parse_plan(self, text_lower: str) -> Tuple[Command, ...]:
+        """parse_plan() on normalized text"""
+        if self._is_status_question(text_lower):
+            return (Command(action="status", params={}, confidence=0.9),)
+
+        scans = []
+        for lang in self._candidate_languages(text_lower):
+            pack = self.packs.get(lang)
+            hits = pack.matcher.scan(text_lower)
+            steps = self._plan_steps(text_lower, hits, pack)
+            if steps:
+                plan = self._merge_steps(steps)
+                if len(plan) > 1:
+                    logger.debug(f"Parsed plan: {[command.action for command in plan]}")
+                return tuple(plan)
+            scans.append((hits, pack))
+
+        command = self._fallback(text_lower, *scans[0])
+        return (command,) if command else ()
+
+    def parse_many(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunk_size: int = 256,
+        plans: bool = False,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Union[Optional[Command], List[Command]]]:
+        """Parse a corpus, streaming results in input order
+
+        Chunks of the input are parsed in a process pool. At most two
+        chunks per worker are in flight, so the corpus is never held in
+        memory as a whole. With one worker, chunks are parsed in this
+        process and share the memo.
+
+        Args:
+            texts: Utterances
+            workers: Worker processes (default: CPU count)
+            chunk_size: Utterances per chunk
+            plans: Yield parse_plan() results instead of parse_command()
+            stats: Dict receiving "utterances", "seconds" and "per_second"
+                once iteration ends (optional)
+
+        Yields:
+            Parse result per utterance
+        """
+        start = time.perf_counter()
+        parsed = 0
+        iterator = iter(texts)
+        chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        pending: Deque[Future] = deque()
+
+        try:
+            if workers <= 1:
+                parse = self.parse_plan if plans else self.parse_command
+                for chunk in chunks:
+                    for text in chunk:
+                        yield parse(text)
+                        parsed += 1
+                return
+
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self._worker_options(),)) as pool:
+                for chunk in chunks:
+                    pending.append(pool.submit(_parse_chunk, chunk, plans))
+                    if len(pending) >= workers * 2:
+                        results = pending.popleft().result()
+                        yield from results
+                        parsed += len(results)
+                while pending:
+                    results = pending.popleft().result()
+                    yield from results
+                    parsed += len(results)
+        finally:
+            for future in pending:
+                future.cancel()
+            if stats is not None:
+                elapsed = time.perf_counter() - start
+                stats.update(
+                    utterances=parsed,
+                    seconds=round(elapsed, 3),
+                    per_second=round(parsed / elapsed, 1) if elapsed else 0.0
+                )
+
+    def set_classifier(self, classifier: Optional["IntentClassifier"]):
+        """Replace the intent classifier, e.g. once it has been loaded
+
+        Memoized results are dropped, as they were parsed without it.
+        """
+        self.classifier = classifier
+        self._memo_command.cache_clear()
+        self._memo_plan.cache_clear()
+
+    def memo_info(self) -> Dict[str, Dict[str, int]]:
+        """Get memo hit/miss counters of parse_command and parse_plan"""
+        return {
+            name: {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+            for name, info in (
+                ("command", self._memo_command.cache_info()),
+                ("plan", self._memo_plan.cache_info()),
+            )
+        }
+
+    def _worker_options(self) -> Dict[str, Any]:
+        """Constructor arguments for an equivalent mapper in a worker process"""
+        return {
+            "language": self.language,
+            "languages": self.languages,
+            "classifier": self.classifier,
+            "classifier_threshold": self.classifier_threshold,
+            "language_id": self.language_id,
+            "memo_size": self.memo_size,
+            "languages_dir": self.packs.languages_dir,
+            "cache_dir": self.packs.cache_dir,
+        }
+
+    def _plan_steps(self, text_lower: str, hits: List[KeywordHit], pack: LanguagePack) -> List[Command]:
+        """Parse each clause of text into a step
+
+        Args:
+            text_lower: Lowercased text
+            hits: Keyword hits from KeywordMatcher.scan()
+            pack: Language pack of the hits
+
+        Returns:
+            Commands in utterance order, before merging
+        """
+        separators = [match.start() for match in pack.clause_separators.finditer(text_lower)]
+        clauses: List[List[KeywordHit]] = [[] for _ in range(len(separators) + 1)]
+        for hit in hits:
+            clauses[bisect.bisect_right(separators, hit.start)].append(hit)
+
+        steps: List[Command] = []
+        for clause in clauses:
+            command = self._command_from_hits(clause, pack)
+            if command is None and steps and steps[-1].action in self.CLEANING_ACTIONS:
+                rooms = self._rooms_from_hits(clause, pack)
+                if rooms:
+                    command = Command(action="clean_rooms", params={"rooms": rooms}, confidence=0.9)
+            if command:
+                steps.append(command)
+        return steps
+
+    def _merge_steps(self, steps: List[Command]) -> List[Command]:
+        """Merge compatible adjacent steps
+
+        Consecutive cleaning steps become one: the union of named rooms, or
+        the whole home if none names a room. "goto_room" followed by a
+        plain clean cleans that room. Repeated identical steps collapse.
+
+        Args:
+            steps: Commands in utterance order
+
+        Returns:
+            Merged commands
+        """
+        plan: List[Command] = []
+        for step in steps:
+            previous = plan[-1] if plan else None
+            if previous and previous.action in self.CLEANING_ACTIONS and step.action in self.CLEANING_ACTIONS:
+                rooms = previous.params.get("rooms", []) + [
+                    room for room in step.params.get("rooms", []) if room not in previous.params.get("rooms", [])
+                ]
+                plan[-1] = Command(
+                    action="clean_rooms" if rooms else "start_cleaning",
+                    params={"rooms": rooms} if rooms else {},
+                    confidence=min(previous.confidence, step.confidence)
+                )
+            elif previous and previous.action == "goto_room" and step.action == "start_cleaning":
+                plan[-1] = Command(
+                    action="clean_rooms",
+                    params={"rooms": [previous.params["room"]]},
+                    confidence=min(previous.confidence, step.confidence)
+                )
+            elif previous and previous.action == step.action and previous.params == step.params:
+                continue
+            else:
+                plan.append(step)
+        return plan
+
+    def _fallback(self, text: str, hits: List[KeywordHit], pack: LanguagePack) -> Optional[Command]:
+        """Classifier tier for text without action keywords
+
+        Args:
+            text: Original text
+            hits: Keyword hits from KeywordMatcher.scan()
+            pack: Language pack of the hits
+
+        Returns:
+            Command or None if not recognized
+        """
+        if self.classifier:
+            command = self._classify(text, self._rooms_from_hits(hits, pack))
+            if command:
+                return command
+
+        logger.warning(f"Could not parse command: {text}")
+        return None
+
+    def _command_from_hits(self, hits: List[KeywordHit], pack: LanguagePack) -> Optional[Command]:
+        """Pick command from keyword hits by action priority
+
+        Args:
+            hits: Keyword hits from KeywordMatcher.scan()
+            pack: Language pack of the hits
+
+        Returns:
+            Command or None if no action keyword was hit
+        """
+        kinds = {hit.kind for hit in hits}
 
         # Check for cleaning commands
-        if any(kw in text_lower for kw in clean_kw):
-            rooms = self._extract_rooms(text_lower, room_patterns)
+        if "clean" in kinds:
+            rooms = self._rooms_from_hits(hits, pack)
             if rooms:
                 return Command(
                     action="clean_rooms",
@@ -195,33 +415,33 @@ class CommandMapper:
                 )
 
         # Check for stop commands
-        if any(kw in text_lower for kw in stop_kw):
+        if "stop" in kinds:
             return Command(action="stop", params={}, confidence=0.95)
 
         # Check for pause commands
-        if any(kw in text_lower for kw in pause_kw):
+        if "pause" in kinds:
             return Command(action="pause", params={}, confidence=0.95)
 
         # Check for home/dock commands
-        if any(kw in text_lower for kw in home_kw):
+        if "home" in kinds:
             return Command(action="home", params={}, confidence=0.95)
 
         # Check for locate commands
-        if any(kw in text_lower for kw in locate_kw):
+        if "locate" in kinds:
             return Command(action="locate", params={}, confidence=0.9)
 
         # Check for status commands
-        if any(kw in text_lower for kw in status_kw):
+        if "status" in kinds:
             return Command(action="status", params={}, confidence=0.9)
 
         # Check for follow me commands
-        if any(kw in text_lower for kw in follow_kw):
+        if "follow_me" in kinds:
             return Command(action="follow_me", params={}, confidence=0.95)
 
         # Check for goto commands
-        if any(kw in text_lower for kw in goto_kw):
+        if "goto" in kinds:
             # Try to extract room/location
-            rooms = self._extract_rooms(text_lower, room_patterns)
+            rooms = self._rooms_from_hits(hits, pack)
             if rooms:
                 return Command(
                     action="goto_room",
@@ -236,33 +456,64 @@ class CommandMapper:
                 )
 
         # Check for manual movement commands
-        for direction, keywords in move_kw.items():
-            if any(kw in text_lower for kw in keywords):
+        directions = {hit.key for hit in hits if hit.kind == "move"}
+        for direction in pack.move:
+            if direction in directions:
                 return Command(
                     action="move",
                     params={"direction": direction},
                     confidence=0.9
                 )
 
-        logger.warning(f"Could not parse command: {text}")
         return None
 
-    def _extract_rooms(self, text: str, room_patterns: Dict[str, List[str]]) -> List[str]:
-        """Extract room names from text
+    def _classify(self, text: str, rooms: List[str]) -> Optional[Command]:
+        """Second tier: map classifier intent to a command
 
         Args:
-            text: Input text (lowercase)
-            room_patterns: Room name patterns for current language
+            text: Original text
+            rooms: Room identifiers found in text
 
         Returns:
-            List of room identifiers
+            Command, or None if no intent or below threshold
         """
-        rooms = []
-        for room_id, patterns in room_patterns.items():
-            for pattern in patterns:
-                if pattern in text:
-                    rooms.append(room_id)
-                    break
+        intent, probability = self.classifier.predict(text)
+        if intent == "none" or probability < self.classifier_threshold:
+            logger.debug(f"Classifier rejected: {intent} ({probability:.2f})")
+            return None
+
+        confidence = round(min(probability, self.CLASSIFIER_MAX_CONFIDENCE), 3)
+        logger.debug(f"Classifier matched: {intent} ({probability:.2f})")
+        command = self._command_from_intent(intent, confidence, rooms)
+        command.source = "classifier"
+        return command
+
+    def _command_from_intent(self, intent: str, confidence: float, rooms: List[str]) -> Command:
+        """Command for a classifier intent"""
+        if intent.startswith("move_"):
+            return Command(action="move", params={"direction": intent[len("move_"):]}, confidence=confidence)
+        if intent == "clean":
+            if rooms:
+                return Command(action="clean_rooms", params={"rooms": rooms}, confidence=confidence)
+            return Command(action="start_cleaning", params={}, confidence=confidence)
+        if intent == "goto":
+            if rooms:
+                return Command(action="goto_room", params={"room": rooms[0]}, confidence=confidence)
+            return Command(action="goto_location", params={}, confidence=min(confidence, 0.7))
+        return Command(action=intent, params={}, confidence=confidence)
+
+    def _rooms_from_hits(self, hits: List[KeywordHit], pack: LanguagePack) -> List[str]:
+        """Get room identifiers hit in text
+
+        Args:
+            hits: Keyword hits from KeywordMatcher.scan()
+            pack: Language pack of the hits
+
+        Returns:
+            List of room identifiers, in room table order
+        """
+        hit_rooms = {hit.key for hit in hits if hit.kind == "room"}
+        rooms = [room_id for room_id in pack.rooms if room_id in hit_rooms]
 
         logger.debug(f"Extracted rooms: {rooms}")
         return rooms
@@ -324,28 +575,57 @@ class CommandMapper:
         """
         if lang is None:
             lang = self.language
+        elif lang not in self.languages:
+            lang = "en"
 
-        action = command.action
+        return self.packs.get(lang).templates.get(command.action, "")
 
-        if lang == "pl":
-            templates = {
-                "start_cleaning": "Oczywiście! Zaczynam sprzątanie całego mieszkania.",
-                "clean_rooms": "Dobrze, sprzątam: {rooms}.",
-                "stop": "Zatrzymuję sprzątanie.",
-                "pause": "Wstrzymuję sprzątanie.",
-                "home": "Wracam do stacji dokującej.",
-                "locate": "Odtwarzam dźwięk lokalizacyjny.",
-                "status": "Aktualnie {state}. Bateria: {battery}%.",
-            }
-        else:
-            templates = {
-                "start_cleaning": "Sure! Starting full cleaning.",
-                "clean_rooms": "Okay, cleaning: {rooms}.",
-                "stop": "Stopping cleaning.",
-                "pause": "Pausing cleaning.",
-                "home": "Returning to dock.",
-                "locate": "Playing locate sound.",
-                "status": "Currently {state}. Battery: {battery}%.",
-            }
-
-        return templates.get(action, "")
+    def render_response(
+        self,
+        command: Command,
+        lang: str = None,
+        state: Optional[str] = None,
+        battery: Optional[int] = None
+    ) -> Optional[str]:
+        """Render response template filled with command params and live state
+
+        Args:
+            command: Parsed Command object
+            lang: Language code (defaults to instance language)
+            state: Current robot state (display text)
+            battery: Current battery level in percent
+
+        Returns:
+            Response text, or None if there is no template for the command
+            or it needs state that was not provided
+        """
+        template = self.get_response_template(command, lang)
+        if not template:
+            return None
+
+        if ("{state}" in template or "{battery}" in template) and (state is None or battery is None):
+            return None
+
+        return template.format(
+            rooms=", ".join(command.params.get("rooms", [])),
+            state=state,
+            battery=battery
+        )
+
+
+# Mapper of a parse_many() worker process
+_worker_mapper: Optional[CommandMapper] = None
+
+
+def _init_worker(options: Dict[str, Any]):
+    """Build the worker's mapper (process pool initializer)"""
+    global _worker_mapper
+    options = dict(options)
+    packs = LanguagePacks(options.pop("languages_dir"), options.pop("cache_dir"))
+    _worker_mapper = CommandMapper(packs=packs, **options)
+
+
+def _parse_chunk(texts: List[str], plans: bool) -> List[Union[Optional[Command], List[Command]]]:
+    """Parse one chunk in a worker process"""
+    parse = _worker_mapper.parse_plan if plans else _worker_mapper.parse_command
+    return [parse(text) for text in texts]
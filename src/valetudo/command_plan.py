@@ -0,0 +1,188 @@
+"""Command Plan - Runs multi-step commands, waiting on robot state between steps"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .command_mapper import Command
+
+logger = logging.getLogger(__name__)
+
+
+# Actions that keep the robot busy for a while; the next step waits for them
+LONG_RUNNING_ACTIONS = {"start_cleaning", "clean_rooms", "goto_room", "goto_location", "home"}
+
+# Robot states in which a long-running step is still in progress
+BUSY_STATES = {"cleaning", "moving", "returning", "paused"}
+
+# Actions that don't change what the robot is doing; they run without
+# cancelling a plan in progress
+PASSIVE_ACTIONS = {"locate", "status"}
+
+
+class CommandPlanRunner:
+    """Executes command plans step by step
+
+    The first step runs inside start(), so the caller learns whether the
+    robot accepted it; the rest runs in the background. After a
+    long-running step (cleaning, driving, returning to dock) the next
+    step waits until the robot has entered and then left a busy state;
+    instant steps (stop, locate, move) are followed right away.
+
+    A plan belongs to the session that started it: its progress events
+    go to that session only. Starting a new plan cancels what is left of
+    the previous one, whoever owns it, so a later "stop" is never
+    overridden by an old plan's next step; the previous owner gets a
+    "cancelled" event. Commands that leave the robot alone (locate,
+    status) run without cancelling anything.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[str, Dict[str, Any]], Awaitable[None]],
+        get_state: Callable[[], Awaitable[Optional[str]]],
+        on_event: Optional[Callable[[Dict[str, Any], Optional[str]], Awaitable[None]]] = None,
+        poll_interval: float = 2.0,
+        start_timeout: float = 30.0,
+        step_timeout: float = 7200.0
+    ):
+        """Initialize plan runner
+
+        Args:
+            execute: Coroutine executing one command (action, params)
+            get_state: Coroutine returning the robot state ("cleaning", "docked", ...)
+            on_event: Coroutine receiving progress events for background steps
+                and the owning session (optional)
+            poll_interval: Seconds between robot state checks
+            start_timeout: Seconds a long-running step may take to make the robot busy
+            step_timeout: Seconds a long-running step may keep the robot busy
+        """
+        self.execute = execute
+        self.get_state = get_state
+        self.on_event = on_event
+        self.poll_interval = poll_interval
+        self.start_timeout = start_timeout
+        self.step_timeout = step_timeout
+
+        self._task: Optional[asyncio.Task] = None
+        self._pending: List[Command] = []
+        self._owner: Optional[str] = None
+
+    async def start(self, plan: List[Command], owner: Optional[str] = None):
+        """Execute the first step and schedule the rest
+
+        Args:
+            plan: Commands in execution order
+            owner: Session the plan belongs to (receives its progress events)
+
+        Raises:
+            Exception if the first step fails (the rest is then dropped)
+        """
+        if all(command.action in PASSIVE_ACTIONS for command in plan):
+            for command in plan:
+                await self.execute(command.action, command.params)
+            return
+
+        self.cancel()
+        await self.execute(plan[0].action, plan[0].params)
+        if len(plan) > 1:
+            self._pending = list(plan[1:])
+            self._owner = owner
+            self._task = asyncio.create_task(self._run(plan[0]))
+            logger.info(f"Command plan: {' -> '.join(command.action for command in plan)}")
+
+    def cancel(self, owner: Optional[str] = None):
+        """Drop remaining steps of the running plan
+
+        Args:
+            owner: Only cancel the plan if this session owns it (any plan
+                if omitted)
+        """
+        if owner is not None and owner != self._owner:
+            return
+        if self._task and not self._task.done():
+            self._task.cancel()
+            logger.info(f"Cancelled command plan steps: {[command.action for command in self._pending]}")
+        self._task = None
+        self._pending = []
+        self._owner = None
+
+    @property
+    def pending(self) -> List[str]:
+        """Actions still waiting to run"""
+        return [command.action for command in self._pending]
+
+    async def _emit(self, event: Dict[str, Any], owner: Optional[str]):
+        if self.on_event:
+            try:
+                await self.on_event({"type": "plan_step", **event}, owner)
+            except Exception as e:
+                logger.warning(f"Failed to report plan progress: {e}")
+
+    async def _run(self, previous: Command):
+        """Run pending steps in order, telling the owner if cancelled"""
+        owner, pending = self._owner, self._pending
+        try:
+            await self._run_steps(previous, owner)
+        except asyncio.CancelledError:
+            if pending:
+                await self._emit({
+                    "action": pending[0].action,
+                    "status": "cancelled",
+                    "remaining": [command.action for command in pending]
+                }, owner)
+            raise
+
+    async def _run_steps(self, previous: Command, owner: Optional[str]):
+        while self._pending:
+            if previous.action in LONG_RUNNING_ACTIONS and not await self._wait_until_done(previous.action):
+                await self._emit({"action": self._pending[0].action, "status": "aborted"}, owner)
+                self._pending = []
+                return
+
+            step = self._pending.pop(0)
+            try:
+                await self.execute(step.action, step.params)
+            except Exception as e:
+                logger.error(f"Command plan step {step.action} failed: {e}")
+                await self._emit({"action": step.action, "status": "failed", "error": str(e)}, owner)
+                self._pending = []
+                return
+
+            logger.info(f"Command plan step executed: {step.action}")
+            await self._emit({"action": step.action, "status": "executed", "remaining": self.pending}, owner)
+            previous = step
+
+    async def _wait_until_done(self, action: str) -> bool:
+        """Wait until the robot has become busy and then left the busy states
+
+        A robot that never becomes busy within start_timeout (e.g. "home"
+        while already docked) counts as done.
+
+        Returns:
+            False if the robot reported an error or the step timed out
+        """
+        loop = asyncio.get_running_loop()
+        start_deadline = loop.time() + self.start_timeout
+        step_deadline = loop.time() + self.step_timeout
+        started = False
+
+        while True:
+            try:
+                state = await self.get_state()
+            except Exception as e:
+                logger.warning(f"Command plan state check failed: {e}")
+                state = None
+
+            if state == "error":
+                logger.warning(f"Command plan aborted, robot error after {action}")
+                return False
+            if state in BUSY_STATES:
+                started = True
+            elif state is not None and (started or loop.time() >= start_deadline):
+                return True
+
+            if loop.time() >= step_deadline:
+                logger.warning(f"Command plan aborted, {action} did not finish in {self.step_timeout:.0f}s")
+                return False
+            await asyncio.sleep(self.poll_interval)
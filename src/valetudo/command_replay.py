@@ -0,0 +1,122 @@
+"""Command replay - Batch-parse a corpus of chat utterances
+
+Runs CommandMapper.parse_many() over conversation histories or plain
+utterance lists and reports throughput and how the utterances were
+mapped. Useful for checking language packs and the classifier against
+real traffic before deploying them.
+
+Usage:
+    python -m src.valetudo.command_replay data/conversations --workers 4
+    python -m src.valetudo.command_replay utterances.txt --plans --output parsed.jsonl
+"""
+
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+from collections import Counter, deque
+from typing import Deque, Iterator, List, Optional, Union
+
+from .command_mapper import CommandMapper
+from .language_packs import LanguagePacks
+
+logger = logging.getLogger(__name__)
+
+
+def read_utterances(paths: List[Union[str, Path]], exclude: Optional[Union[str, Path]] = None) -> Iterator[str]:
+    """Stream utterances from files
+
+    Directories are expanded to their .txt and .jsonl files. A .txt file
+    holds one utterance per line. In a .jsonl file every record with role
+    "user" (conversation history) or a "message"/"text" field counts.
+
+    Args:
+        paths: Files or directories
+        exclude: File to leave out, e.g. the output file (optional)
+
+    Yields:
+        Utterances in file order
+    """
+    exclude = Path(exclude).resolve() if exclude else None
+    for path in map(Path, paths):
+        files = sorted(p for p in path.iterdir() if p.suffix in (".txt", ".jsonl")) if path.is_dir() else [path]
+        for file in files:
+            if file.resolve() == exclude:
+                continue
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if file.suffix != ".jsonl":
+                        yield line
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping malformed line in {file}")
+                        continue
+                    if record.get("role") == "user":
+                        yield record.get("content", "")
+                    elif "role" not in record and (record.get("message") or record.get("text")):
+                        yield record.get("message") or record.get("text")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Batch-parse chat utterances with CommandMapper")
+    parser.add_argument("paths", nargs="+", help=".txt/.jsonl files or directories")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--plans", action="store_true", help="parse multi-step plans")
+    parser.add_argument("--languages", nargs="+", default=["pl", "en"])
+    parser.add_argument("--cache-dir", default="data/cache/matchers")
+    parser.add_argument("--output", help="write one JSON result per utterance to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    mapper = CommandMapper(
+        language=args.languages[0],
+        languages=args.languages,
+        packs=LanguagePacks(cache_dir=args.cache_dir)
+    )
+
+    # Texts handed to parse_many() whose results have not come back yet
+    in_flight: Deque[str] = deque()
+
+    def source() -> Iterator[str]:
+        for text in read_utterances(args.paths, exclude=args.output):
+            in_flight.append(text)
+            yield text
+
+    stats = {}
+    actions: Counter = Counter()
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for result in mapper.parse_many(source(), args.workers, args.chunk_size, args.plans, stats):
+            text = in_flight.popleft()
+            commands = result if args.plans else [result] if result else []
+            actions.update([command.action for command in commands] or [None])
+            if output:
+                record = {
+                    "text": text,
+                    "commands": [
+                        {"action": c.action, "params": c.params, "confidence": c.confidence} for c in commands
+                    ],
+                }
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if output:
+            output.close()
+
+    total = stats.get("utterances", 0)
+    print(f"Parsed {total} utterances in {stats.get('seconds', 0):.2f}s "
+          f"({stats.get('per_second', 0):,.0f} utterances/s)")
+    for action, count in actions.most_common():
+        label = action or "(unrecognized)"
+        print(f"  {label:<16} {count:>7} {count / max(total, 1):6.1%}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
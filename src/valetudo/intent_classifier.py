@@ -0,0 +1,311 @@
+"""Intent Classifier - Character n-gram model for commands keywords miss
+
+A hashed bag of character n-grams and words feeds a linear softmax model
+in NumPy. No network or GPU is needed; prediction takes tens of
+microseconds. CommandMapper uses it as a second tier when keyword matching
+finds nothing.
+
+Usage:
+    python -m src.valetudo.intent_classifier train --output data/models/intent_model.npz
+    python -m src.valetudo.intent_classifier bench --folds 5
+"""
+
+import sys
+import json
+import time
+import zlib
+import random
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CORPUS_PATH = Path(__file__).parent / "data" / "intent_corpus.json"
+
+N_FEATURES = 1 << 14
+NGRAM_SIZES = (2, 3, 4)
+
+# Label for utterances that are not robot commands
+NO_INTENT = "none"
+
+
+def featurize(text: str, n_features: int = N_FEATURES) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash text into a sparse L2-normalized feature vector
+
+    Features are character 2-4-grams of the padded, lowercased text plus
+    whole words. crc32 keeps hashes stable across processes.
+
+    Args:
+        text: Input text
+        n_features: Hash space size
+
+    Returns:
+        Tuple of (feature indices, feature values)
+    """
+    words = text.lower().split()
+    padded = f" {' '.join(words)} "
+
+    hashes = [zlib.crc32(f"w:{word}".encode()) for word in words]
+    for n in NGRAM_SIZES:
+        hashes.extend(zlib.crc32(padded[i:i + n].encode()) for i in range(len(padded) - n + 1))
+
+    if not hashes:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    indices, counts = np.unique(np.array(hashes, dtype=np.int64) % n_features, return_counts=True)
+    values = counts.astype(np.float32)
+    values /= np.linalg.norm(values)
+    return indices, values
+
+
+def load_corpus(path: Union[str, Path] = CORPUS_PATH) -> List[Tuple[str, str, str]]:
+    """Load utterance corpus
+
+    Returns:
+        List of (text, intent, language)
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [
+        (text, intent, lang)
+        for intent, by_lang in data.items()
+        for lang, texts in by_lang.items()
+        for text in texts
+    ]
+
+
+class IntentClassifier:
+    """Linear softmax classifier over hashed n-gram features"""
+
+    def __init__(self, labels: List[str], weights: np.ndarray, bias: np.ndarray):
+        """Initialize classifier
+
+        Args:
+            labels: Intent label per output column
+            weights: (n_features, n_labels) weight matrix
+            bias: (n_labels,) bias vector
+        """
+        self.labels = labels
+        self.weights = weights
+        self.bias = bias
+        self.n_features = weights.shape[0]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Predict intent
+
+        Args:
+            text: User utterance
+
+        Returns:
+            Tuple of (intent label, probability)
+        """
+        indices, values = featurize(text, self.n_features)
+        logits = values @ self.weights[indices] + self.bias
+        logits -= logits.max()
+        probs = np.exp(logits)
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+    @classmethod
+    def train(
+        cls,
+        samples: List[Tuple[str, str]],
+        epochs: int = 400,
+        learning_rate: float = 8.0,
+        l2: float = 1e-4,
+        n_features: int = N_FEATURES
+    ) -> "IntentClassifier":
+        """Train on labeled utterances with full-batch gradient descent
+
+        Only hash buckets that occur in the corpus are trained, so the
+        dense design matrix stays small.
+
+        Args:
+            samples: List of (text, intent)
+            epochs: Gradient descent iterations
+            learning_rate: Step size
+            l2: L2 regularization strength
+            n_features: Hash space size
+
+        Returns:
+            Trained classifier
+        """
+        labels = sorted({intent for _, intent in samples})
+        label_index = {label: i for i, label in enumerate(labels)}
+
+        features = [featurize(text, n_features) for text, _ in samples]
+        used = np.unique(np.concatenate([indices for indices, _ in features]))
+        column = {int(index): i for i, index in enumerate(used)}
+
+        x = np.zeros((len(samples), len(used)), dtype=np.float32)
+        for row, (indices, values) in enumerate(features):
+            x[row, [column[int(i)] for i in indices]] = values
+        y = np.zeros((len(samples), len(labels)), dtype=np.float32)
+        y[np.arange(len(samples)), [label_index[intent] for _, intent in samples]] = 1.0
+
+        w = np.zeros((len(used), len(labels)), dtype=np.float32)
+        b = np.zeros(len(labels), dtype=np.float32)
+        for _ in range(epochs):
+            logits = x @ w + b
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            grad = (probs - y) / len(samples)
+            w -= learning_rate * (x.T @ grad + l2 * w)
+            b -= learning_rate * grad.sum(axis=0)
+
+        weights = np.zeros((n_features, len(labels)), dtype=np.float32)
+        weights[used] = w
+        return cls(labels, weights, b)
+
+    def save(self, path: Union[str, Path]):
+        """Save model to .npz file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, labels=np.array(self.labels))
+        logger.info(f"Saved intent model to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "IntentClassifier":
+        """Load model from .npz file"""
+        with np.load(path) as data:
+            return cls([str(label) for label in data["labels"]], data["weights"], data["bias"])
+
+    @classmethod
+    def load_or_train(cls, path: Optional[Union[str, Path]] = None) -> "IntentClassifier":
+        """Load model from path, or train it from the bundled corpus
+
+        A trained model is saved to path, so training happens once (and
+        again only when the bundled corpus is newer than the saved model).
+
+        Args:
+            path: Model file written by the train command (optional)
+
+        Returns:
+            Classifier
+        """
+        if path and Path(path).exists() and Path(path).stat().st_mtime >= CORPUS_PATH.stat().st_mtime:
+            logger.info(f"Loading intent model from {path}")
+            return cls.load(path)
+
+        start = time.perf_counter()
+        classifier = cls.train([(text, intent) for text, intent, _ in load_corpus()])
+        logger.info(f"Trained intent model from bundled corpus in {time.perf_counter() - start:.2f}s")
+        if path:
+            try:
+                classifier.save(path)
+            except OSError as e:
+                logger.warning(f"Failed to save intent model: {e}")
+        return classifier
+
+
+def cross_validate(
+    corpus: List[Tuple[str, str, str]],
+    folds: int = 5,
+    seed: int = 0
+) -> Dict[str, object]:
+    """Estimate accuracy with k-fold cross-validation
+
+    Returns:
+        Dict with overall and per-language accuracy, plus the share of
+        held-out commands the keyword matcher alone recognizes, compared
+        with keywords + classifier
+    """
+    from .command_mapper import CommandMapper
+
+    samples = list(corpus)
+    random.Random(seed).shuffle(samples)
+
+    correct: Dict[str, List[int]] = {}
+    keyword_hits = combined_hits = commands = 0
+
+    for fold in range(folds):
+        test = samples[fold::folds]
+        train = [s for i, s in enumerate(samples) if i % folds != fold]
+        classifier = IntentClassifier.train([(text, intent) for text, intent, _ in train])
+        keywords_only = CommandMapper()
+        combined = CommandMapper(classifier=classifier)
+
+        for text, intent, lang in test:
+            predicted, _ = classifier.predict(text)
+            correct.setdefault(lang, []).append(int(predicted == intent))
+            if intent != NO_INTENT:
+                commands += 1
+                keyword_hits += keywords_only.parse_command(text) is not None
+                combined_hits += combined.parse_command(text) is not None
+
+    all_results = [c for results in correct.values() for c in results]
+    return {
+        "accuracy": sum(all_results) / len(all_results),
+        "accuracy_by_language": {lang: sum(r) / len(r) for lang, r in correct.items()},
+        "keyword_recall": keyword_hits / commands,
+        "combined_recall": combined_hits / commands,
+        "samples": len(all_results),
+    }
+
+
+def measure_latency(classifier: IntentClassifier, texts: List[str], rounds: int = 20) -> Dict[str, float]:
+    """Measure predict() latency over texts
+
+    Returns:
+        Dict with p50_us, p99_us and max_us
+    """
+    samples = []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            classifier.predict(text)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99)] * 1e6,
+        "max_us": samples[-1] * 1e6,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Train and benchmark the intent classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train = sub.add_parser("train", help="Train on the corpus and save the model")
+    train.add_argument("--corpus", default=str(CORPUS_PATH))
+    train.add_argument("--output", default="data/models/intent_model.npz")
+    train.add_argument("--epochs", type=int, default=400)
+
+    bench = sub.add_parser("bench", help="Report cross-validated accuracy and latency")
+    bench.add_argument("--corpus", default=str(CORPUS_PATH))
+    bench.add_argument("--folds", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    corpus = load_corpus(args.corpus)
+
+    if args.command == "train":
+        start = time.perf_counter()
+        classifier = IntentClassifier.train([(text, intent) for text, intent, _ in corpus], epochs=args.epochs)
+        print(f"Trained on {len(corpus)} utterances in {time.perf_counter() - start:.2f}s")
+        classifier.save(args.output)
+        return
+
+    results = cross_validate(corpus, folds=args.folds)
+    print(f"{args.folds}-fold accuracy: {results['accuracy']:.1%} ({results['samples']} utterances)")
+    for lang, accuracy in sorted(results["accuracy_by_language"].items()):
+        print(f"  {lang}: {accuracy:.1%}")
+    print(f"Held-out commands recognized: keywords {results['keyword_recall']:.1%}, "
+          f"keywords + classifier {results['combined_recall']:.1%}")
+
+    classifier = IntentClassifier.train([(text, intent) for text, intent, _ in corpus])
+    latency = measure_latency(classifier, [text for text, _, _ in corpus])
+    print(f"predict() latency: p50 {latency['p50_us']:.1f} us, p99 {latency['p99_us']:.1f} us, "
+          f"max {latency['max_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Joystick - Continuous manual driving from streamed velocity samples"""
+
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    """p50/p95/max of latency samples in ms"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95)], 1),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+class JoystickController:
+    """Forwards the latest joystick sample to the robot at a fixed tick
+
+    Clients stream (velocity, turn_rate) samples at any rate; only the
+    newest one is kept, and every tick it is sent to the robot, so a burst
+    of samples never queues up behind a slow robot call. Once the stick is
+    released (zero sample) the robot gets one stop and nothing more. If no
+    sample arrives for deadman_timeout, e.g. the browser tab froze or the
+    network dropped, the robot is stopped and manual control released.
+    """
+
+    def __init__(
+        self,
+        drive: Callable[[float, float], Awaitable[Any]],
+        set_enabled: Callable[[bool], Awaitable[Any]],
+        tick_interval: float = 0.1,
+        deadman_timeout: float = 0.5,
+        max_velocity: float = 0.5,
+        max_turn_rate: float = 90.0,
+        on_sent: Optional[Callable[[Dict[str, Any], Any], Awaitable[None]]] = None,
+        history: int = 500
+    ):
+        """Initialize controller
+
+        Args:
+            drive: Coroutine sending (velocity, turn rate in deg/s) to the robot
+            set_enabled: Coroutine enabling or disabling manual control mode
+            tick_interval: Seconds between commands sent to the robot
+            deadman_timeout: Seconds without samples before the robot is stopped
+            max_velocity: Robot velocity for a full stick deflection (0.0-1.0)
+            max_turn_rate: Turn rate in deg/s for a full stick deflection
+            on_sent: Coroutine receiving an "ack" frame after each command and
+                the client that sent the acknowledged sample (optional)
+            history: Latency samples kept for stats
+        """
+        self.drive = drive
+        self.set_enabled = set_enabled
+        self.tick_interval = tick_interval
+        self.deadman_timeout = deadman_timeout
+        self.max_velocity = max_velocity
+        self.max_turn_rate = max_turn_rate
+        self.on_sent = on_sent
+
+        self._sample: Tuple[float, float] = (0.0, 0.0)
+        self._sample_at = 0.0  # perf_counter of the newest sample
+        self._sample_t: Optional[float] = None  # client timestamp of the newest sample
+        self._sample_client: Any = None  # sender of the newest sample, gets its ack
+        self._task: Optional[asyncio.Task] = None
+
+        self.samples = 0
+        self.commands = 0
+        self.errors = 0
+        self.deadman_stops = 0
+        self._robot_ms: Deque[float] = deque(maxlen=history)  # robot call duration
+        self._control_ms: Deque[float] = deque(maxlen=history)  # sample arrival -> robot ack
+        self._client_rtt_ms: Deque[float] = deque(maxlen=history)  # reported by clients
+
+    @property
+    def active(self) -> bool:
+        """Whether a driving session is running"""
+        return self._task is not None and not self._task.done()
+
+    def submit(
+        self,
+        velocity: float,
+        turn_rate: float,
+        client_time: Optional[float] = None,
+        rtt_ms: Optional[float] = None,
+        client: Any = None
+    ):
+        """Take a joystick sample, replacing any not yet sent
+
+        Args:
+            velocity: Forward (+) / backward (-) deflection, -1.0 to 1.0
+            turn_rate: Left (+) / right (-) deflection, -1.0 to 1.0
+            client_time: Client timestamp, echoed in the "ack" frame (optional)
+            rtt_ms: Round trip the client measured for an earlier ack
+                (optional, ignored unless a non-negative number)
+            client: Sender of the sample, passed to on_sent with its ack (optional)
+
+        Raises:
+            ValueError if velocity or turn_rate is not finite (NaN, inf);
+            a running session is stopped at the next tick
+        """
+        if not (math.isfinite(velocity) and math.isfinite(turn_rate)):
+            if self.active:
+                self._sample = (0.0, 0.0)
+                self._sample_at = time.perf_counter()
+            raise ValueError(f"Non-finite joystick sample: {velocity}, {turn_rate}")
+
+        self._sample = (max(-1.0, min(1.0, velocity)), max(-1.0, min(1.0, turn_rate)))
+        self._sample_at = time.perf_counter()
+        self._sample_t = client_time
+        self._sample_client = client
+        self.samples += 1
+        if isinstance(rtt_ms, (int, float)) and not isinstance(rtt_ms, bool) and 0 <= rtt_ms < math.inf:
+            self._client_rtt_ms.append(float(rtt_ms))
+
+        if not self.active:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the robot and end the driving session now"""
+        if self.active:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sample/command counters and latency percentiles"""
+        return {
+            "active": self.active,
+            "samples": self.samples,
+            "commands": self.commands,
+            "errors": self.errors,
+            "deadman_stops": self.deadman_stops,
+            "tick_interval": self.tick_interval,
+            "robot": _percentiles(self._robot_ms),
+            "control": _percentiles(self._control_ms),
+            "client_rtt": _percentiles(self._client_rtt_ms),
+        }
+
+    async def _send(
+        self,
+        sample: Tuple[float, float],
+        sample_at: Optional[float],
+        client_time: Optional[float],
+        client: Any = None
+    ):
+        """Send one command; sample_at is None when re-sending a held sample"""
+        velocity, turn_rate = sample
+        start = time.perf_counter()
+        try:
+            await self.drive(velocity * self.max_velocity, turn_rate * self.max_turn_rate)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Manual control command failed: {e}")
+            return
+
+        done = time.perf_counter()
+        self.commands += 1
+        self._robot_ms.append((done - start) * 1000)
+        if sample_at is not None:
+            self._control_ms.append((done - sample_at) * 1000)
+        if self.on_sent and sample_at is not None:
+            await self.on_sent({
+                "type": "ack",
+                "t": client_time,
+                "robot_ms": round((done - start) * 1000, 1),
+                "control_ms": round((done - sample_at) * 1000, 1),
+            }, client)
+
+    async def _run(self):
+        """Driving session: enable, tick until released or timed out, stop"""
+        try:
+            await self.set_enabled(True)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to enable manual control: {e}")
+            return
+
+        logger.info("Manual control session started")
+        sent: Optional[Tuple[float, float]] = None
+        sent_at = None  # arrival time of the last sample sent
+        try:
+            while True:
+                tick_start = time.perf_counter()
+                if tick_start - self._sample_at > self.deadman_timeout:
+                    if self._sample != (0.0, 0.0):
+                        self.deadman_stops += 1
+                        logger.warning(f"No joystick input for {self.deadman_timeout}s, stopping robot")
+                    break
+
+                sample, sample_at = self._sample, self._sample_at
+                # Motion is re-sent every tick; a released stick only once
+                if sample != (0.0, 0.0) or sent != sample:
+                    fresh = sample_at != sent_at
+                    await self._send(sample, sample_at if fresh else None, self._sample_t, self._sample_client)
+                    sent, sent_at = sample, sample_at
+
+                await asyncio.sleep(max(0.0, self.tick_interval - (time.perf_counter() - tick_start)))
+        finally:
+            # Runs on deadman timeout and on stop()/cancel
+            try:
+                await asyncio.shield(self._halt())
+            except Exception as e:
+                logger.error(f"Failed to stop manual control: {e}")
+            logger.info("Manual control session ended")
+
+    async def _halt(self):
+        await self.drive(0.0, 0.0)
+        await self.set_enabled(False)
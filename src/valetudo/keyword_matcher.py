@@ -0,0 +1,228 @@
+"""Keyword Matcher - Single-pass keyword and room lookup for CommandMapper
+
+Keyword tables are compiled into one regex per language. A single scan
+reports every keyword occurrence, overlapping ones included, with its
+position.
+
+Usage:
+    python -m src.valetudo.keyword_matcher bench
+"""
+
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Table name -> keyword list, or -> {key: keyword list} (move directions, rooms)
+KeywordTables = Dict[str, Union[List[str], Dict[str, List[str]]]]
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Build a regex matching any keyword, factored as a prefix trie
+
+    Branching on one character per node keeps the engine from trying every
+    keyword at every position. Optional tails are greedy, so the longest
+    keyword starting at a position wins.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordHit(NamedTuple):
+    """Keyword occurrence in scanned text"""
+    start: int
+    end: int
+    kind: str  # table name, e.g. "clean", "move", "room"
+    key: Optional[str]  # direction for "move", room id for "room", else None
+
+
+class KeywordMatcher:
+    """Finds all keywords of a set of tables in one pass
+
+    Every position is tried with a zero-width lookahead over a trie of all
+    keywords, which yields the longest keyword starting there.
+    Any shorter keyword starting at the same position is a prefix of it,
+    so those are precomputed per keyword. The result is the same as
+    testing each keyword with `in`, but positions are known too.
+    """
+
+    def __init__(self, tables: KeywordTables):
+        """Compile tables
+
+        Args:
+            tables: Keyword tables
+        """
+        self._labels: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        for kind, table in tables.items():
+            entries = table.items() if isinstance(table, dict) else [(None, table)]
+            for key, keywords in entries:
+                for keyword in keywords:
+                    labels = self._labels.setdefault(keyword, [])
+                    if (kind, key) not in labels:
+                        labels.append((kind, key))
+
+        keywords = sorted(self._labels, key=len, reverse=True)
+        self._prefixes = {
+            keyword: [other for other in keywords if other != keyword and keyword.startswith(other)]
+            for keyword in keywords
+        }
+        self._pattern = re.compile(f"(?=({_trie_pattern(keywords)}))") if keywords else None
+
+    def to_dict(self) -> Dict[str, object]:
+        """Serialize compiled matcher (JSON-compatible)"""
+        return {
+            "labels": {keyword: [list(label) for label in labels] for keyword, labels in self._labels.items()},
+            "prefixes": self._prefixes,
+            "pattern": self._pattern.pattern if self._pattern else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "KeywordMatcher":
+        """Restore matcher serialized by to_dict() without recompiling tables"""
+        matcher = cls.__new__(cls)
+        matcher._labels = {keyword: [tuple(label) for label in labels] for keyword, labels in data["labels"].items()}
+        matcher._prefixes = data["prefixes"]
+        matcher._pattern = re.compile(data["pattern"]) if data["pattern"] else None
+        return matcher
+
+    def scan(self, text: str) -> List[KeywordHit]:
+        """Find all keyword occurrences
+
+        Args:
+            text: Lowercased text
+
+        Returns:
+            Hits ordered by start position
+        """
+        if self._pattern is None:
+            return []
+
+        hits = []
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            longest = match.group(1)
+            for keyword in (longest, *self._prefixes[longest]):
+                end = start + len(keyword)
+                hits.extend(KeywordHit(start, end, kind, key) for kind, key in self._labels[keyword])
+        return hits
+
+
+def _reference_parse(mapper, text: str):
+    """Keyword tier as linear scans of the same pack tables
+
+    Used by the bench command to check the compiled matcher against plain
+    substring scans. It shares the packs and language order with the
+    mapper, so it cannot catch changes to either; parsing behavior is
+    tested against a frozen copy of the baseline parser in tests/.
+    """
+    from .command_mapper import Command
+
+    text_lower = text.lower()
+    for lang in mapper._candidate_languages(text_lower):
+        tables = _pack_tables(lang)
+        actions, room_patterns = tables["actions"], tables["rooms"]
+
+        def rooms():
+            return [room for room, patterns in room_patterns.items() if any(p in text_lower for p in patterns)]
+
+        def hit(kind):
+            return any(kw in text_lower for kw in actions[kind])
+
+        if hit("clean"):
+            found = rooms()
+            if found:
+                return Command(action="clean_rooms", params={"rooms": found}, confidence=0.9)
+            return Command(action="start_cleaning", params={}, confidence=0.95)
+        for kind, confidence in (
+            ("stop", 0.95), ("pause", 0.95), ("home", 0.95), ("locate", 0.9), ("status", 0.9), ("follow_me", 0.95)
+        ):
+            if hit(kind):
+                return Command(action=kind, params={}, confidence=confidence)
+        if hit("goto"):
+            found = rooms()
+            if found:
+                return Command(action="goto_room", params={"room": found[0]}, confidence=0.9)
+            return Command(action="goto_location", params={}, confidence=0.7)
+        for direction, keywords in tables["move"].items():
+            if any(kw in text_lower for kw in keywords):
+                return Command(action="move", params={"direction": direction}, confidence=0.9)
+    return None
+
+
+def _pack_tables(lang: str) -> Dict[str, object]:
+    """Raw tables of a language pack"""
+    from .language_packs import LANGUAGES_DIR
+
+    return json.loads((LANGUAGES_DIR / f"{lang}.json").read_text(encoding="utf-8"))
+
+
+def _bench_texts(languages: List[str]) -> List[str]:
+    """Utterances for the equivalence check: corpus, keywords, and mixtures"""
+    from .intent_classifier import load_corpus
+
+    texts = [text for text, _, _ in load_corpus()]
+    keywords = []
+    for lang in languages:
+        tables = _pack_tables(lang)
+        texts.extend(tables.get("samples", []))
+        for table in (*tables["actions"].values(), *tables["move"].values(), *tables["rooms"].values()):
+            keywords.extend(table)
+    texts.extend(keywords)
+    texts.extend(f"{a} {b}" for a in keywords[::3] for b in keywords[1::4])
+    texts.extend(text.upper() for text in texts[:200])
+    return texts
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Check and benchmark the compiled keyword matcher")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Compare against linear table scans")
+    bench.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from .command_mapper import CommandMapper
+
+    logging.basicConfig(level=logging.ERROR)
+    mapper = CommandMapper(languages=["pl", "en", "de"], memo_size=0)
+    texts = _bench_texts(mapper.languages)
+
+    mismatches = [
+        text for text in texts
+        if mapper.parse_command(text) != _reference_parse(mapper, text)
+    ]
+    print(f"Compiled vs linear scan: {len(texts) - len(mismatches)}/{len(texts)} utterances identical")
+    for text in mismatches[:10]:
+        print(f"  MISMATCH {text!r}: {mapper.parse_command(text)} != {_reference_parse(mapper, text)}")
+
+    for label, parse in (("linear", lambda t: _reference_parse(mapper, t)), ("compiled", mapper.parse_command)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for text in texts:
+                parse(text)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>8}: {elapsed / (args.rounds * len(texts)) * 1e6:.1f} us/utterance")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
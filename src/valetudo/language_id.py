@@ -0,0 +1,205 @@
+"""Language ID - Character trigram language identification
+
+Each language has log-probabilities of character trigrams, measured
+against a common floor, so trigrams unseen in every language contribute
+nothing and only known ones are looked up. Scoring a short command takes
+a few microseconds. The model is built from the "samples" of the
+language packs.
+
+Usage:
+    python -m src.valetudo.language_id build
+    python -m src.valetudo.language_id bench
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+from itertools import repeat
+from pathlib import Path
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES_DIR = Path(__file__).parent / "data" / "languages"
+MODEL_PATH = LANGUAGES_DIR / "langid.json"
+
+# Probability assumed for a trigram never seen in a language's samples
+FLOOR_PROBABILITY = 1e-5
+
+
+def trigrams(text: str) -> List[str]:
+    """Character trigrams of lowercased, space-padded text"""
+    padded = f" {' '.join(text.lower().split())} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class LanguageIdentifier:
+    """Naive Bayes over character trigrams"""
+
+    def __init__(self, languages: List[str], weights: Dict[str, Sequence[float]]):
+        """Initialize identifier
+
+        Args:
+            languages: Language codes, in weight column order
+            weights: Trigram -> per-language log-probability above the floor
+        """
+        self.languages = languages
+        self._tables: Dict[str, Dict[str, float]] = {lang: {} for lang in languages}
+        for trigram, row in weights.items():
+            for lang, weight in zip(languages, row):
+                if weight:
+                    self._tables[lang][trigram] = weight
+
+    def scores(self, text: str, languages: Optional[Iterable[str]] = None) -> Tuple[Dict[str, float], int]:
+        """Score text against languages
+
+        Args:
+            text: Input text
+            languages: Language codes to score (default: all known)
+
+        Returns:
+            Tuple of (language -> score, number of trigrams)
+        """
+        grams = trigrams(text)
+        scores = {
+            lang: sum(map(self._tables[lang].get, grams, repeat(0.0)))
+            for lang in (languages or self.languages) if lang in self._tables
+        }
+        return scores, len(grams)
+
+    def rank(
+        self,
+        text: str,
+        languages: Optional[Iterable[str]] = None,
+        min_margin: float = 0.5
+    ) -> Tuple[List[str], bool]:
+        """Rank candidate languages for text
+
+        Args:
+            text: Input text
+            languages: Candidate language codes (default: all known)
+            min_margin: Per-trigram score lead the best language needs to be
+                considered certain
+
+        Returns:
+            Tuple of (languages best first, whether the best one is certain)
+        """
+        scores, count = self.scores(text, languages)
+        candidates = list(scores)
+        if not candidates:
+            return list(languages or []), False
+
+        ranked = sorted(candidates, key=lambda lang: scores[lang], reverse=True)
+        if len(ranked) == 1:
+            return ranked, True
+        lead = (scores[ranked[0]] - scores[ranked[1]]) / max(count, 1)
+        return ranked, lead >= min_margin
+
+    @classmethod
+    def train(cls, samples: Dict[str, List[str]], min_count: int = 1) -> "LanguageIdentifier":
+        """Estimate trigram probabilities per language
+
+        Args:
+            samples: Language code -> sample texts
+            min_count: Minimum occurrences of a trigram in a language
+
+        Returns:
+            Trained identifier
+        """
+        languages = sorted(samples)
+        counts = {lang: Counter(gram for text in samples[lang] for gram in trigrams(text)) for lang in languages}
+        floor = math.log(FLOOR_PROBABILITY)
+
+        weights: Dict[str, List[float]] = {}
+        for column, lang in enumerate(languages):
+            total = sum(counts[lang].values())
+            for gram, count in counts[lang].items():
+                if count >= min_count:
+                    row = weights.setdefault(gram, [0.0] * len(languages))
+                    row[column] = max(math.log(count / total) - floor, 0.0)
+        return cls(languages, weights)
+
+    def save(self, path: Union[str, Path]):
+        """Save model as JSON"""
+        grams = sorted({gram for table in self._tables.values() for gram in table})
+        data = {
+            "languages": self.languages,
+            "weights": {
+                gram: [round(self._tables[lang].get(gram, 0.0), 3) for lang in self.languages] for gram in grams
+            },
+        }
+        Path(path).write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        logger.info(f"Saved language ID model to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = MODEL_PATH) -> "LanguageIdentifier":
+        """Load model saved by save()"""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(data["languages"], data["weights"])
+
+
+def load_samples(languages_dir: Union[str, Path] = LANGUAGES_DIR) -> Dict[str, List[str]]:
+    """Read "samples" of every language pack"""
+    samples = {}
+    for path in sorted(Path(languages_dir).glob("*.json")):
+        if path.name == MODEL_PATH.name:
+            continue
+        pack = json.loads(path.read_text(encoding="utf-8"))
+        samples[pack["language"]] = pack.get("samples", [])
+    return samples
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Build and benchmark the language ID model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Train on language pack samples and save the model")
+    build.add_argument("--output", default=str(MODEL_PATH))
+    bench = sub.add_parser("bench", help="Report cross-validated accuracy and latency")
+    bench.add_argument("--folds", type=int, default=5)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    samples = load_samples()
+    if args.command == "build":
+        model = LanguageIdentifier.train(samples)
+        model.save(args.output)
+        print(f"Built language ID model: {', '.join(model.languages)}")
+        return
+
+    labeled = [(text, lang) for lang, texts in samples.items() for text in texts]
+    random.Random(0).shuffle(labeled)
+    correct = certain = certain_correct = 0
+    for fold in range(args.folds):
+        train: Dict[str, List[str]] = {}
+        for i, (text, lang) in enumerate(labeled):
+            if i % args.folds != fold:
+                train.setdefault(lang, []).append(text)
+        model = LanguageIdentifier.train(train)
+        for text, lang in labeled[fold::args.folds]:
+            ranked, is_certain = model.rank(text)
+            correct += ranked[0] == lang
+            certain += is_certain
+            certain_correct += is_certain and ranked[0] == lang
+    print(f"{args.folds}-fold accuracy: {correct / len(labeled):.1%} ({len(labeled)} samples), "
+          f"certain: {certain / len(labeled):.1%} of samples, {certain_correct / max(certain, 1):.1%} correct")
+
+    model = LanguageIdentifier.load()
+    timings = []
+    for _ in range(20):
+        for text, _ in labeled:
+            start = time.perf_counter()
+            model.rank(text, ("pl", "en"))
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"rank() latency (pl, en): p50 {timings[len(timings) // 2] * 1e6:.1f} us, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Language Packs - Per-language command keywords, rooms and reply templates
+
+Each language is a JSON file in data/languages. A pack is read and its
+keyword matcher compiled only when the language is first needed; compiled
+matchers are cached on disk, keyed by the pack's content hash.
+"""
+
+import re
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Union
+
+from .keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES_DIR = Path(__file__).parent / "data" / "languages"
+
+# Bump when KeywordMatcher.to_dict() changes to invalidate cached matchers
+MATCHER_CACHE_VERSION = 1
+
+
+@dataclass
+class LanguagePack:
+    """Command vocabulary of one language"""
+    language: str
+    matcher: KeywordMatcher  # actions, "move" directions and "room" ids
+    move: Dict[str, List[str]]  # direction -> keywords, in priority order
+    rooms: Dict[str, List[str]]  # room id -> name patterns
+    clause_separators: "re.Pattern"
+    templates: Dict[str, str]  # action -> reply template
+    status_questions: FrozenSet[str]  # whole utterances answered from the status template
+
+
+class LanguagePacks:
+    """Lazily loaded language packs"""
+
+    def __init__(
+        self,
+        languages_dir: Union[str, Path] = LANGUAGES_DIR,
+        cache_dir: Optional[Union[str, Path]] = None
+    ):
+        """Initialize pack registry
+
+        Args:
+            languages_dir: Directory with <language>.json packs
+            cache_dir: Directory for compiled matchers (optional, no disk cache if None)
+        """
+        self.languages_dir = Path(languages_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._packs: Dict[str, LanguagePack] = {}
+        self._lock = threading.Lock()
+
+    def available(self) -> List[str]:
+        """Language codes with a pack on disk"""
+        return sorted(
+            path.stem for path in self.languages_dir.glob("*.json")
+            if not path.stem.startswith("langid")
+        )
+
+    def get(self, language: str) -> LanguagePack:
+        """Get pack, loading and compiling it on first use
+
+        Args:
+            language: Language code
+
+        Returns:
+            Language pack
+
+        Raises:
+            FileNotFoundError if there is no pack for the language
+        """
+        pack = self._packs.get(language)
+        if pack is None:
+            with self._lock:
+                pack = self._packs.get(language)
+                if pack is None:
+                    pack = self._load(language)
+                    self._packs[language] = pack
+        return pack
+
+    def _load(self, language: str) -> LanguagePack:
+        raw = (self.languages_dir / f"{language}.json").read_bytes()
+        data = json.loads(raw)
+        tables = {**data["actions"], "move": data["move"], "room": data["rooms"]}
+
+        pack = LanguagePack(
+            language=language,
+            matcher=self._matcher(language, raw, tables),
+            move=data["move"],
+            rooms=data["rooms"],
+            clause_separators=re.compile(data["clause_separators"]),
+            templates=data.get("templates", {}),
+            status_questions=frozenset(data.get("status_questions", [])),
+        )
+        logger.info(f"Loaded language pack: {language}")
+        return pack
+
+    def _matcher(self, language: str, raw: bytes, tables: Dict) -> KeywordMatcher:
+        """Compile matcher, or restore it from the disk cache"""
+        if self.cache_dir is None:
+            return KeywordMatcher(tables)
+
+        digest = hashlib.sha1(raw + str(MATCHER_CACHE_VERSION).encode()).hexdigest()[:16]
+        path = self.cache_dir / f"{language}-{digest}.json"
+        try:
+            return KeywordMatcher.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable matcher cache {path}: {e}")
+
+        matcher = KeywordMatcher(tables)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(matcher.to_dict(), ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+            for stale in self.cache_dir.glob(f"{language}-*.json"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to cache compiled matcher: {e}")
+        return matcher
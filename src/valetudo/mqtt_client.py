@@ -1,12 +1,21 @@
 """Valetudo MQTT Client"""
 
 import json
+import time
+import asyncio
 import logging
-from typing import Callable, Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Union
 import paho.mqtt.client as mqtt
 
+from .. import metrics
+from ..serialization import dumps, loads
+
 logger = logging.getLogger(__name__)
 
+MESSAGES = metrics.counter("mqtt_messages_total", "MQTT messages received and published", ["direction"])
+MESSAGES_IN = MESSAGES.labels("in")
+MESSAGES_OUT = MESSAGES.labels("out")
+
 
 class ValetudoMQTTClient:
     """Client for Valetudo MQTT interface"""
@@ -43,12 +52,18 @@ class ValetudoMQTTClient:
 
         # Message handlers
         self.handlers: Dict[str, Callable] = {}
+        self.connected = False
+
+        # Optional hooks used by the capture/replay tooling (see mqtt_replay)
+        self.recorder = None  # object with record(topic, payload_bytes)
+        self.stage_timer = None  # object with observe(stage, seconds)
 
         logger.info(f"Initialized Valetudo MQTT client: {broker}:{port}")
 
     def _on_connect(self, client, userdata, flags, rc):
         """Callback for when client connects to MQTT broker"""
         if rc == 0:
+            self.connected = True
             logger.info("Connected to MQTT broker")
             # Subscribe to all Valetudo topics
             topics = [
@@ -64,20 +79,32 @@ class ValetudoMQTTClient:
 
     def _on_disconnect(self, client, userdata, rc):
         """Callback for when client disconnects from MQTT broker"""
+        self.connected = False
         if rc != 0:
             logger.warning(f"Unexpected disconnect from MQTT broker: {rc}")
 
     def _on_message(self, client, userdata, msg):
         """Callback for when a message is received"""
+        MESSAGES_IN.inc()
         topic = msg.topic
+        if self.recorder is not None:
+            self.recorder.record(topic, msg.payload)
+
+        timer = self.stage_timer
         try:
-            payload = json.loads(msg.payload.decode())
+            start = time.perf_counter()
+            payload = loads(msg.payload)
+            if timer is not None:
+                timer.observe("decode", time.perf_counter() - start)
             logger.debug(f"Received message on {topic}: {payload}")
 
             # Call registered handlers
             for pattern, handler in self.handlers.items():
                 if pattern in topic:
+                    start = time.perf_counter()
                     handler(topic, payload)
+                    if timer is not None:
+                        timer.observe(f"handler:{pattern}", time.perf_counter() - start)
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to decode JSON message: {e}")
@@ -110,17 +137,57 @@ class ValetudoMQTTClient:
         self.handlers[topic_pattern] = handler
         logger.debug(f"Registered handler for pattern: {topic_pattern}")
 
-    def publish(self, topic_suffix: str, payload: Dict[str, Any]):
+    def publish(
+        self,
+        topic_suffix: str,
+        payload: Union[Dict[str, Any], str],
+        qos: int = 0
+    ) -> mqtt.MQTTMessageInfo:
         """Publish a message to Valetudo
 
         Args:
             topic_suffix: Topic suffix (e.g., "command")
-            payload: JSON payload to publish
+            payload: JSON payload to publish, or a raw string payload
+                (Valetudo command topics expect plain values like "STOP")
+            qos: MQTT quality of service level
+
+        Returns:
+            paho message info for tracking delivery
         """
         topic = f"{self.base_topic}/{topic_suffix}"
-        message = json.dumps(payload)
-        self.client.publish(topic, message)
+        message = payload if isinstance(payload, str) else dumps(payload)
+        info = self.client.publish(topic, message, qos=qos)
+        MESSAGES_OUT.inc()
         logger.debug(f"Published to {topic}: {payload}")
+        return info
+
+    async def publish_and_wait(
+        self,
+        topic_suffix: str,
+        payload: Union[Dict[str, Any], str],
+        timeout: float = 5.0
+    ):
+        """Publish with QoS 1 and wait until the broker acknowledges it
+
+        Args:
+            topic_suffix: Topic suffix
+            payload: JSON payload or raw string payload
+            timeout: Seconds to wait for the PUBACK
+
+        Raises:
+            ConnectionError if not connected, TimeoutError if no ack arrives
+        """
+        if not self.connected:
+            raise ConnectionError("MQTT client not connected")
+
+        info = self.publish(topic_suffix, payload, qos=1)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            raise ConnectionError(f"MQTT publish failed: {mqtt.error_string(info.rc)}")
+
+        # wait_for_publish blocks, so keep it off the event loop
+        await asyncio.to_thread(info.wait_for_publish, timeout)
+        if not info.is_published():
+            raise TimeoutError(f"No MQTT ack for {topic_suffix} within {timeout}s")
 
     # Convenience methods for common subscriptions
 
@@ -0,0 +1,299 @@
+"""MQTT traffic capture and replay for benchmarking
+
+Records Valetudo MQTT traffic to a compact append-only file and feeds it
+back into ValetudoMQTTClient at 1x, 10x or maximum speed, reporting
+throughput and latency for every stage of the handler pipeline.
+
+Usage:
+    python -m src.valetudo.mqtt_replay record data/run.vmqr --duration 600
+    python -m src.valetudo.mqtt_replay replay data/run.vmqr --speed 10 --target broker
+"""
+
+import sys
+import time
+import queue
+import struct
+import logging
+import argparse
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .mqtt_client import ValetudoMQTTClient
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC, then records of RECORD_HEADER + topic + payload
+MAGIC = b"VMQR1\n"
+RECORD_HEADER = struct.Struct("<dHI")  # timestamp, topic length, payload length
+
+
+class MQTTRecorder:
+    """Appends MQTT messages to a capture file
+
+    Safe to call from paho's network thread.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Open capture file for appending
+
+        Args:
+            path: Capture file path (created if missing)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+
+        self._file = open(self.path, "ab")
+        if is_new:
+            self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self.count = 0
+
+        logger.info(f"Recording MQTT traffic to {self.path}")
+
+    def record(self, topic: str, payload: bytes, timestamp: Optional[float] = None):
+        """Append one message
+
+        Args:
+            topic: MQTT topic
+            payload: Raw message payload
+            timestamp: Receive time (defaults to now)
+        """
+        topic_bytes = topic.encode()
+        header = RECORD_HEADER.pack(
+            timestamp if timestamp is not None else time.time(),
+            len(topic_bytes),
+            len(payload)
+        )
+        with self._lock:
+            self._file.write(header + topic_bytes + payload)
+            self.count += 1
+
+    def close(self):
+        """Flush and close capture file"""
+        with self._lock:
+            self._file.close()
+        logger.info(f"Recorded {self.count} messages to {self.path}")
+
+
+def read_capture(path: Union[str, Path]) -> Iterator[Tuple[float, str, bytes]]:
+    """Read messages from a capture file
+
+    Args:
+        path: Capture file path
+
+    Yields:
+        Tuples of (timestamp, topic, payload)
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not an MQTT capture file: {path}")
+
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                # EOF, or a record truncated by a crash during recording
+                return
+            timestamp, topic_len, payload_len = RECORD_HEADER.unpack(header)
+            body = f.read(topic_len + payload_len)
+            if len(body) < topic_len + payload_len:
+                return
+            yield timestamp, body[:topic_len].decode(), body[topic_len:]
+
+
+class StageTimer:
+    """Collects per-stage latency samples for a replay run"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Record one latency sample for stage"""
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def report(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        """Summarize samples
+
+        Args:
+            elapsed: Wall-clock duration of the run in seconds
+
+        Returns:
+            Dict of stage -> {count, throughput, mean_ms, p50_ms, p99_ms, max_ms}
+        """
+        report = {}
+        with self._lock:
+            for stage, samples in self.samples.items():
+                ordered = sorted(samples)
+                count = len(ordered)
+                report[stage] = {
+                    "count": count,
+                    "throughput": count / elapsed if elapsed > 0 else 0.0,
+                    "mean_ms": sum(ordered) / count * 1000,
+                    "p50_ms": ordered[count // 2] * 1000,
+                    "p99_ms": ordered[min(count - 1, int(count * 0.99))] * 1000,
+                    "max_ms": ordered[-1] * 1000,
+                }
+        return report
+
+
+class LoopbackBroker:
+    """In-process stand-in for an MQTT broker
+
+    Delivers published messages to the client's on_message callback from a
+    separate thread, like paho's network loop does, so queueing between the
+    producer and the handler pipeline is part of the measurement.
+    """
+
+    def __init__(self, client: ValetudoMQTTClient, timer: StageTimer):
+        self.client = client
+        self.timer = timer
+        self._queue: "queue.Queue[Optional[Tuple[float, str, bytes]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._deliver_loop, daemon=True)
+        self._thread.start()
+
+    def publish(self, topic: str, payload: bytes):
+        """Queue message for delivery"""
+        self._queue.put((time.perf_counter(), topic, payload))
+
+    def _deliver_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            enqueued, topic, payload = item
+            self.timer.observe("delivery", time.perf_counter() - enqueued)
+            deliver(self.client, topic, payload, self.timer)
+
+    def close(self):
+        """Wait until every queued message has been delivered"""
+        self._queue.put(None)
+        self._thread.join()
+
+
+def deliver(client: ValetudoMQTTClient, topic: str, payload: bytes, timer: StageTimer):
+    """Feed one message through the client's handler pipeline"""
+    start = time.perf_counter()
+    client._on_message(client.client, None, SimpleNamespace(topic=topic, payload=payload))
+    timer.observe("pipeline", time.perf_counter() - start)
+
+
+def replay(
+    path: Union[str, Path],
+    client: ValetudoMQTTClient,
+    speed: float = 1.0,
+    target: str = "direct"
+) -> Dict[str, Dict[str, float]]:
+    """Replay a capture file into a client's handler pipeline
+
+    Args:
+        path: Capture file path
+        client: Client with handlers registered (not connected)
+        speed: Playback speed multiplier; 0 replays as fast as possible
+        target: "direct" calls the pipeline inline, "broker" goes through
+            a LoopbackBroker delivery thread
+
+    Returns:
+        Per-stage report (see StageTimer.report)
+    """
+    if target not in ("direct", "broker"):
+        raise ValueError(f"Unknown replay target: {target}")
+
+    timer = StageTimer()
+    previous_timer = client.stage_timer
+    client.stage_timer = timer
+    broker = LoopbackBroker(client, timer) if target == "broker" else None
+
+    first_ts = None
+    start = time.perf_counter()
+    try:
+        for timestamp, topic, payload in read_capture(path):
+            if speed > 0:
+                if first_ts is None:
+                    first_ts = timestamp
+                delay = (timestamp - first_ts) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            if broker is not None:
+                broker.publish(topic, payload)
+            else:
+                deliver(client, topic, payload, timer)
+    finally:
+        if broker is not None:
+            broker.close()
+        client.stage_timer = previous_timer
+
+    return timer.report(time.perf_counter() - start)
+
+
+def format_report(report: Dict[str, Dict[str, float]]) -> str:
+    """Format replay report as a text table"""
+    lines = [f"{'stage':<24}{'count':>8}{'msg/s':>12}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for stage, r in sorted(report.items()):
+        lines.append(
+            f"{stage:<24}{r['count']:>8}{r['throughput']:>12.1f}{r['mean_ms']:>10.3f}"
+            f"{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}"
+        )
+    return "\n".join(lines)
+
+
+def _noop_handler(payload):
+    pass
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point"""
+    from ..config import get_config
+
+    parser = argparse.ArgumentParser(description="Record and replay Valetudo MQTT traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record live MQTT traffic")
+    rec.add_argument("file")
+    rec.add_argument("--duration", type=float, default=60.0, help="Seconds to record")
+
+    rep = sub.add_parser("replay", help="Replay a capture and report per-stage timings")
+    rep.add_argument("file")
+    rep.add_argument("--speed", type=float, default=0.0, help="1, 10, ... or 0 for max speed")
+    rep.add_argument("--target", choices=["direct", "broker"], default="direct")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    mqtt_config = get_config().valetudo.mqtt
+
+    client = ValetudoMQTTClient(
+        broker=mqtt_config.broker,
+        port=mqtt_config.port,
+        username=mqtt_config.username or None,
+        password=mqtt_config.password or None,
+        base_topic=mqtt_config.base_topic
+    )
+
+    if args.command == "record":
+        recorder = MQTTRecorder(args.file)
+        client.recorder = recorder
+        client.connect()
+        try:
+            time.sleep(args.duration)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.disconnect()
+            recorder.close()
+        return
+
+    # Stand-in handlers for the default subscriptions
+    client.on_state_change(_noop_handler)
+    client.on_map_update(_noop_handler)
+    client.on_attributes_change(_noop_handler)
+
+    report = replay(args.file, client, speed=args.speed, target=args.target)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""State Hub - Single upstream consumer of robot state, shared by all clients"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Robot states polled at the active interval
+ACTIVE_STATES = {"cleaning", "moving", "returning"}
+
+
+def status_fields(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract state, battery and error from a Valetudo state payload
+
+    Args:
+        payload: Robot state from REST or the MQTT state topic; battery may
+            be a level or a {"level": ...} object
+
+    Returns:
+        The fields present in the payload
+    """
+    fields = {key: payload[key] for key in ("state", "error") if key in payload}
+    battery = payload.get("battery")
+    if isinstance(battery, dict):
+        battery = battery.get("level")
+    if battery is not None:
+        fields["battery"] = battery
+    return fields
+
+
+class StateHub:
+    """Keeps the latest robot status and broadcasts what changed
+
+    One background loop polls the robot, faster while it is busy and
+    slower while it is docked, so the load on the robot does not depend
+    on how many dashboards are open. When a push source (MQTT) is
+    connected, its updates are merged in as they arrive and polling only
+    resyncs fields the push source does not carry. Readers get the shared
+    snapshot; concurrent refreshes are coalesced into one request.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        on_change: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        active_interval: float = 2.0,
+        idle_interval: float = 10.0,
+        docked_interval: float = 30.0,
+        resync_interval: float = 60.0,
+        push_connected: Optional[Callable[[], bool]] = None
+    ):
+        """Initialize state hub
+
+        Args:
+            fetch: Coroutine returning the robot status ({"state", "battery", "error"})
+            on_change: Coroutine receiving "state_delta" frames (optional)
+            active_interval: Poll interval while cleaning, moving or returning
+            idle_interval: Poll interval while idle, paused or in error
+            docked_interval: Poll interval while docked
+            resync_interval: Poll interval while the push source is connected
+            push_connected: Returns whether the push source is connected (optional)
+        """
+        self.fetch = fetch
+        self.on_change = on_change
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.docked_interval = docked_interval
+        self.resync_interval = resync_interval
+        self.push_connected = push_connected
+
+        self.snapshot: Dict[str, Any] = {}
+        self.seq = 0
+        self.updated_at = 0.0  # loop time of the last update
+        self.polls = 0
+        self.pushes = 0
+
+        self._last_poll = float("-inf")
+        self._fast_until = float("-inf")
+        self._refresh: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """Start the polling loop (call from the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("State hub started")
+
+    async def stop(self):
+        """Stop the polling loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def interval(self) -> float:
+        """Current poll interval in seconds"""
+        if self.push_connected and self.push_connected():
+            return self.resync_interval
+        state = self.snapshot.get("state")
+        if state in ACTIVE_STATES or (self._loop and self._loop.time() < self._fast_until):
+            return self.active_interval
+        if state == "docked":
+            return self.docked_interval
+        return self.idle_interval
+
+    def expect_change(self, window: float = 30.0):
+        """Poll at the active interval for a while, e.g. after sending a command
+
+        Args:
+            window: Seconds to keep polling fast
+        """
+        if self._loop is None:
+            return
+        self._fast_until = self._loop.time() + window
+        self._wake.set()
+
+    def frame(self) -> Dict[str, Any]:
+        """Full snapshot frame for a newly connected client"""
+        return {"type": "state", "seq": self.seq, "data": dict(self.snapshot)}
+
+    async def get(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Get robot status, refreshing it if older than max_age
+
+        Args:
+            max_age: Seconds the snapshot may be old (default: the current
+                poll interval, i.e. never poll more often than the hub does)
+
+        Returns:
+            Copy of the status snapshot
+
+        Raises:
+            Exception from fetch if a refresh was needed and failed
+        """
+        if max_age is None:
+            max_age = self.interval()
+        if self.snapshot and asyncio.get_running_loop().time() - self.updated_at <= max_age:
+            return dict(self.snapshot)
+        return await self.refresh()
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Poll the robot now, joining a poll already in progress"""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._poll())
+        # Shielded so a cancelled reader does not cancel the shared poll
+        return dict(await asyncio.shield(self._refresh))
+
+    async def update(self, fields: Dict[str, Any]):
+        """Merge status fields and broadcast the ones that changed
+
+        Args:
+            fields: Status fields (state, battery, error)
+        """
+        self.updated_at = asyncio.get_running_loop().time()
+        changes = {key: value for key, value in fields.items() if self.snapshot.get(key, ...) != value}
+        if not changes:
+            return
+
+        self.snapshot.update(changes)
+        self.seq += 1
+        if "state" in changes and self._wake:
+            # Poll interval depends on the state
+            self._wake.set()
+        if self.on_change:
+            try:
+                await self.on_change({"type": "state_delta", "seq": self.seq, "data": changes})
+            except Exception as e:
+                logger.warning(f"Failed to broadcast state change: {e}")
+
+    def push(self, payload: Dict[str, Any]):
+        """Merge a pushed state payload (thread-safe, e.g. from paho's thread)
+
+        Args:
+            payload: Robot state payload
+        """
+        if self._loop is None:
+            return
+        fields = status_fields(payload)
+        if fields:
+            self.pushes += 1
+            asyncio.run_coroutine_threadsafe(self.update(fields), self._loop)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get polling statistics"""
+        return {
+            "polls": self.polls,
+            "pushes": self.pushes,
+            "seq": self.seq,
+            "interval": self.interval(),
+        }
+
+    async def _poll(self) -> Dict[str, Any]:
+        self._last_poll = asyncio.get_running_loop().time()
+        self.polls += 1
+        await self.update(status_fields(await self.fetch()))
+        return self.snapshot
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self._last_poll + self.interval() - loop.time()
+            if delay <= 0:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning(f"Robot state poll failed: {e}")
+                continue
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,56 @@
+"""Tests for natural language command parsing"""
+
+import pytest
+
+from src.valetudo.command_mapper import CommandMapper
+from src.valetudo.intent_classifier import IntentClassifier
+
+
+@pytest.fixture(scope="module")
+def classifier_mapper():
+    return CommandMapper(language="en", classifier=IntentClassifier.load_or_train(), memo_size=0)
+
+
+@pytest.mark.parametrize("text", ["I love you", "the kitchen looks dirty", "nie wracaj do bazy"])
+def test_classifier_guesses_are_tagged(classifier_mapper, text):
+    for command in [classifier_mapper.parse_command(text), *classifier_mapper.parse_plan(text)]:
+        assert command is None or command.source == "classifier"
+
+
+def test_keyword_matches_are_tagged(classifier_mapper):
+    assert classifier_mapper.parse_command("stop").source == "keyword"
+
+
+@pytest.mark.parametrize("default_language", ["pl", "en"])
+@pytest.mark.parametrize("text, action", [
+    ("start", "start_cleaning"),
+    ("vacuum", "start_cleaning"),
+    ("mop", "start_cleaning"),
+    ("halt", "stop"),
+    ("cancel", "stop"),
+    ("pause", "pause"),
+    ("wait", "pause"),
+    ("dock", "home"),
+    ("return", "home"),
+    ("locate", "locate"),
+    ("battery", "status"),
+])
+def test_one_word_english_commands(default_language, text, action):
+    mapper = CommandMapper(language=default_language, memo_size=0)
+    assert mapper.parse_command(text).action == action
+    assert [command.action for command in mapper.parse_plan(text)] == [action]
+
+
+@pytest.mark.parametrize("lang", ["pl", "en", "de"])
+def test_every_status_question_parses_as_status(lang):
+    mapper = CommandMapper(language=lang, languages=["pl", "en", "de"], memo_size=0)
+    for question in sorted(mapper.packs.get(lang).status_questions):
+        for text in (question, f"{question.capitalize()}?"):
+            assert mapper.is_status_question(text), text
+            assert mapper.parse_command(text).action == "status", text
+            assert [command.action for command in mapper.parse_plan(text)] == ["status"], text
+
+
+@pytest.mark.parametrize("text", ["jak się masz", "how are you", "co robisz", "wie geht es dir"])
+def test_small_talk_is_not_a_status_question(text):
+    assert not CommandMapper(languages=["pl", "en", "de"], memo_size=0).is_status_question(text)
@@ -0,0 +1,64 @@
+"""Tests for command plans owned by chat sessions"""
+
+import asyncio
+
+from src.valetudo.command_mapper import Command
+from src.valetudo.command_plan import CommandPlanRunner
+
+
+def _runner(executed, events):
+    async def execute(action, params):
+        executed.append(action)
+
+    async def get_state():
+        return "cleaning"  # keeps the first step busy until cancelled
+
+    async def on_event(event, owner):
+        events.append((owner, event["status"], event["action"]))
+
+    return CommandPlanRunner(execute, get_state, on_event, poll_interval=0.01, start_timeout=1.0)
+
+
+def _plan(*actions):
+    return [Command(action=action, params={}, confidence=1.0) for action in actions]
+
+
+def test_locate_does_not_cancel_a_plan():
+    async def scenario():
+        executed, events = [], []
+        runner = _runner(executed, events)
+        await runner.start(_plan("start_cleaning", "home"), owner="a")
+        await runner.start(_plan("locate"), owner="b")
+        assert runner.pending == ["home"]
+        assert executed == ["start_cleaning", "locate"]
+        assert events == []
+        runner.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_only_drops_the_sessions_own_plan():
+    async def scenario():
+        executed, events = [], []
+        runner = _runner(executed, events)
+        await runner.start(_plan("start_cleaning", "home"), owner="a")
+        runner.cancel(owner="b")
+        assert runner.pending == ["home"]
+        runner.cancel(owner="a")
+        assert runner.pending == []
+
+    asyncio.run(scenario())
+
+
+def test_replaced_plan_reports_to_its_owner():
+    async def scenario():
+        executed, events = [], []
+        runner = _runner(executed, events)
+        await runner.start(_plan("start_cleaning", "home"), owner="a")
+        await asyncio.sleep(0.05)
+        await runner.start(_plan("stop"), owner="b")
+        await asyncio.sleep(0.05)
+        assert events == [("a", "cancelled", "home")]
+        assert executed == ["start_cleaning", "stop"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+"""Regression tests for the compiled keyword matcher
+
+The oracle is a frozen copy of the baseline parser (baseline_command_mapper)
+plus a fixed table of phrases, never the current language packs, so a
+change to the packs or to language selection cannot hide a regression.
+"""
+
+import pytest
+
+from baseline_command_mapper import BaselineCommandMapper
+from src.valetudo.command_mapper import CommandMapper
+from src.valetudo.intent_classifier import load_corpus
+from src.valetudo.keyword_matcher import KeywordMatcher, _pack_tables
+
+LANGUAGES = ["pl", "en", "de"]
+
+# phrase -> (action, params), independent of the language packs
+EXPECTED = {
+    "start": ("start_cleaning", {}),
+    "posprzątaj": ("start_cleaning", {}),
+    "odkurz": ("start_cleaning", {}),
+    "posprzątaj kuchnię": ("clean_rooms", {"rooms": ["kuchnia"]}),
+    "odkurz salon": ("clean_rooms", {"rooms": ["salon"]}),
+    "clean the kitchen": ("clean_rooms", {"rooms": ["kitchen"]}),
+    "vacuum the bedroom": ("clean_rooms", {"rooms": ["bedroom"]}),
+    "stop": ("stop", {}),
+    "zatrzymaj się": ("stop", {}),
+    "halt": ("stop", {}),
+    "pause": ("pause", {}),
+    "wstrzymaj": ("pause", {}),
+    "wróć do bazy": ("home", {}),
+    "go home": ("home", {}),
+    "dock": ("home", {}),
+    "gdzie jesteś": ("locate", {}),
+    "where are you": ("locate", {}),
+    "status": ("status", {}),
+    "battery": ("status", {}),
+    "jedź za mną": ("follow_me", {}),
+    "follow me": ("follow_me", {}),
+    "jedź do kuchni": ("goto_room", {"room": "kuchnia"}),
+    "go to the kitchen": ("goto_room", {"room": "kitchen"}),
+    "do przodu": ("move", {"direction": "forward"}),
+    "turn left": ("move", {"direction": "left"}),
+}
+
+
+@pytest.fixture(scope="module", params=["pl", "en"])
+def mapper(request):
+    return CommandMapper(language=request.param, languages=LANGUAGES, memo_size=0)
+
+
+def _baseline_phrases():
+    """Baseline keywords, cleaning keywords with rooms, and the corpus"""
+    phrases = []
+    for suffix in ("PL", "EN"):
+        for name in dir(BaselineCommandMapper):
+            if name.endswith(f"_KEYWORDS_{suffix}"):
+                table = getattr(BaselineCommandMapper, name)
+                phrases.extend(sum(table.values(), []) if isinstance(table, dict) else table)
+        rooms = [pattern for patterns in getattr(BaselineCommandMapper, f"ROOM_PATTERNS_{suffix}").values()
+                 for pattern in patterns]
+        phrases.extend(
+            f"{keyword} {room}" for keyword in getattr(BaselineCommandMapper, f"CLEAN_KEYWORDS_{suffix}") for room in rooms
+        )
+    phrases.extend(text for text, _, lang in load_corpus() if lang in ("pl", "en"))
+    return phrases
+
+
+def _summary(command):
+    return (command.action, command.params) if command else None
+
+
+@pytest.mark.parametrize("text, expected", EXPECTED.items())
+def test_expected_actions(mapper, text, expected):
+    assert _summary(mapper.parse_command(text)) == expected
+
+
+def test_recognizes_what_the_baseline_recognized(mapper):
+    baseline = BaselineCommandMapper()
+    regressions = []
+    for text in _baseline_phrases():
+        before = _summary(baseline.parse_command(text))
+        if before is not None and _summary(mapper.parse_command(text)) != before:
+            regressions.append((text, before, _summary(mapper.parse_command(text))))
+    assert not regressions, f"{len(regressions)} regressions, e.g. {regressions[:5]}"
+
+
+@pytest.mark.parametrize("lang", LANGUAGES)
+def test_cached_matcher_scans_like_compiled_one(lang):
+    tables = _pack_tables(lang)
+    matcher = KeywordMatcher({**tables["actions"], "move": tables["move"], "room": tables["rooms"]})
+    restored = KeywordMatcher.from_dict(matcher.to_dict())
+    for text in tables.get("samples", []):
+        assert restored.scan(text.lower()) == matcher.scan(text.lower())
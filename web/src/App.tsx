@@ -1,10 +1,11 @@
 import { useEffect, useState } from 'react';
 import { useStore } from './store';
-import { robotApi, aiApi, healthApi } from './api';
+import { robotApi, aiApi, healthApi, stateSocketUrl, RobotStatus as RobotStatusData } from './api';
 import ChatInterface from './components/ChatInterface';
 import RobotStatus from './components/RobotStatus';
 import RobotControls from './components/RobotControls';
 import ModelSwitcher from './components/ModelSwitcher';
+import Joystick from './components/Joystick';
 import { Activity, AlertCircle } from 'lucide-react';
 
 function App() {
@@ -37,19 +38,73 @@ function App() {
     };
 
     initialize();
+  }, [setRobotStatus, setCurrentModel, setAvailableModels, setError]);
 
-    // Poll robot status every 5 seconds
-    const interval = setInterval(async () => {
-      try {
-        const statusRes = await robotApi.getStatus();
-        setRobotStatus(statusRes.data);
-      } catch (err) {
-        // Silent fail for polling
-      }
-    }, 5000);
+  // Robot state pushed over /ws/state; polling only while the socket is down
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let pollTimer: ReturnType<typeof setInterval> | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let retryDelay = 1000;
+    let seq = 0;
+    let closed = false;
+
+    const startPolling = () => {
+      if (pollTimer) return;
+      pollTimer = setInterval(async () => {
+        try {
+          const statusRes = await robotApi.getStatus();
+          setRobotStatus(statusRes.data);
+        } catch (err) {
+          // Silent fail for polling
+        }
+      }, 5000);
+    };
 
-    return () => clearInterval(interval);
-  }, [setRobotStatus, setCurrentModel, setAvailableModels, setError]);
+    const stopPolling = () => {
+      if (pollTimer) clearInterval(pollTimer);
+      pollTimer = null;
+    };
+
+    const connect = () => {
+      socket = new WebSocket(stateSocketUrl());
+
+      socket.onmessage = (event) => {
+        const frame = JSON.parse(event.data);
+        if (frame.type === 'state') {
+          seq = frame.seq;
+          stopPolling();
+          retryDelay = 1000;
+          if (frame.data.state !== undefined) setRobotStatus(frame.data as RobotStatusData);
+        } else if (frame.type === 'state_delta') {
+          if (frame.seq !== seq + 1) {
+            // Missed a delta: reconnect for a fresh snapshot
+            socket?.close();
+            return;
+          }
+          seq = frame.seq;
+          const current = useStore.getState().robotStatus;
+          setRobotStatus({ ...(current ?? { state: 'unknown', battery: 0 }), ...frame.data });
+        }
+      };
+
+      socket.onclose = () => {
+        if (closed) return;
+        startPolling();
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      stopPolling();
+      if (retryTimer) clearTimeout(retryTimer);
+      socket?.close();
+    };
+  }, [setRobotStatus]);
 
   if (isLoading) {
     return (
@@ -111,6 +166,7 @@ function App() {
           <div className="space-y-6">
             <RobotStatus />
             <RobotControls />
+            <Joystick />
             <ModelSwitcher />
           </div>
 
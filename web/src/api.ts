@@ -51,6 +51,15 @@ export const aiApi = {
   getHistory: () => api.get<ChatMessage[]>('/ai/history'),
 };
 
+const socketUrl = (path: string) =>
+  `${window.location.protocol === 'https:' ? 'wss' : 'ws'}://${window.location.host}${path}`;
+
+// WebSocket URL for robot state frames ("state", then "state_delta")
+export const stateSocketUrl = () => socketUrl('/ws/state');
+
+// WebSocket URL for joystick samples (answered with "ack" frames)
+export const controlSocketUrl = () => socketUrl('/ws/control');
+
 // Health check
 export const healthApi = {
   check: () => api.get('/health'),
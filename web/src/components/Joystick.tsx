@@ -0,0 +1,97 @@
+import { useEffect, useRef, useState, PointerEvent } from 'react';
+import { controlSocketUrl } from '../api';
+import { Gamepad2 } from 'lucide-react';
+
+// Samples are sent at 20 Hz while the stick is held; the server stops the
+// robot if they stop arriving
+const SEND_INTERVAL_MS = 50;
+const PAD_SIZE = 160;
+
+export default function Joystick() {
+  const socket = useRef<WebSocket | null>(null);
+  const vector = useRef({ velocity: 0, turn_rate: 0 });
+  const timer = useRef<ReturnType<typeof setInterval> | null>(null);
+  const lastRtt = useRef<number | undefined>(undefined);
+  const [knob, setKnob] = useState({ x: 0, y: 0 });
+  const [rtt, setRtt] = useState<number | null>(null);
+
+  useEffect(() => {
+    const ws = new WebSocket(controlSocketUrl());
+    ws.onmessage = (event) => {
+      const frame = JSON.parse(event.data);
+      if (frame.type === 'ack' && typeof frame.t === 'number') {
+        lastRtt.current = performance.now() - frame.t;
+        setRtt(Math.round(lastRtt.current));
+      }
+    };
+    socket.current = ws;
+    return () => {
+      if (timer.current) clearInterval(timer.current);
+      ws.close();
+    };
+  }, []);
+
+  const send = () => {
+    if (socket.current?.readyState !== WebSocket.OPEN) return;
+    socket.current.send(JSON.stringify({ ...vector.current, t: performance.now(), rtt_ms: lastRtt.current }));
+    lastRtt.current = undefined;
+  };
+
+  const move = (event: PointerEvent<HTMLDivElement>) => {
+    const rect = event.currentTarget.getBoundingClientRect();
+    const radius = PAD_SIZE / 2;
+    let x = (event.clientX - rect.left - radius) / radius;
+    let y = (event.clientY - rect.top - radius) / radius;
+    const length = Math.hypot(x, y);
+    if (length > 1) {
+      x /= length;
+      y /= length;
+    }
+    setKnob({ x, y });
+    vector.current = { velocity: -y, turn_rate: -x };
+  };
+
+  const press = (event: PointerEvent<HTMLDivElement>) => {
+    event.currentTarget.setPointerCapture(event.pointerId);
+    move(event);
+    send();
+    if (!timer.current) timer.current = setInterval(send, SEND_INTERVAL_MS);
+  };
+
+  const release = () => {
+    if (timer.current) clearInterval(timer.current);
+    timer.current = null;
+    setKnob({ x: 0, y: 0 });
+    vector.current = { velocity: 0, turn_rate: 0 };
+    send();
+  };
+
+  return (
+    <div className="card">
+      <div className="flex items-center justify-between mb-4">
+        <h2 className="text-lg font-semibold flex items-center space-x-2">
+          <Gamepad2 className="w-5 h-5" />
+          <span>Sterowanie ręczne</span>
+        </h2>
+        {rtt !== null && <span className="text-xs text-gray-400">opóźnienie: {rtt} ms</span>}
+      </div>
+
+      <div
+        onPointerDown={press}
+        onPointerMove={(event) => timer.current && move(event)}
+        onPointerUp={release}
+        onPointerCancel={release}
+        className="relative mx-auto rounded-full bg-gray-700 touch-none select-none"
+        style={{ width: PAD_SIZE, height: PAD_SIZE }}
+      >
+        <div
+          className="absolute w-12 h-12 rounded-full bg-dreame-500"
+          style={{
+            left: PAD_SIZE / 2 - 24 + (knob.x * PAD_SIZE) / 2,
+            top: PAD_SIZE / 2 - 24 + (knob.y * PAD_SIZE) / 2,
+          }}
+        />
+      </div>
+    </div>
+  );
+}